@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from analytics import rollup
+
+
+class Command(BaseCommand):
+    help = (
+        "Bring the daily application rollups behind the company analytics page up "
+        "to date, recomputing only the buckets changed since the last run. Run it "
+        "from cron every few minutes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rebuild the rollups of every job.')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        jobs, rows = rollup.run(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Recomputed {jobs} jobs, {rows} rollup rows written in {time.monotonic() - started:.1f}s.'
+        ))
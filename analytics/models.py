@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.db import models
+
+from jobs.models import Job
+
+
+# Applications of one job applied for on one day that are now in one status,
+# maintained by analytics/rollup.py and read by the company analytics page
+class DailyApplicationRollup(models.Model):
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='+')
+    company = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    day = models.DateField()
+    status = models.CharField(max_length=20)
+    applications = models.PositiveIntegerField(default=0)
+    review_seconds = models.PositiveBigIntegerField(default=0)  # applied to last update, non-pending only
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'day', 'status'], name='rollup_bucket_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['company', 'day'], name='rollup_company_day_idx'),
+        ]
+
+    def __str__(self):
+        return f'Job {self.job_id} on {self.day}: {self.applications} {self.status}'
+
+
+# A (job, day) bucket whose applications were deleted; deletes leave no
+# updated_at behind for the watermark to find
+class DirtyBucket(models.Model):
+    job_id = models.BigIntegerField()  # not a foreign key, the job may be gone too
+    day = models.DateField()
+
+    def __str__(self):
+        return f'Job {self.job_id} on {self.day}'
+
+
+# How far the rollup has read Application.updated_at
+class RollupWatermark(models.Model):
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.name} at {self.value}'
@@ -0,0 +1,30 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from applications.models import Application
+from jobs.models import Job
+from .models import DirtyBucket
+
+
+def _deletes_jobs(origin):
+    # origin is the instance or queryset delete() was called on; deleting a job,
+    # or a company and its jobs, takes the job's rollup rows with it
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if model is Job:
+        return True
+    return not isinstance(origin, QuerySet) and getattr(origin, 'is_company', False)
+
+
+# The next rollup run recomputes the day the deleted application was counted in
+@receiver(post_delete, sender=Application)
+def mark_bucket_dirty(sender, instance, origin=None, **kwargs):
+    if _deletes_jobs(origin):
+        return
+    bucket = (instance.job_id, timezone.localdate(instance.applied_at))
+    # One row per bucket for each delete() call, however many applications it removes
+    marked = origin.__dict__.setdefault('_dirty_buckets', set()) if origin is not None else set()
+    if bucket not in marked:
+        marked.add(bucket)
+        DirtyBucket.objects.create(job_id=bucket[0], day=bucket[1])
@@ -0,0 +1,123 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from applications.models import Application
+from jobportal.testing import PLAIN_STATIC_STORAGE, QueryBudgetTestCase, make_application, make_company, make_job, make_seeker
+from . import rollup
+from .models import DailyApplicationRollup, DirtyBucket
+
+
+def applied(job, days_ago, status='pending', reviewed_after=None):
+    application = make_application(job, status=status)
+    applied_at = timezone.now() - timedelta(days=days_ago)
+    updated_at = applied_at + reviewed_after if reviewed_after else timezone.now()
+    Application.objects.filter(pk=application.pk).update(applied_at=applied_at, updated_at=updated_at)
+    return application
+
+
+def buckets():
+    return {
+        (row.job_id, (timezone.localdate() - row.day).days, row.status): (row.applications, row.review_seconds)
+        for row in DailyApplicationRollup.objects.all()
+    }
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        # Every row here was just written; without the overlap a run only sees later changes
+        overlap = mock.patch.object(rollup, 'OVERLAP', timedelta(0))
+        overlap.start()
+        self.addCleanup(overlap.stop)
+        self.company = make_company()
+        self.job = make_job(self.company)
+        self.other = make_job(self.company)
+
+    def test_incremental_runs_follow_changes_and_deletes(self):
+        first = applied(self.job, 3)
+        applied(self.job, 3, status='accepted', reviewed_after=timedelta(hours=2))
+        applied(self.other, 1)
+        self.assertEqual(rollup.run(), (2, 3))
+        self.assertEqual(buckets(), {
+            (self.job.id, 3, 'pending'): (1, 0),
+            (self.job.id, 3, 'accepted'): (1, 7200),
+            (self.other.id, 1, 'pending'): (1, 0),
+        })
+
+        # Nothing changed, nothing recomputed
+        self.assertEqual(rollup.run(), (0, 0))
+
+        first.refresh_from_db()
+        first.status = 'rejected'
+        first.save()
+        self.assertEqual(rollup.run(), (1, 2))
+        self.assertEqual(buckets()[(self.job.id, 3, 'rejected')][0], 1)
+        self.assertNotIn((self.job.id, 3, 'pending'), buckets())
+
+        Application.objects.filter(job=self.other).delete()
+        self.assertEqual(DirtyBucket.objects.count(), 1)
+        self.assertEqual(rollup.run(), (1, 0))
+        self.assertFalse(DirtyBucket.objects.exists())
+        self.assertEqual(set(buckets()), {(self.job.id, 3, 'accepted'), (self.job.id, 3, 'rejected')})
+
+    def test_deletes_mark_each_bucket_once(self):
+        for _ in range(3):
+            applied(self.job, 2)
+        applied(self.job, 5)
+        Application.objects.filter(job=self.job).delete()
+        self.assertEqual(DirtyBucket.objects.count(), 2)
+
+        # The job's rollups go with it, nothing to recompute
+        DirtyBucket.objects.all().delete()
+        for _ in range(3):
+            applied(self.other, 1)
+        self.other.delete()
+        self.assertFalse(DirtyBucket.objects.exists())
+
+    def test_full_rebuild_repairs_edited_rollups(self):
+        applied(self.job, 0)
+        rollup.run()
+        DailyApplicationRollup.objects.update(applications=99)
+        self.assertEqual(rollup.run(full=True), (2, 1))
+        self.assertEqual(buckets(), {(self.job.id, 0, 'pending'): (1, 0)})
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGE)
+class CompanyAnalyticsViewTests(QueryBudgetTestCase):
+    def setUp(self):
+        self.company = make_company()
+        self.job = make_job(self.company, title='Data Engineer')
+
+    def test_reports_rates_from_rollups(self):
+        applied(self.job, 2, status='accepted', reviewed_after=timedelta(hours=1))
+        applied(self.job, 2, status='rejected', reviewed_after=timedelta(hours=3))
+        applied(self.job, 40)
+        applied(make_job(), 1)  # another company's job
+        rollup.run()
+
+        self.client.force_login(self.company)
+        context = self.client.get(reverse('company_analytics')).context
+        self.assertEqual(context['totals']['total'], 2)
+        self.assertEqual(context['totals']['acceptance_rate'], 50)
+        self.assertEqual(context['totals']['review_hours'], 2.0)
+        self.assertEqual(len(context['chart']['days']), 30)
+        self.assertEqual(context['chart']['applications'][-3], 2)
+        self.assertEqual([job['job__title'] for job in context['jobs']], ['Data Engineer'])
+
+        context = self.client.get(reverse('company_analytics'), {'days': 90}).context
+        self.assertEqual(context['totals']['total'], 3)
+
+    def test_seekers_are_turned_away(self):
+        self.client.force_login(make_seeker())
+        self.assertRedirects(self.client.get(reverse('company_analytics')), reverse('dashboard'), fetch_redirect_response=False)
+
+    def test_query_count_does_not_grow_with_jobs(self):
+        def seed(n):
+            for _ in range(n):
+                applied(make_job(self.company), 1)
+            rollup.run(full=True)
+
+        self.assertConstantQueries(reverse('company_analytics'), seed, user=self.company)
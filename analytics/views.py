@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.db.models import Q, Sum
+from django.shortcuts import redirect, render
+from django.utils import timezone
+
+from applications.models import Application
+from .models import DailyApplicationRollup
+
+RANGES = [30, 90, 365]  # days the page can cover
+TOP_JOBS = 25
+
+
+def _rates(row):
+    # Acceptance among decided applications, review time among reviewed ones
+    decided = row['accepted'] + row['rejected']
+    row['acceptance_rate'] = round(100 * row['accepted'] / decided) if decided else None
+    row['review_hours'] = round(row['review_time'] / row['reviewed'] / 3600, 1) if row['reviewed'] else None
+    return row
+
+
+# Company hiring trends, read from the daily rollups (see analytics/rollup.py)
+# so the cost depends on the days shown, not on the number of applications
+@login_required
+def company_analytics(request):
+    if not request.user.is_company:
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+
+    days = request.GET.get('days', '')
+    days = int(days) if days.isdigit() and int(days) in RANGES else RANGES[0]
+    today = timezone.localdate()
+    since = today - timedelta(days=days - 1)
+    rollups = DailyApplicationRollup.objects.filter(company=request.user, day__gte=since).order_by()
+
+    sums = {
+        'total': Sum('applications', default=0),
+        'accepted': Sum('applications', filter=Q(status='accepted'), default=0),
+        'rejected': Sum('applications', filter=Q(status='rejected'), default=0),
+        'reviewed': Sum('applications', filter=~Q(status='pending'), default=0),
+        'review_time': Sum('review_seconds', default=0),
+    }
+    totals = _rates(rollups.aggregate(**sums))
+    per_day = dict(rollups.values_list('day').annotate(Sum('applications')))
+    per_status = dict(rollups.values_list('status').annotate(Sum('applications')))
+    jobs = [
+        _rates(row) for row in
+        rollups.values('job_id', 'job__title').annotate(**sums).order_by('-total', 'job_id')[:TOP_JOBS]
+    ]
+
+    dates = [since + timedelta(days=i) for i in range(days)]
+    chart = {
+        'days': [date.isoformat() for date in dates],
+        'applications': [per_day.get(date, 0) for date in dates],
+        'statuses': [label for _, label in Application.STATUS_CHOICES],
+        'by_status': [per_status.get(status, 0) for status, _ in Application.STATUS_CHOICES],
+    }
+    return render(request, 'analytics/company_analytics.html', {
+        'days': days,
+        'ranges': RANGES,
+        'totals': totals,
+        'jobs': jobs,
+        'chart': chart,
+    })
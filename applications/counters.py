@@ -0,0 +1,104 @@
+"""
+Application counters stored on Job.
+
+Job.applications_count and the per-status ``<status>_count`` columns let
+company pages show how many applications each job has without counting
+the applications table. The views that create, re-status and withdraw
+applications adjust them with F() expressions in the same transaction as
+the change, set_status() for any number of applications at once.
+Anything that bypasses those views (the admin, cascading user deletes,
+bulk loads) lets them drift; ``manage.py recount_applications``
+recomputes them.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from jobs.models import Job
+from .models import Application
+
+STATUSES = [status for status, _ in Application.STATUS_CHOICES]
+
+
+def status_field(status):
+    return f'{status}_count'
+
+
+def _less(field, count=1):
+    # Clamped at zero: a counter that already drifted low must not fail its CHECK constraint
+    return Greatest(F(field) - count, Value(0))
+
+
+def application_added(job_id, status='pending'):
+    Job.objects.filter(pk=job_id).update(
+        applications_count=F('applications_count') + 1,
+        **{status_field(status): F(status_field(status)) + 1},
+    )
+
+
+def application_removed(job_id, status):
+    Job.objects.filter(pk=job_id).update(
+        applications_count=_less('applications_count'),
+        **{status_field(status): _less(status_field(status))},
+    )
+
+
+def status_changed(job_id, old, new, count=1):
+    if old == new or not count:
+        return
+    Job.objects.filter(pk=job_id).update(**{
+        status_field(old): _less(status_field(old), count),
+        status_field(new): F(status_field(new)) + count,
+    })
+
+
+def set_status(applications, status):
+    """
+    Move ``applications`` to ``status`` with a single UPDATE and adjust the
+    counters of their jobs. Returns how many applications changed.
+    """
+    applications = applications.exclude(status=status).order_by()
+    with transaction.atomic():
+        # Locked while they move, so a concurrent update cannot count the same old statuses again
+        rows = list(applications.select_for_update(of=('self',)).values_list('id', 'job_id', 'status'))
+        # update() skips auto_now, and the analytics rollup follows updated_at
+        updated = Application.objects.filter(pk__in=[pk for pk, _, _ in rows]).update(
+            status=status, updated_at=timezone.now(),
+        )
+        moved = Counter((job_id, old_status) for _, job_id, old_status in rows)
+        for (job_id, old_status), count in moved.items():
+            status_changed(job_id, old_status, status, count)
+    return updated
+
+
+def _actual(status=None):
+    applications = Application.objects.filter(job=OuterRef('pk'))
+    if status:
+        applications = applications.filter(status=status)
+    counted = applications.order_by().values('job').annotate(n=Count('*')).values('n')
+    return Coalesce(Subquery(counted), Value(0))
+
+
+def actual_counts():
+    """Subqueries computing each counter from the applications table."""
+    counts = {'applications_count': _actual()}
+    counts.update((status_field(status), _actual(status)) for status in STATUSES)
+    return counts
+
+
+def recount(jobs, dry_run=False):
+    """Repair the counters of the given jobs; returns how many had drifted."""
+    counts = actual_counts()
+    drifted = Q()
+    for field in counts:
+        drifted |= ~Q(**{field: F(f'actual_{field}')})
+    ids = list(
+        jobs.annotate(**{f'actual_{field}': expression for field, expression in counts.items()})
+        .filter(drifted).values_list('pk', flat=True)
+    )
+    if ids and not dry_run:
+        Job.objects.filter(pk__in=ids).update(**counts)
+    return len(ids)
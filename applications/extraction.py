@@ -0,0 +1,74 @@
+"""
+Plain-text extraction from resume files.
+
+Runs inside the process_resumes worker pool, so it must not touch Django
+models or the database: it takes a path and returns text.
+"""
+import os
+import zipfile
+from xml.etree import ElementTree
+
+# Longer resumes are truncated; nobody searches page 40 of a CV
+MAX_TEXT_LENGTH = 100_000
+
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+class ExtractionError(Exception):
+    pass
+
+
+class UnreadableResume(ExtractionError):
+    """The file itself cannot be extracted, so retrying will not help."""
+
+
+def extract_text(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.pdf':
+        text = _extract_pdf(path)
+    elif extension == '.docx':
+        text = _extract_docx(path)
+    elif extension == '.txt':
+        with open(path, 'rb') as f:
+            text = f.read(MAX_TEXT_LENGTH * 4).decode('utf-8', errors='replace')
+    else:
+        raise UnreadableResume(f'Unsupported resume format: {extension or "no extension"}')
+    return ' '.join(text.split())[:MAX_TEXT_LENGTH]
+
+
+def _extract_pdf(path):
+    try:
+        from pypdf import PdfReader
+        from pypdf.errors import PdfReadError
+    except ImportError:
+        raise ExtractionError('PDF extraction needs the pypdf package.')
+
+    try:
+        reader = PdfReader(path)
+        parts = []
+        length = 0
+        for page in reader.pages:
+            page_text = page.extract_text() or ''
+            parts.append(page_text)
+            length += len(page_text)
+            if length >= MAX_TEXT_LENGTH:
+                break
+        return '\n'.join(parts)
+    except (PdfReadError, ValueError, KeyError) as error:
+        raise UnreadableResume(f'Unreadable PDF: {error}')
+
+
+def _extract_docx(path):
+    try:
+        with zipfile.ZipFile(path) as archive, archive.open('word/document.xml') as document:
+            parts = []
+            # iterparse keeps memory flat on large documents
+            for _, element in ElementTree.iterparse(document):
+                if element.tag == WORD_NAMESPACE + 't' and element.text:
+                    parts.append(element.text)
+                elif element.tag == WORD_NAMESPACE + 'p':
+                    parts.append('\n')
+                    element.clear()
+            return ''.join(parts)
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as error:
+        raise UnreadableResume(f'Unreadable DOCX: {error}')
@@ -0,0 +1,273 @@
+"""
+Personalised job feeds for seekers, built from their application history.
+
+A seeker's profile is the job types, locations and text (the TF-IDF vectors
+from jobs/similarity.py) of the jobs they applied to. Recent jobs are scored
+against it and the best FEED_SIZE are stored as one SeekerFeed row, so the
+dashboard reads a ready-made list with two queries.
+
+- build_feeds() rescores every seeker (the build_seeker_feeds command).
+- refresh_stale_feeds() rebuilds the feeds of seekers who applied or
+  withdrew since; the signals only mark them in StaleSeekerFeed.
+- add_new_jobs() merges jobs posted since each feed was built into it.
+
+build_seeker_feeds --new-jobs, meant to run every few minutes, runs the
+last two.
+"""
+import math
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from scipy import sparse
+
+from jobs.models import Job
+from jobs.similarity import get_index
+from .models import Application, SeekerFeed, StaleSeekerFeed
+
+FEED_SIZE = 12
+
+# Only the newest jobs are worth recommending
+MAX_CANDIDATES = 5000
+
+TEXT_WEIGHT = 0.6
+TYPE_WEIGHT = 0.2
+LOCATION_WEIGHT = 0.2
+RECENCY_WEIGHT = 0.1
+RECENCY_HALF_LIFE_DAYS = 14
+
+SEEKER_BLOCK_SIZE = 500
+
+JOB_TYPES = {job_type: column for column, (job_type, _) in enumerate(Job.JOB_TYPE_CHOICES)}
+
+
+def _location(value):
+    return ' '.join(value.lower().split())
+
+
+class Candidates:
+    """The jobs being recommended: their vectors, types, locations and age."""
+
+    def __init__(self, index, rows):
+        now = timezone.now()
+        self.ids = [job_id for job_id, _, _, _ in rows]
+        self.types = np.array([JOB_TYPES.get(job_type, len(JOB_TYPES)) for _, job_type, _, _ in rows], dtype=np.int64)
+        self.locations = [_location(location) for _, _, location, _ in rows]
+        self.recency = np.array(
+            [0.5 ** ((now - created_at).total_seconds() / 86400 / RECENCY_HALF_LIFE_DAYS) for _, _, _, created_at in rows]
+        )
+        self.vectors = _vectors(index, self.ids)
+
+
+def _vectors(index, job_ids):
+    """TF-IDF rows for ``job_ids``, in order."""
+    # Only jobs created by another process since the index was fitted need their text loaded
+    missing = {job_id for job_id in job_ids if job_id not in index.rows}
+    texts = {
+        job_id: (title, description) for job_id, title, description
+        in Job.objects.filter(id__in=missing).values_list('id', 'title', 'description')
+    }
+    rows = [
+        index.matrix[index.rows[job_id]] if job_id in index.rows else index.vectorize(*texts.get(job_id, ('', '')))
+        for job_id in job_ids
+    ]
+    if not rows:
+        return sparse.csr_matrix((0, len(index.vocabulary)), dtype=np.float32)
+    return sparse.vstack(rows, format='csr')
+
+
+def _candidate_rows(queryset):
+    return list(queryset.values_list('id', 'job_type', 'location', 'created_at'))
+
+
+class Profiles:
+    """What a block of seekers applied to, as matrices with one row per seeker."""
+
+    def __init__(self, index, seeker_ids):
+        self.seeker_ids = list(seeker_ids)
+        position = {seeker_id: row for row, seeker_id in enumerate(self.seeker_ids)}
+        applications = list(
+            Application.objects.filter(applicant__in=self.seeker_ids)
+            .values_list('applicant_id', 'job_id', 'job__job_type', 'job__location')
+        )
+        self.applied = {}
+        for seeker_id, job_id, _, _ in applications:
+            self.applied.setdefault(seeker_id, set()).add(job_id)
+
+        vectors = _vectors(index, [job_id for _, job_id, _, _ in applications])
+
+        seekers = len(self.seeker_ids)
+        rows = np.array([position[seeker_id] for seeker_id, _, _, _ in applications], dtype=np.int64)
+        counts = np.bincount(rows, minlength=seekers).astype(np.float32)
+        counts[counts == 0] = 1
+        share = sparse.diags(1 / counts)
+
+        membership = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, np.arange(len(rows)))),
+            shape=(seekers, len(rows)),
+        )
+        text = membership @ vectors
+        norms = np.sqrt(np.asarray(text.multiply(text).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        self.text = sparse.csr_matrix(sparse.diags(1 / norms) @ text)
+
+        # The share of a seeker's applications per job type and location; the
+        # extra last column stays zero for values nobody applied to
+        types = np.array([JOB_TYPES.get(job_type, len(JOB_TYPES)) for _, _, job_type, _ in applications], dtype=np.int64)
+        self.types = np.zeros((seekers, len(JOB_TYPES) + 1), dtype=np.float32)
+        np.add.at(self.types, (rows, types), 1)
+        self.types = share @ self.types
+        self.types[:, -1] = 0
+
+        self.location_columns = {}
+        for _, _, _, location in applications:
+            self.location_columns.setdefault(_location(location), len(self.location_columns))
+        locations = np.array([self.location_columns[_location(row[3])] for row in applications], dtype=np.int64)
+        self.locations = np.zeros((seekers, len(self.location_columns) + 1), dtype=np.float32)
+        np.add.at(self.locations, (rows, locations), 1)
+        self.locations = share @ self.locations
+
+    def scores(self, candidates):
+        """(seekers x candidates) scores, -inf for jobs already applied to."""
+        locations = np.array(
+            [self.location_columns.get(location, len(self.location_columns)) for location in candidates.locations],
+            dtype=np.int64,
+        )
+        scores = (
+            TEXT_WEIGHT * (self.text @ candidates.vectors.T).toarray()
+            + TYPE_WEIGHT * self.types[:, candidates.types]
+            + LOCATION_WEIGHT * self.locations[:, locations]
+            + RECENCY_WEIGHT * candidates.recency
+        )
+        column = {job_id: position for position, job_id in enumerate(candidates.ids)}
+        for row, seeker_id in enumerate(self.seeker_ids):
+            for job_id in self.applied.get(seeker_id, ()):
+                if job_id in column:
+                    scores[row, column[job_id]] = -math.inf
+        return scores
+
+
+def _top(scores, ids, size):
+    """Best ``size`` (job_id, score) pairs of one row of scores."""
+    count = min(size, len(ids))
+    if not count:
+        return []
+    best = np.argpartition(-scores, count - 1)[:count]
+    best = best[np.argsort(-scores[best])]
+    return [[ids[column], round(float(scores[column]), 4)] for column in best if np.isfinite(scores[column])]
+
+
+def _seekers_with_applications():
+    return Application.objects.order_by('applicant_id').values_list('applicant_id', flat=True).distinct()
+
+
+def _blocks(values, size):
+    block = []
+    for value in values:
+        block.append(value)
+        if len(block) >= size:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+def build_feeds(block_size=SEEKER_BLOCK_SIZE):
+    """Rebuild every seeker's feed. Yields the number of seekers done so far."""
+    index = get_index()
+    last_job_id, candidates = _latest_candidates(index)
+
+    done = 0
+    for block in _blocks(_seekers_with_applications().iterator(), block_size):
+        _store_feeds(index, candidates, last_job_id, block)
+        done += len(block)
+        yield done
+
+    # Seekers who withdrew every application have nothing left to go on
+    SeekerFeed.objects.exclude(seeker__in=_seekers_with_applications()).delete()
+
+
+def _latest_candidates(index):
+    last_job_id = Job.objects.aggregate(last=Max('id'))['last'] or 0
+    return last_job_id, Candidates(index, _candidate_rows(Job.objects.order_by('-created_at', '-id')[:MAX_CANDIDATES]))
+
+
+def _store_feeds(index, candidates, last_job_id, seeker_ids):
+    profiles = Profiles(index, seeker_ids)
+    scores = profiles.scores(candidates)
+    feeds = [
+        SeekerFeed(seeker_id=seeker_id, entries=_top(scores[row], candidates.ids, FEED_SIZE), last_job_id=last_job_id)
+        for row, seeker_id in enumerate(seeker_ids) if seeker_id in profiles.applied
+    ]
+    SeekerFeed.objects.bulk_create(
+        feeds, update_conflicts=True, unique_fields=['seeker'],
+        update_fields=['entries', 'last_job_id', 'refreshed_at'],
+    )
+    SeekerFeed.objects.filter(seeker__in=[seeker_id for seeker_id in seeker_ids if seeker_id not in profiles.applied]).delete()
+
+
+def add_new_jobs(block_size=SEEKER_BLOCK_SIZE):
+    """Merge jobs posted since each feed was built into it. Returns (jobs, feeds) scored."""
+    oldest = SeekerFeed.objects.order_by('last_job_id').values_list('last_job_id', flat=True).first()
+    if oldest is None:
+        return 0, 0
+    rows = _candidate_rows(Job.objects.filter(id__gt=oldest).order_by('-id')[:MAX_CANDIDATES])
+    if not rows:
+        return 0, 0
+
+    index = get_index()
+    candidates = Candidates(index, rows)
+    newest = max(candidates.ids)
+    ids = np.array(candidates.ids)
+
+    now = timezone.now()
+    updated = 0
+    feeds = SeekerFeed.objects.filter(last_job_id__lt=newest).order_by('seeker_id').iterator()
+    for block in _blocks(feeds, block_size):
+        scores = Profiles(index, [feed.seeker_id for feed in block]).scores(candidates)
+        for row, feed in enumerate(block):
+            # Jobs at or below the feed's watermark were considered when it was built
+            scores[row, ids <= feed.last_job_id] = -math.inf
+            merged = dict((job_id, score) for job_id, score in feed.entries)
+            merged.update(_top(scores[row], candidates.ids, FEED_SIZE))
+            feed.entries = sorted(([job_id, score] for job_id, score in merged.items()), key=lambda entry: -entry[1])[:FEED_SIZE]
+            feed.last_job_id = newest
+            feed.refreshed_at = now
+        SeekerFeed.objects.bulk_update(block, ['entries', 'last_job_id', 'refreshed_at'])
+        updated += len(block)
+    return len(rows), updated
+
+
+def mark_stale(seeker_id):
+    """Queue a seeker for refresh_stale_feeds(); cheap enough for a request."""
+    StaleSeekerFeed.objects.bulk_create([StaleSeekerFeed(seeker_id=seeker_id)], ignore_conflicts=True)
+
+
+def refresh_stale_feeds(block_size=SEEKER_BLOCK_SIZE):
+    """Rebuild the feeds of the seekers queued by mark_stale(). Returns how many."""
+    index = candidates = None
+    done = 0
+    while True:
+        with transaction.atomic():
+            block = list(StaleSeekerFeed.objects.order_by('seeker_id').values_list('seeker_id', flat=True)[:block_size])
+            # Unqueued before scoring, so an application made meanwhile queues the seeker again
+            StaleSeekerFeed.objects.filter(seeker_id__in=block).delete()
+        if not block:
+            return done
+        if index is None:
+            index = get_index()
+            last_job_id, candidates = _latest_candidates(index)
+        _store_feeds(index, candidates, last_job_id, block)
+        done += len(block)
+
+
+def feed_jobs(seeker, limit=FEED_SIZE):
+    """The jobs of ``seeker``'s feed, best first, or [] when they have none."""
+    entries = SeekerFeed.objects.filter(seeker=seeker).values_list('entries', flat=True).first()
+    if not entries:
+        return []
+    ids = [job_id for job_id, _ in entries]
+    # Deleted jobs simply drop out
+    jobs = Job.objects.select_related('company').in_bulk(ids)
+    return [jobs[job_id] for job_id in ids if job_id in jobs][:limit]
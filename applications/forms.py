@@ -1,7 +1,14 @@
+import uuid
+
 from django import forms
+from django.template.defaultfilters import filesizeformat
 from .models import Application
+from .storage import resume_max_size
 
 class ApplicationForm(forms.ModelForm):
+    # A fresh key per rendered form, so resubmitting it can be told apart from applying twice
+    submission_key = forms.UUIDField(widget=forms.HiddenInput, required=False, initial=uuid.uuid4)
+
     class Meta:
         model = Application
         fields = ('cover_letter', 'resume')
@@ -20,4 +27,12 @@ class ApplicationForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields['cover_letter'].required = False
-        self.fields['resume'].required = False
\ No newline at end of file
+        self.fields['resume'].required = False
+
+    def clean_resume(self):
+        resume = self.cleaned_data.get('resume')
+        if resume and resume.size > resume_max_size():
+            raise forms.ValidationError(
+                f"Resume must be smaller than {filesizeformat(resume_max_size())}."
+            )
+        return resume
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from applications import feed
+
+
+class Command(BaseCommand):
+    help = (
+        "Precompute the recommended jobs shown on seekers' dashboards. Run it "
+        "nightly for a full rebuild and with --new-jobs every few minutes to "
+        "rebuild the feeds of seekers who applied or withdrew since, and merge "
+        "newly posted jobs into the existing feeds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--new-jobs', action='store_true',
+            help='Only rebuild feeds whose applications changed and score jobs posted since each feed was built.',
+        )
+        parser.add_argument(
+            '--block-size', type=int, default=feed.SEEKER_BLOCK_SIZE,
+            help=f'Seekers scored together (default: {feed.SEEKER_BLOCK_SIZE}).',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        if options['new_jobs']:
+            stale = feed.refresh_stale_feeds(options['block_size'])
+            jobs, feeds = feed.add_new_jobs(options['block_size'])
+            elapsed = time.monotonic() - started
+            self.stdout.write(self.style.SUCCESS(
+                f'Rebuilt {stale} changed feeds and merged {jobs} new jobs into {feeds} feeds in {elapsed:.1f}s.'
+            ))
+            return
+
+        total = 0
+        for total in feed.build_feeds(options['block_size']):
+            self.stdout.write(f'Built {total} feeds...')
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeker feeds rebuilt: {total} seekers in {elapsed:.1f}s.'
+        ))
@@ -0,0 +1,83 @@
+import os
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from applications.models import Application, ResumeBlob
+from applications.storage import resume_storage
+
+
+class Command(BaseCommand):
+    help = (
+        "Garbage-collect stored resumes: recount the applications using each "
+        "blob, then delete blobs and stray files nothing refers to."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours', type=float, default=24,
+            help='Keep unreferenced files younger than this, they may belong to an upload in progress (default: 24).',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted.')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+
+        # Repair reference counts that drifted, e.g. after a failed save or an admin edit
+        references = dict(
+            Application.objects.exclude(resume='').exclude(resume__isnull=True)
+            .order_by().values_list('resume').annotate(count=Count('id'))
+        )
+        repaired = 0
+        for blob in ResumeBlob.objects.iterator():
+            actual = references.get(blob.name, 0)
+            if blob.ref_count != actual:
+                repaired += 1
+                if not dry_run:
+                    ResumeBlob.objects.filter(pk=blob.pk).update(ref_count=actual)
+
+        deleted = 0
+        unreferenced = ResumeBlob.objects.filter(ref_count=0, created_at__lt=cutoff)
+        for blob in unreferenced.iterator():
+            if blob.name in references:
+                continue
+            if not dry_run:
+                with transaction.atomic():
+                    # Checked again as the row goes: an upload of the same content
+                    # refreshes created_at first, and then waits for this transaction
+                    if not unreferenced.filter(pk=blob.pk).delete()[0]:
+                        continue
+                    resume_storage.delete(blob.name)
+            deleted += 1
+            self.stdout.write(f'Deleting unreferenced blob {blob.name}')
+
+        stray = self.delete_stray_files(references, cutoff, dry_run)
+
+        prefix = '[dry run] ' if dry_run else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}{repaired} reference counts repaired, {deleted} blobs and {stray} stray files deleted.'
+        ))
+
+    def delete_stray_files(self, references, cutoff, dry_run):
+        # Files on disk with no blob row: interrupted uploads or files from before content addressing
+        known = set(ResumeBlob.objects.values_list('name', flat=True)) | set(references)
+        root = resume_storage.path('resumes')
+        deleted = 0
+        for directory, _, files in os.walk(root):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, resume_storage.location).replace(os.sep, '/')
+                if name in known:
+                    continue
+                modified = datetime.fromtimestamp(os.path.getmtime(path), tz=dt_timezone.utc)
+                if modified >= cutoff:
+                    continue
+                deleted += 1
+                self.stdout.write(f'Deleting stray file {name}')
+                if not dry_run:
+                    os.remove(path)
+        return deleted
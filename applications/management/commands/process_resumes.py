@@ -0,0 +1,76 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+
+from applications.extraction import extract_text
+from applications.tasks import claim_tasks, complete_task, fail_task, new_worker_id, requeue_stale_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the resume text extraction worker: claim queued resumes from the "
+        "database and extract their text in a pool of processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Extraction processes (default: 2).')
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Tasks claimed at a time (default: 4 per worker).',
+        )
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty.')
+        parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds to wait when idle.')
+        parser.add_argument('--max-attempts', type=int, default=3, help='Tries before a task is failed.')
+        parser.add_argument(
+            '--stale-after', type=int, default=600,
+            help='Requeue running tasks claimed longer ago than this many seconds (default: 600).',
+        )
+
+    def handle(self, *args, **options):
+        workers = max(options['workers'], 1)
+        batch_size = options['batch_size'] or workers * 4
+        worker_id = new_worker_id()
+        done = failed = 0
+        started = time.monotonic()
+
+        self.requeue(options['stale_after'])
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            while True:
+                tasks = claim_tasks(worker_id, batch_size)
+                if not tasks:
+                    # A peer that died mid-batch left its tasks running; an idle worker takes them back
+                    if self.requeue(options['stale_after']):
+                        continue
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                # Only paths go to the pool; all database work stays in this process
+                futures = {
+                    pool.submit(extract_text, task.application.resume.path): task
+                    for task in tasks
+                }
+                for future in as_completed(futures):
+                    task = futures[future]
+                    try:
+                        text = future.result()
+                    except Exception as error:
+                        failed += 1
+                        fail_task(task, error, options['max_attempts'])
+                        self.stderr.write(f'Application {task.application_id}: {error}')
+                    else:
+                        done += 1
+                        complete_task(task, text)
+
+                elapsed = time.monotonic() - started
+                self.stdout.write(f'{done} resumes extracted, {failed} failed ({done / elapsed:.1f}/s)')
+
+        self.stdout.write(self.style.SUCCESS(f'Queue empty: {done} resumes extracted, {failed} failed.'))
+
+    def requeue(self, stale_after):
+        requeued = requeue_stale_tasks(stale_after)
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} stale tasks.')
+        return requeued
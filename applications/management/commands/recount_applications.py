@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from applications.counters import recount
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the application counters stored on each job and repair "
+        "the ones that drifted from the applications table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job', type=int, action='append', dest='jobs', help='Only this job id (repeatable).')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Jobs checked per query (default: 5000).')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many counters drifted.')
+
+    def handle(self, *args, **options):
+        jobs = Job.objects.order_by('pk')
+        if options['jobs']:
+            jobs = jobs.filter(pk__in=options['jobs'])
+
+        # Walk the jobs in batches so no single statement holds locks for long
+        repaired = checked = 0
+        last_id = 0
+        while True:
+            batch = list(jobs.filter(pk__gt=last_id).values_list('pk', flat=True)[:options['batch_size']])
+            if not batch:
+                break
+            repaired += recount(Job.objects.filter(pk__in=batch), options['dry_run'])
+            checked += len(batch)
+            last_id = batch[-1]
+
+        prefix = '[dry run] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(f'{prefix}{checked} jobs checked, {repaired} repaired.'))
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:11
+
+import applications.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("applications", "0002_application_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResumeBlob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255, unique=True)),
+                ("size", models.PositiveBigIntegerField()),
+                ("ref_count", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="application",
+            name="resume",
+            field=models.FileField(
+                blank=True,
+                null=True,
+                storage=applications.storage.get_resume_storage,
+                upload_to="resumes/",
+            ),
+        ),
+    ]
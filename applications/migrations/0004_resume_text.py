@@ -0,0 +1,108 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Keyword search over extracted resume text, maintained by applications/search.py:
+# an FTS5 table on SQLite, a GIN expression index on PostgreSQL.
+SEARCH_FORWARD = {
+    "sqlite": [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS applications_resume_fts USING fts5(
+            text, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+        )
+        """,
+    ],
+    "postgresql": [
+        """
+        CREATE INDEX IF NOT EXISTS applications_resumetext_search_gin
+        ON applications_resumetext USING GIN (to_tsvector('english', text))
+        """,
+    ],
+}
+
+SEARCH_BACKWARD = {
+    "sqlite": ["DROP TABLE IF EXISTS applications_resume_fts"],
+    "postgresql": ["DROP INDEX IF EXISTS applications_resumetext_search_gin"],
+}
+
+
+def run(statements_by_vendor):
+    def operation(apps, schema_editor):
+        for sql in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("applications", "0003_resume_storage"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResumeText",
+            fields=[
+                (
+                    "application",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="resume_text",
+                        serialize=False,
+                        to="applications.application",
+                    ),
+                ),
+                ("text", models.TextField(blank=True)),
+                ("extracted_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ResumeExtractionTask",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("queued", "Queued"),
+                            ("running", "Running"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="queued",
+                        max_length=10,
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("claimed_by", models.CharField(blank=True, max_length=64)),
+                ("claimed_at", models.DateTimeField(blank=True, null=True)),
+                ("error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "application",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="extraction_task",
+                        to="applications.application",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["status", "id"], name="extraction_task_status_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(run(SEARCH_FORWARD), run(SEARCH_BACKWARD)),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("applications", "0005_seeker_feed"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="application",
+            name="submission_key",
+            field=models.UUIDField(blank=True, editable=False, null=True, unique=True),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.conf import settings
 from jobs.models import Job
+from .storage import get_resume_storage
 
 class Application(models.Model):
     STATUS_CHOICES = [
@@ -13,14 +14,90 @@ class Application(models.Model):
     job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='applications')
     applicant = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     cover_letter = models.TextField(blank=True, null=True)
-    resume = models.FileField(upload_to='resumes/', blank=True, null=True)
+    resume = models.FileField(upload_to='resumes/', storage=get_resume_storage, blank=True, null=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     applied_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Sent with the apply form; a resubmitted form finds its own application (see apply_for_job)
+    submission_key = models.UUIDField(null=True, blank=True, unique=True, editable=False)
     
     class Meta:
         unique_together = ('job', 'applicant')  # Prevent duplicate applications
         ordering = ['-applied_at']
+        indexes = [
+            models.Index(fields=['job', 'applied_at'], name='application_job_applied_idx'),
+            models.Index(fields=['job', 'status', 'applied_at'], name='application_job_status_idx'),
+            models.Index(fields=['applicant', 'applied_at'], name='application_applicant_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.applicant.username} applied for {self.job.title}"
\ No newline at end of file
+        return f"{self.applicant.username} applied for {self.job.title}"
+
+
+# One row per stored resume file; identical uploads share a blob
+class ResumeBlob(models.Model):
+    name = models.CharField(max_length=255, unique=True)  # path inside the resume storage
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)  # applications using this file
+    created_at = models.DateTimeField(auto_now_add=True)  # refreshed whenever the content is uploaded again
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+
+# Plain text pulled out of an application's resume by the process_resumes worker
+class ResumeText(models.Model):
+    application = models.OneToOneField(Application, on_delete=models.CASCADE, primary_key=True, related_name='resume_text')
+    text = models.TextField(blank=True)
+    extracted_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Resume text for application {self.application_id}"
+
+
+# Database-backed queue of resumes waiting for text extraction
+class ResumeExtractionTask(models.Model):
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    application = models.OneToOneField(Application, on_delete=models.CASCADE, related_name='extraction_task')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    claimed_by = models.CharField(max_length=64, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Workers pick the oldest queued tasks first
+            models.Index(fields=['status', 'id'], name='extraction_task_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"Extract resume of application {self.application_id} ({self.status})"
+
+
+# Each seeker's recommended jobs, precomputed by applications/feed.py for the dashboard
+class SeekerFeed(models.Model):
+    seeker = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='job_feed')
+    entries = models.JSONField(default=list)  # [[job_id, score], ...], best first
+    last_job_id = models.BigIntegerField(default=0)  # newest job already considered
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Job feed for user {self.seeker_id}"
+
+
+# Seekers whose applications changed since their feed was built; the
+# frequent build_seeker_feeds --new-jobs run rebuilds them
+class StaleSeekerFeed(models.Model):
+    seeker = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='+')
+    marked_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Job feed for user {self.seeker_id} is stale"
@@ -0,0 +1,59 @@
+"""
+Keyword search over the text extracted from applicants' resumes.
+
+Mirrors jobs/search.py: SQLite keeps an FTS5 table (applications_resume_fts,
+rowid = application id) filled by the process_resumes worker, PostgreSQL
+uses a GIN expression index on ResumeText.text. Both come from migration 0004.
+"""
+from django.db import connection
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+
+from jobs.search import backend, match_expression, tokenize
+
+FTS_TABLE = 'applications_resume_fts'
+
+
+def index_resume_text(application_id, text):
+    if backend() != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [application_id])
+        cursor.execute(f"INSERT INTO {FTS_TABLE} (rowid, text) VALUES (%s, %s)", [application_id, text])
+
+
+def unindex_resume_text(application_id):
+    if backend() != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [application_id])
+
+
+def unindex_resume_texts(resume_texts):
+    """Drop the index rows of a ResumeText queryset with one statement."""
+    if backend() != 'sqlite':
+        return
+    sql, params = resume_texts.values('application_id').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({sql})", params)
+
+
+def filter_by_resume_text(queryset, query):
+    """Keep the applications whose resume mentions every word of ``query``."""
+    tokens = tokenize(query)
+    if not tokens:
+        return queryset.none()
+
+    if backend() == 'sqlite':
+        sql = f"applications_application.id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)"
+    elif backend() == 'postgresql':
+        sql = (
+            "applications_application.id IN (SELECT application_id FROM applications_resumetext "
+            "WHERE to_tsvector('english', text) @@ to_tsquery('english', %s))"
+        )
+    else:
+        for token in tokens:
+            queryset = queryset.filter(resume_text__text__icontains=token)
+        return queryset
+
+    return queryset.filter(RawSQL(sql, (match_expression(tokens),), output_field=BooleanField()))
@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.db.models import F, Q, QuerySet
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from jobs.models import Job
+from . import feed
+from .models import Application, ResumeBlob, ResumeText
+from .search import unindex_resume_text, unindex_resume_texts
+from .tasks import enqueue
+
+
+# Count the applications sharing each stored resume, see applications/storage.py
+@receiver(post_save, sender=Application)
+def reference_resume(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw and instance.resume:
+        ResumeBlob.objects.filter(name=instance.resume.name).update(ref_count=F('ref_count') + 1)
+
+
+@receiver(post_delete, sender=Application)
+def release_resume(sender, instance, **kwargs):
+    if instance.resume:
+        ResumeBlob.objects.filter(name=instance.resume.name, ref_count__gt=0).update(
+            ref_count=F('ref_count') - 1
+        )
+
+
+# Extract the resume text in the background (see applications/tasks.py)
+@receiver(post_save, sender=Application)
+def queue_resume_extraction(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw and instance.resume:
+        enqueue(instance)
+
+
+@receiver(post_delete, sender=Application)
+def unindex_resume(sender, instance, origin=None, **kwargs):
+    # Cascades are unindexed in one statement by the receivers below
+    if instance.resume and not _cascaded(origin):
+        unindex_resume_text(instance.pk)
+
+
+# Before the cascade removes the ResumeText rows the statement selects from
+@receiver(pre_delete, sender=Job)
+def unindex_job_resumes(sender, instance, **kwargs):
+    unindex_resume_texts(ResumeText.objects.filter(application__job=instance))
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def unindex_user_resumes(sender, instance, **kwargs):
+    unindex_resume_texts(ResumeText.objects.filter(
+        Q(application__applicant=instance) | Q(application__job__company=instance)
+    ))
+
+
+# A seeker's feed follows their applications, see applications/feed.py. It
+# is only marked here; a job deleted with its applications simply drops
+# out of feeds until the next full build.
+@receiver(post_save, sender=Application)
+@receiver(post_delete, sender=Application)
+def mark_seeker_feed_stale(sender, instance, created=False, raw=False, origin=None, **kwargs):
+    if raw or (kwargs['signal'] is post_save and not created):
+        return
+    if kwargs['signal'] is post_delete and _cascaded(origin):
+        return
+    feed.mark_stale(instance.applicant_id)
+
+
+def _cascaded(origin):
+    # origin is the instance or queryset delete() was called on
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is not Application
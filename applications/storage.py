@@ -0,0 +1,86 @@
+"""
+Content-addressed storage for application resumes.
+
+Uploads are streamed chunk by chunk into a temporary file while being
+hashed, then moved to ``resumes/<aa>/<sha256><ext>``. A seeker sending the
+same CV to many jobs therefore stores it once; ResumeBlob rows count the
+applications pointing at each file so gc_resumes can remove unused ones.
+"""
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+
+RESUME_EXTENSIONS = {'.pdf', '.doc', '.docx', '.txt'}
+
+
+def resume_max_size():
+    return getattr(settings, 'RESUME_MAX_UPLOAD_SIZE', 5 * 1024 * 1024)
+
+
+class ResumeTooLarge(SuspiciousFileOperation):
+    pass
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # The final name comes from the content, see _save()
+        return name
+
+    def _save(self, name, content):
+        from .models import ResumeBlob
+
+        directory = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        if extension not in RESUME_EXTENSIONS:
+            extension = ''
+
+        limit = resume_max_size()
+        staging = self.path(directory)
+        os.makedirs(staging, exist_ok=True)
+
+        digest = hashlib.sha256()
+        size = 0
+        handle, temp_path = tempfile.mkstemp(dir=staging, prefix='.upload-')
+        try:
+            with os.fdopen(handle, 'wb') as temp:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    size += len(chunk)
+                    if size > limit:
+                        raise ResumeTooLarge(f'Resume exceeds {limit} bytes.')
+                    digest.update(chunk)
+                    temp.write(chunk)
+
+            hexdigest = digest.hexdigest()
+            final_name = os.path.join(directory, hexdigest[:2], hexdigest + extension)
+            final_path = self.path(final_name)
+            # Claim the blob before looking at the file: gc_resumes deletes a
+            # blob's row and file together, and skips blobs touched recently
+            if not ResumeBlob.objects.filter(name=final_name).update(created_at=timezone.now()):
+                ResumeBlob.objects.get_or_create(name=final_name, defaults={'size': size})
+            if os.path.exists(final_path):
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(temp_path, self.file_permissions_mode)
+                os.replace(temp_path, final_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        return final_name.replace('\\', '/')
+
+
+resume_storage = ContentAddressedStorage()
+
+
+def get_resume_storage():
+    return resume_storage
@@ -0,0 +1,69 @@
+"""
+Database-backed queue for resume text extraction.
+
+Saving an application with a resume queues a ResumeExtractionTask; the
+process_resumes command claims tasks in batches, extracts the text in a
+process pool and stores it. Claiming is safe with several workers running:
+a task only moves from queued to running once.
+"""
+import uuid
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .extraction import UnreadableResume
+from .models import ResumeExtractionTask, ResumeText
+from .search import index_resume_text
+
+
+def new_worker_id():
+    return uuid.uuid4().hex
+
+
+def enqueue(application):
+    ResumeExtractionTask.objects.update_or_create(
+        application=application,
+        defaults={'status': 'queued', 'attempts': 0, 'error': '', 'claimed_by': '', 'claimed_at': None},
+    )
+
+
+def claim_tasks(worker_id, limit):
+    now = timezone.now()
+    with transaction.atomic():
+        queued = ResumeExtractionTask.objects.filter(status='queued').order_by('id')
+        if connection.features.has_select_for_update_skip_locked:
+            queued = queued.select_for_update(skip_locked=True)
+        ids = list(queued.values_list('id', flat=True)[:limit])
+        # Re-checking the status makes the claim safe where SKIP LOCKED is unavailable
+        ResumeExtractionTask.objects.filter(id__in=ids, status='queued').update(
+            status='running', claimed_by=worker_id, claimed_at=now, attempts=F('attempts') + 1,
+        )
+    return list(
+        ResumeExtractionTask.objects.filter(id__in=ids, status='running', claimed_by=worker_id)
+        .select_related('application')
+    )
+
+
+def complete_task(task, text):
+    with transaction.atomic():
+        ResumeText.objects.update_or_create(application_id=task.application_id, defaults={'text': text})
+        index_resume_text(task.application_id, text)
+        ResumeExtractionTask.objects.filter(pk=task.pk).update(status='done', error='')
+
+
+def fail_task(task, error, max_attempts):
+    # Give up for good on files that cannot be read or once the attempts run
+    # out, otherwise try again later
+    permanent = isinstance(error, UnreadableResume) or task.attempts >= max_attempts
+    status = 'failed' if permanent else 'queued'
+    ResumeExtractionTask.objects.filter(pk=task.pk).update(status=status, error=str(error)[:2000])
+
+
+def requeue_stale_tasks(timeout):
+    """Put back tasks whose worker died mid-way."""
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    return ResumeExtractionTask.objects.filter(status='running', claimed_at__lt=cutoff).update(
+        status='queued', claimed_by=''
+    )
@@ -1,3 +1,572 @@
-from django.test import TestCase
+import csv
+import re
+import tempfile
+import threading
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.models import Job
+from jobportal.testing import (
+    PLAIN_STATIC_STORAGE, QueryBudgetTestCase, QueryPlanTestCase, make_application, make_company, make_job, make_seeker,
+)
+from . import counters
+from .extraction import extract_text
+from .feed import feed_jobs
+from .models import Application, ResumeBlob, ResumeExtractionTask, ResumeText, SeekerFeed, StaleSeekerFeed
+from .search import index_resume_text
+from .storage import resume_storage
+from .tasks import claim_tasks
+
+
+class ApplicationViewQueryBudgetTests(QueryBudgetTestCase):
+    def test_my_applications(self):
+        seeker = make_seeker()
+        self.assertConstantQueries(
+            reverse('my_applications'),
+            lambda n: [make_application(applicant=seeker) for _ in range(n)],
+            user=seeker,
+        )
+
+    def test_applicants_list(self):
+        company = make_company()
+        job = make_job(company)
+        self.assertConstantQueries(
+            reverse('applicants_list', args=[job.id]),
+            lambda n: [make_application(job) for _ in range(n)],
+            user=company,
+        )
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGE)
+class ApplicationCounterTests(TestCase):
+    def setUp(self):
+        self.company = make_company()
+        self.job = make_job(self.company)
+
+    def counts(self):
+        self.job.refresh_from_db()
+        return (self.job.applications_count, self.job.pending_count, self.job.reviewed_count)
+
+    def test_views_keep_counters_in_step(self):
+        seekers = [make_seeker(), make_seeker()]
+        for seeker in seekers:
+            self.client.force_login(seeker)
+            self.client.post(reverse('apply_for_job', args=[self.job.id]), {'cover_letter': 'Hi'})
+        self.assertEqual(self.counts(), (2, 2, 0))
+
+        first, second = Application.objects.order_by('id')
+        self.client.force_login(self.company)
+        self.client.post(reverse('update_application_status', args=[first.id]), {'status': 'reviewed'})
+        self.assertEqual(self.counts(), (2, 1, 1))
+
+        self.client.force_login(seekers[1])
+        self.client.post(reverse('withdraw_application', args=[second.id]))
+        self.assertEqual(self.counts(), (1, 0, 1))
+
+        self.client.force_login(self.company)
+        response = self.client.get(reverse('my_jobs'))
+        self.assertEqual(response.context['total_applications'], 1)
+        self.assertEqual(response.context['pending_applications'], 0)
+
+    def test_concurrent_withdraw_counts_once(self):
+        seeker = make_seeker()
+        self.client.force_login(seeker)
+        self.client.post(reverse('apply_for_job', args=[self.job.id]), {'cover_letter': 'Hi'})
+        application = Application.objects.get()
+        self.client.post(reverse('withdraw_application', args=[application.id]))
+        self.assertEqual(self.counts(), (0, 0, 0))
+
+        # A second request that loaded the application before the first deleted it
+        counters.application_added(self.job.id)
+        with patch('applications.views.get_object_or_404', return_value=application):
+            response = self.client.post(reverse('withdraw_application', args=[application.id]), follow=True)
+        self.assertContains(response, 'You can only withdraw pending applications.')
+        self.assertEqual(self.counts(), (1, 1, 0))
+
+    def test_editing_a_job_keeps_concurrent_counts(self):
+        stale = Job.objects.get(pk=self.job.pk)
+        counters.application_added(self.job.id)
+        self.client.force_login(self.company)
+        with patch('jobs.views.get_object_or_404', return_value=stale):
+            self.client.post(reverse('edit_job', args=[self.job.id]), {
+                'title': 'Renamed', 'description': 'Role', 'location': 'Berlin', 'job_type': 'FULL_TIME',
+            })
+        self.assertEqual(self.counts(), (1, 1, 0))
+        self.assertEqual(self.job.title, 'Renamed')
+
+    def test_recount_repairs_drift(self):
+        make_application(self.job)
+        make_application(self.job, status='reviewed')
+        other = make_job(self.company)
+        out = StringIO()
+        call_command('recount_applications', stdout=out)
+        self.assertIn('2 jobs checked, 1 repaired', out.getvalue())
+        self.assertEqual(self.counts(), (2, 1, 1))
+
+        call_command('recount_applications', '--job', str(other.id), stdout=out)
+        self.assertIn('1 jobs checked, 0 repaired', out.getvalue())
+
+    def test_recount_only_touches_the_jobs_asked_for(self):
+        jobs = [make_job(self.company) for _ in range(3)]
+        Job.objects.update(applications_count=7)
+        out = StringIO()
+        call_command('recount_applications', '--job', str(jobs[0].id), '--job', str(jobs[2].id), stdout=out)
+        self.assertIn('2 jobs checked, 2 repaired', out.getvalue())
+        self.assertEqual(Job.objects.get(pk=jobs[1].pk).applications_count, 7)
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGE)
+class ApplicantsListTests(TestCase):
+    def setUp(self):
+        self.company = make_company()
+        self.job = make_job(self.company)
+        now = timezone.now()
+        self.applications = []
+        for days_ago in range(30):
+            application = make_application(self.job, status='reviewed' if days_ago % 3 == 0 else 'pending')
+            Application.objects.filter(pk=application.pk).update(applied_at=now - timedelta(days=days_ago))
+            self.applications.append(application)
+        call_command('recount_applications', stdout=StringIO())
+        self.client.force_login(self.company)
+        self.url = reverse('applicants_list', args=[self.job.id])
+
+    def test_pages_and_filters(self):
+        first = self.client.get(self.url).context['page_obj']
+        self.assertEqual(len(first), 25)
+        self.assertEqual(first[0], self.applications[0])
+        second = self.client.get(self.url, {'cursor': first.next_cursor}).context['page_obj']
+        self.assertEqual(list(second), self.applications[25:])
+
+        reviewed = self.client.get(self.url, {'status': 'reviewed'}).context['applications']
+        self.assertEqual(list(reviewed), self.applications[::3])
+        week = self.client.get(self.url, {
+            'applied_from': (timezone.localdate() - timedelta(days=6)).isoformat(),
+            'applied_to': timezone.localdate().isoformat(),
+        }).context['applications']
+        self.assertEqual(list(week), self.applications[:7])
+        # Bad dates are ignored
+        self.assertEqual(len(self.client.get(self.url, {'applied_from': '2024-02-30'}).context['applications']), 25)
+
+    def test_bulk_update_is_one_scoped_update(self):
+        other = make_application(make_job())
+        selected = [application.id for application in self.applications[:4]] + [other.id]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse('bulk_update_status', args=[self.job.id]),
+                {'status': 'accepted', 'application_ids': selected, 'return_query': 'status=pending'},
+            )
+        self.assertRedirects(response, self.url + '?status=pending', fetch_redirect_response=False)
+        updates = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE "applications_application"')]
+        self.assertEqual(len(updates), 1)
+
+        self.assertEqual(Application.objects.filter(status='accepted').count(), 4)
+        self.assertEqual(Application.objects.get(pk=other.pk).status, 'pending')
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.accepted_count, self.job.pending_count, self.job.reviewed_count), (4, 18, 8))
+
+    def test_other_companies_cannot_bulk_update(self):
+        self.client.force_login(make_company())
+        self.client.post(
+            reverse('bulk_update_status', args=[self.job.id]),
+            {'status': 'rejected', 'application_ids': [self.applications[0].id]},
+        )
+        self.assertFalse(Application.objects.filter(status='rejected').exists())
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGE)
+class ApplicantExportTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        override = override_settings(MEDIA_ROOT=media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.company = make_company()
+        self.job = make_job(self.company, title='Data Engineer')
+        self.with_resume = make_application(
+            self.job, make_seeker(username='ada', email='ada@example.com'),
+            resume=SimpleUploadedFile('cv.txt', b'cv'),
+        )
+        make_application(self.job, make_seeker(username='=cmd', email='x@example.com'), status='accepted')
+        make_application(make_job(), make_seeker(username='elsewhere'))
+        self.client.force_login(self.company)
+
+    def export(self, format, **params):
+        response = self.client.get(reverse('export_applicants', args=[self.job.id, format]), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn(f'data-engineer-{self.job.id}-applicants.{format}', response['Content-Disposition'])
+        return b''.join(response.streaming_content)
+
+    def test_csv(self):
+        rows = list(csv.reader(self.export('csv').decode('utf-8-sig').splitlines()))
+        self.assertEqual(rows[0], ['Username', 'Email', 'Status', 'Applied at', 'Resume'])
+        self.assertEqual([row[:3] for row in rows[1:]], [
+            ['ada', 'ada@example.com', 'Pending'],
+            ["'=cmd", 'x@example.com', 'Accepted'],
+        ])
+        self.assertEqual(rows[1][4], 'http://testserver' + reverse('download_resume', args=[self.with_resume.id]))
+        self.assertEqual(rows[2][4], '')
+
+        accepted = list(csv.reader(self.export('csv', status='accepted').decode('utf-8-sig').splitlines()))
+        self.assertEqual(len(accepted), 2)
+
+    def test_xlsx(self):
+        with zipfile.ZipFile(BytesIO(self.export('xlsx'))) as archive:
+            self.assertIsNone(archive.testzip())
+            sheet = archive.read('xl/worksheets/sheet1.xml').decode()
+        rows = re.findall(r'<row r="\d+">(.*?)</row>', sheet)
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(re.findall(r'<t>(.*?)</t>', rows[2])[:3], ['=cmd', 'x@example.com', 'Accepted'])
+
+    def test_only_the_owning_company_can_export(self):
+        self.client.force_login(make_company())
+        self.assertEqual(self.client.get(reverse('export_applicants', args=[self.job.id, 'csv'])).status_code, 404)
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGE)
+class ApplyTests(TestCase):
+    def setUp(self):
+        self.job = make_job()
+        self.seeker = make_seeker()
+        self.client.force_login(self.seeker)
+        self.url = reverse('apply_for_job', args=[self.job.id])
+
+    def last_message(self, response):
+        # Redirects are not followed, so earlier messages are still queued
+        return [str(message) for message in response.wsgi_request._messages][-1]
+
+    def test_resubmitted_form_is_not_an_error(self):
+        form = self.client.get(self.url).context['form']
+        data = {'cover_letter': 'Hi', 'submission_key': form['submission_key'].value()}
+        self.client.post(self.url, data)
+        # Session, user and job, then the refused INSERT in its savepoint and one lookup
+        with self.assertNumQueries(8):
+            response = self.client.post(self.url, data)
+        self.assertEqual(self.last_message(response), 'Your application has been submitted successfully!')
+
+        # A second form for the same job is a second application
+        response = self.client.post(self.url, {'cover_letter': 'Hi again', 'submission_key': str(uuid.uuid4())})
+        self.assertEqual(self.last_message(response), 'You have already applied for this job.')
+        self.assertEqual(Application.objects.get().cover_letter, 'Hi')
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.applications_count, 1)
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGE)
+class ConcurrentApplyTests(TransactionTestCase):
+    threads = 8
+
+    def test_concurrent_submissions_create_one_application(self):
+        job = make_job()
+        client = Client()
+        client.force_login(make_seeker())
+        url = reverse('apply_for_job', args=[job.id])
+        key = str(uuid.uuid4())
+        start = threading.Barrier(self.threads)
+        statuses, errors = [], []
+
+        def submit(number):
+            try:
+                seeker = Client()
+                seeker.cookies = client.cookies
+                # Half resend one form (double clicks), half come from separate tabs
+                data = {'cover_letter': 'Hi', 'submission_key': key if number % 2 else str(uuid.uuid4())}
+                start.wait()
+                statuses.append(seeker.post(url, data).status_code)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=submit, args=(number,)) for number in range(self.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(statuses, [302] * self.threads)
+        self.assertEqual(Application.objects.count(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.applications_count, 1)
+
+
+class ApplicationQueryPlanTests(QueryPlanTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = make_company()
+        cls.seeker = make_seeker()
+        cls.job = make_job(cls.company)
+        for _ in range(5):
+            make_application(cls.job)
+        make_application(cls.job, cls.seeker)
+
+    def test_my_applications(self):
+        self.assertIndexedQueries(reverse('my_applications'), user=self.seeker)
+
+    def test_applicants_list(self):
+        self.assertIndexedQueries(reverse('applicants_list', args=[self.job.id]), user=self.company)
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGE)
+class ResumeStorageTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        override = override_settings(MEDIA_ROOT=media.name, RESUME_MAX_UPLOAD_SIZE=1024)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.seeker = make_seeker()
+
+    def apply(self, job, content, name='cv.pdf'):
+        self.client.force_login(self.seeker)
+        return self.client.post(
+            reverse('apply_for_job', args=[job.id]),
+            {'cover_letter': 'Hi', 'resume': SimpleUploadedFile(name, content)},
+        )
+
+    def test_identical_uploads_are_stored_once(self):
+        first, second = make_job(), make_job()
+        self.apply(first, b'%PDF same cv')
+        self.apply(second, b'%PDF same cv')
+
+        names = set(Application.objects.values_list('resume', flat=True))
+        self.assertEqual(len(names), 1)
+        name = names.pop()
+        self.assertRegex(name, r'^resumes/[0-9a-f]{2}/[0-9a-f]{64}\.pdf$')
+        self.assertEqual(ResumeBlob.objects.get(name=name).ref_count, 2)
+
+    def test_oversized_upload_is_rejected(self):
+        job = make_job()
+        response = self.apply(job, b'x' * 5000)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('resume', response.context['form'].errors)
+        self.assertFalse(Application.objects.exists())
+        self.assertFalse(ResumeBlob.objects.exists())
+
+    def test_gc_removes_unreferenced_blobs(self):
+        job = make_job()
+        self.apply(job, b'%PDF old cv')
+        application = Application.objects.get()
+        name = application.resume.name
+        self.assertTrue(resume_storage.exists(name))
+
+        application.delete()
+        self.assertEqual(ResumeBlob.objects.get(name=name).ref_count, 0)
+        call_command('gc_resumes', '--grace-hours', '0', stdout=StringIO())
+        self.assertFalse(resume_storage.exists(name))
+        self.assertFalse(ResumeBlob.objects.exists())
+
+    def test_reupload_restarts_the_grace_period(self):
+        self.apply(make_job(), b'%PDF reused cv')
+        application = Application.objects.get()
+        name = application.resume.name
+        application.delete()
+        ResumeBlob.objects.update(created_at=timezone.now() - timedelta(days=2))
+
+        # Stored again but not referenced yet, as while an application is being saved
+        self.assertEqual(resume_storage.save('resumes/cv.pdf', ContentFile(b'%PDF reused cv')), name)
+        call_command('gc_resumes', '--grace-hours', '24', stdout=StringIO())
+        self.assertTrue(resume_storage.exists(name))
+        self.assertTrue(ResumeBlob.objects.filter(name=name).exists())
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGE)
+class ResumeDownloadTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        override = override_settings(MEDIA_ROOT=media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.company = make_company()
+        self.seeker = make_seeker(username='jane')
+        self.application = make_application(make_job(self.company), self.seeker)
+        self.application.resume.save('cv.pdf', ContentFile(b'0123456789'))
+        self.url = reverse('download_resume', args=[self.application.id])
+
+    def test_only_the_owning_company_can_download(self):
+        self.client.force_login(self.seeker)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.client.force_login(make_company())
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_file_response_with_ranges_and_conditional_get(self):
+        self.client.force_login(self.company)
+        response = self.client.get(self.url)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+        self.assertIn('jane-resume.pdf', response['Content-Disposition'])
+
+        partial = self.client.get(self.url, headers={'Range': 'bytes=2-4'})
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial['Content-Range'], 'bytes 2-4/10')
+        self.assertEqual(b''.join(partial.streaming_content), b'234')
+
+        self.assertEqual(self.client.get(self.url, headers={'Range': 'bytes=20-'}).status_code, 416)
+        self.assertEqual(self.client.get(self.url, headers={'If-None-Match': response['ETag']}).status_code, 304)
+
+    @override_settings(RESUME_SENDFILE='x-accel-redirect')
+    def test_accel_redirect_hands_off_to_proxy(self):
+        self.client.force_login(self.company)
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/' + self.application.resume.name)
+        self.assertEqual(response.content, b'')
+
+
+def _docx(text):
+    document = (
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body><w:p><w:r><w:t>{text}</w:t></w:r></w:p></w:body></w:document>'
+    )
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('word/document.xml', document)
+    return buffer.getvalue()
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGE)
+class ResumeExtractionTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        override = override_settings(MEDIA_ROOT=media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.company = make_company()
+        self.job = make_job(self.company)
+
+    def apply(self, filename, content):
+        return make_application(self.job, resume=SimpleUploadedFile(filename, content))
+
+    def test_extracts_txt_and_docx(self):
+        txt = self.apply('cv.txt', 'Seasoned Django developer'.encode())
+        docx = self.apply('cv.docx', _docx('Kubernetes and Terraform'))
+        self.assertEqual(extract_text(txt.resume.path).strip(), 'Seasoned Django developer')
+        self.assertEqual(extract_text(docx.resume.path).strip(), 'Kubernetes and Terraform')
+
+    def test_worker_indexes_queued_resumes(self):
+        django_dev = self.apply('a.txt', b'Python and Django, five years')
+        ops = self.apply('b.docx', _docx('Kubernetes operator'))
+        broken = self.apply('c.docx', b'not a zip archive')
+        legacy = self.apply('d.doc', b'\xd0\xcf\x11\xe0 Word 97')
+        self.assertEqual(ResumeExtractionTask.objects.filter(status='queued').count(), 4)
+
+        # Threads stand in for the process pool, which test runner workers (--parallel) cannot start
+        with patch('applications.management.commands.process_resumes.ProcessPoolExecutor', ThreadPoolExecutor):
+            call_command(
+                'process_resumes', '--once', '--workers=2', '--max-attempts=3',
+                stdout=StringIO(), stderr=StringIO(),
+            )
+        # Files that cannot be read fail on the first attempt
+        tasks = {task.application_id: (task.status, task.attempts) for task in ResumeExtractionTask.objects.all()}
+        self.assertEqual(tasks, {
+            django_dev.id: ('done', 1), ops.id: ('done', 1), broken.id: ('failed', 1), legacy.id: ('failed', 1),
+        })
+
+        self.client.force_login(self.company)
+        url = reverse('applicants_list', args=[self.job.id])
+        self.assertEqual(list(self.client.get(url, {'q': 'django'}).context['applications']), [django_dev])
+        self.assertEqual(list(self.client.get(url, {'q': 'kubernetes'}).context['applications']), [ops])
+        self.assertEqual(len(self.client.get(url).context['applications']), 4)
+
+    def test_deleting_a_job_unindexes_its_resumes_at_once(self):
+        application = self.apply('a.txt', b'Django')
+        ResumeText.objects.create(application=application, text='Django')
+        index_resume_text(application.id, 'Django')
+
+        def delete_job(applications):
+            job = make_job(self.company)
+            for _ in range(applications):
+                make_application(job)
+            with CaptureQueriesContext(connection) as queries:
+                job.delete()
+            return len(queries)
+
+        # Applications without a resume cost nothing per row
+        self.assertEqual(delete_job(1), delete_job(5))
+        self.job.delete()
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT count(*) FROM applications_resume_fts')
+                self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_claimed_tasks_are_not_handed_out_twice(self):
+        self.apply('a.txt', b'one')
+        self.apply('b.txt', b'two')
+        first = claim_tasks('worker-1', 1)
+        second = claim_tasks('worker-2', 5)
+        self.assertEqual(len(first), 1)
+        self.assertEqual(len(second), 1)
+        self.assertNotEqual(first[0].pk, second[0].pk)
+        self.assertEqual(claim_tasks('worker-3', 5), [])
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGE)
+class SeekerFeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        company = make_company()
+        cls.backend = make_job(company, title='Python Backend Developer', description='Django REST APIs.')
+        cls.api = make_job(company, title='Django API Engineer', description='Python services and REST APIs.')
+        cls.frontend = make_job(
+            company, title='React Frontend Developer', description='TypeScript and CSS.',
+            location='Lisbon', job_type='REMOTE',
+        )
+        cls.seeker = make_seeker()
+
+    def dashboard(self):
+        self.client.force_login(self.seeker)
+        return self.client.get(reverse('dashboard')).context
+
+    def refresh(self):
+        call_command('build_seeker_feeds', '--new-jobs', stdout=StringIO())
+
+    def test_applying_marks_the_feed_for_rebuild(self):
+        self.assertFalse(self.dashboard()['personalised'])
+        make_application(self.backend, self.seeker)
+        self.assertTrue(StaleSeekerFeed.objects.filter(seeker=self.seeker).exists())
+        self.refresh()
+        self.assertFalse(StaleSeekerFeed.objects.exists())
+
+        context = self.dashboard()
+        self.assertTrue(context['personalised'])
+        self.assertEqual(context['featured_jobs'][0], self.api)
+        self.assertNotIn(self.backend, context['featured_jobs'])
+
+        Application.objects.get(applicant=self.seeker).delete()
+        self.refresh()
+        self.assertFalse(SeekerFeed.objects.filter(seeker=self.seeker).exists())
+
+    def test_deleting_a_job_does_not_mark_its_applicants(self):
+        job = make_job(title='Temporary')
+        make_application(job, self.seeker)
+        StaleSeekerFeed.objects.all().delete()
+        job.delete()
+        self.assertFalse(StaleSeekerFeed.objects.exists())
+
+    def test_batch_build_and_new_jobs(self):
+        make_application(self.frontend, self.seeker)
+        call_command('build_seeker_feeds', stdout=StringIO())
+        self.assertEqual(feed_jobs(self.seeker), [self.backend, self.api])
+
+        newcomer = make_job(title='Senior React Developer', description='TypeScript.', location='Lisbon', job_type='REMOTE')
+        call_command('build_seeker_feeds', '--new-jobs', stdout=StringIO())
+        self.assertEqual(feed_jobs(self.seeker)[0], newcomer)
+        self.assertEqual(SeekerFeed.objects.get(seeker=self.seeker).last_job_id, newcomer.id)
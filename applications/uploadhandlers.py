@@ -0,0 +1,29 @@
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+
+from .storage import resume_max_size
+
+
+class ResumeUploadHandler(FileUploadHandler):
+    """
+    Stop reading a resume upload as soon as it passes RESUME_MAX_UPLOAD_SIZE,
+    instead of spooling the whole file to memory or disk first. The rejected
+    field is recorded on ``request.rejected_uploads`` for the view to report.
+    """
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.field_name == 'resume':
+            self.received += len(raw_data)
+            if self.received > resume_max_size():
+                if not hasattr(self.request, 'rejected_uploads'):
+                    self.request.rejected_uploads = set()
+                self.request.rejected_uploads.add(self.field_name)
+                raise SkipFile()
+        return raw_data
+
+    def file_complete(self, file_size):
+        # Let the next handler build the file object
+        return None
@@ -1,4 +1,4 @@
-from django.urls import path
+from django.urls import path, re_path
 from . import views
 
 urlpatterns = [
@@ -6,7 +6,10 @@ urlpatterns = [
     path('my-applications/', views.my_applications, name='my_applications'),
     path('applicants/<int:job_id>/', views.applicants_list, name='applicants_list'),
     path('update-status/<int:application_id>/', views.update_application_status, name='update_application_status'),
+    path('applicants/<int:job_id>/status/', views.bulk_update_status, name='bulk_update_status'),
+    re_path(r'^applicants/(?P<job_id>[0-9]+)/export\.(?P<format>csv|xlsx)$', views.export_applicants, name='export_applicants'),
     path('withdraw/<int:application_id>/', views.withdraw_application, name='withdraw_application'),
-    path('apply/<int:job_id>/', views.apply_for_job, name='apply_job')
+    path('apply/<int:job_id>/', views.apply_for_job, name='apply_job'),
+    path('resume/<int:application_id>/', views.download_resume, name='download_resume'),
 
 ]
\ No newline at end of file
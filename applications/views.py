@@ -1,10 +1,27 @@
+import os
+from datetime import datetime, time, timedelta
+from urllib.parse import urlencode
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.db import IntegrityError, transaction
+from django.http import JsonResponse, Http404, StreamingHttpResponse
+from django.template.defaultfilters import pluralize
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.http import content_disposition_header
+from django.utils.text import slugify
+from . import counters, exports
 from .models import Application
 from .forms import ApplicationForm
+from .downloads import serve_protected_file
+from .search import filter_by_resume_text
 from jobs.models import Job
+from jobs.pagination import CursorPaginator
+
+APPLICANTS_PER_PAGE = 25
+BULK_UPDATE_LIMIT = 500
 
 @login_required
 def apply_for_job(request, job_id):
@@ -15,21 +32,41 @@ def apply_for_job(request, job_id):
         messages.error(request, "Companies cannot apply for jobs.")
         return redirect('job_detail', job_id=job_id)
     
-    # Check if user has already applied
-    if Application.objects.filter(job=job, applicant=request.user).exists():
-        messages.warning(request, "You have already applied for this job.")
-        return redirect('job_detail', job_id=job_id)
-    
     if request.method == 'POST':
         form = ApplicationForm(request.POST, request.FILES)
+        # ResumeUploadHandler drops oversized resumes while they are still uploading
+        if 'resume' in getattr(request, 'rejected_uploads', ()):
+            form.add_error('resume', "Resume is too large.")
         if form.is_valid():
             application = form.save(commit=False)
             application.job = job
             application.applicant = request.user
-            application.save()
+            application.submission_key = form.cleaned_data['submission_key']
+            # No exists() check first: the unique constraints decide, so of two
+            # concurrent submissions exactly one gets in
+            try:
+                with transaction.atomic():
+                    application.save()
+                    counters.application_added(job.id, application.status)
+            except IntegrityError:
+                existing = Application.objects.filter(job=job, applicant=request.user).order_by().values_list(
+                    'submission_key', flat=True
+                )
+                if not existing:
+                    raise
+                if application.submission_key and existing[0] == application.submission_key:
+                    # The same form sent again (double click, retry): it already went through
+                    messages.success(request, "Your application has been submitted successfully!")
+                else:
+                    messages.warning(request, "You have already applied for this job.")
+                return redirect('job_detail', job_id=job_id)
             messages.success(request, "Your application has been submitted successfully!")
             return redirect('job_detail', job_id=job_id)
     else:
+        # Check if user has already applied
+        if Application.objects.filter(job=job, applicant=request.user).exists():
+            messages.warning(request, "You have already applied for this job.")
+            return redirect('job_detail', job_id=job_id)
         form = ApplicationForm()
     
     return render(request, 'applications/apply.html', {
@@ -43,45 +80,134 @@ def my_applications(request):
     if request.user.is_company:
         return redirect('dashboard')
     
-    applications = Application.objects.filter(applicant=request.user)
+    applications = Application.objects.filter(applicant=request.user).select_related('job__company')
     return render(request, 'applications/my_applications.html', {
         'applications': applications
     })
 
+def _applied_range(request):
+    # ?applied_from= and ?applied_to= as YYYY-MM-DD, both days included
+    bounds = []
+    for name in ('applied_from', 'applied_to'):
+        try:
+            day = parse_date(request.GET.get(name, ''))
+        except ValueError:
+            day = None
+        bounds.append(day)
+    return bounds
+
+
+def _filter_applicants(request, job):
+    # The applicants of ``job`` matching the filters in the query string, and those filters
+    applications = Application.objects.filter(job=job)
+    status = request.GET.get('status', '')
+    if status in counters.STATUSES:
+        applications = applications.filter(status=status)
+    else:
+        status = ''
+    # Whole local days, compared on applied_at itself so the (job, applied_at) index applies
+    applied_from, applied_to = _applied_range(request)
+    if applied_from:
+        applications = applications.filter(applied_at__gte=timezone.make_aware(datetime.combine(applied_from, time.min)))
+    if applied_to:
+        applications = applications.filter(
+            applied_at__lt=timezone.make_aware(datetime.combine(applied_to + timedelta(days=1), time.min))
+        )
+    # Keyword search over the extracted resume text, see applications/search.py
+    query = request.GET.get('q', '').strip()
+    if query:
+        applications = filter_by_resume_text(applications, query)
+    return applications, {
+        'status': status,
+        'applied_from': applied_from.isoformat() if applied_from else '',
+        'applied_to': applied_to.isoformat() if applied_to else '',
+        'q': query,
+    }
+
+
 @login_required
 def applicants_list(request, job_id):
-    job = get_object_or_404(Job, id=job_id)
+    job = get_object_or_404(Job.objects.select_related('company'), id=job_id)
     
     # Only the company that posted the job can view applicants
     if job.company != request.user:
         messages.error(request, "You don't have permission to view this.")
         return redirect('job_list')
     
-    applications = Application.objects.filter(job=job)
+    applications, filters = _filter_applicants(request, job)
+    query = filters['q']
+    paginator = CursorPaginator(applications.select_related('applicant'), APPLICANTS_PER_PAGE, ('-applied_at', '-id'))
+    page_obj = paginator.get_page(cursor=request.GET.get('cursor'), number=request.GET.get('page'))
     return render(request, 'applications/applicants_list.html', {
         'job': job,
-        'applications': applications
+        'applications': page_obj,
+        'page_obj': page_obj,
+        'query': query,
+        'filters': filters,
+        'filters_query': urlencode({name: value for name, value in filters.items() if value}),
+        # Per-status totals come from the counters on the job row, see applications/counters.py
+        'status_counts': [
+            (value, label, getattr(job, counters.status_field(value))) for value, label in Application.STATUS_CHOICES
+        ],
+        'status_choices': Application.STATUS_CHOICES,
     })
 
+@login_required
+def export_applicants(request, job_id, format):
+    # Only the company that posted the job can export its applicants
+    job = get_object_or_404(Job, id=job_id, company=request.user)
+    applications, _ = _filter_applicants(request, job)
+    rows = exports.applicant_rows(request, applications)
+    if format == 'xlsx':
+        response = StreamingHttpResponse(
+            exports.stream_xlsx(rows),
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+    else:
+        response = StreamingHttpResponse(exports.stream_csv(rows), content_type='text/csv; charset=utf-8')
+    filename = f"{slugify(job.title) or 'job'}-{job.id}-applicants.{format}"
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    return response
+
 @login_required
 def update_application_status(request, application_id):
-    application = get_object_or_404(Application, id=application_id)
-    
     # Only the company that posted the job can update status
-    if application.job.company != request.user:
-        messages.error(request, "You don't have permission to do this.")
-        return redirect('job_list')
+    application = get_object_or_404(
+        Application.objects.only('id', 'job_id'), id=application_id, job__company=request.user
+    )
     
     if request.method == 'POST':
         status = request.POST.get('status')
-        if status in ['pending', 'reviewed', 'accepted', 'rejected']:
-            application.status = status
-            application.save()
+        if status in counters.STATUSES:
+            counters.set_status(Application.objects.filter(pk=application.pk), status)
             messages.success(request, f"Application status updated to {status}.")
         else:
             messages.error(request, "Invalid status.")
     
-    return redirect('applicants_list', job_id=application.job.id)
+    return redirect('applicants_list', job_id=application.job_id)
+
+@login_required
+def bulk_update_status(request, job_id):
+    # One UPDATE for every selected application; the job__company condition is the permission check
+    if request.method == 'POST':
+        status = request.POST.get('status')
+        ids = [int(value) for value in request.POST.getlist('application_ids') if value.isdigit()]
+        if status not in counters.STATUSES:
+            messages.error(request, "Invalid status.")
+        elif not ids:
+            messages.warning(request, "No applications selected.")
+        elif len(ids) > BULK_UPDATE_LIMIT:
+            messages.error(request, f"Select at most {BULK_UPDATE_LIMIT} applications at a time.")
+        else:
+            updated = counters.set_status(
+                Application.objects.filter(id__in=ids, job_id=job_id, job__company=request.user), status
+            )
+            messages.success(request, f"{updated} application{pluralize(updated)} moved to {status}.")
+    
+    # Back to the page the selection was made on
+    url = reverse('applicants_list', args=[job_id])
+    return_query = request.POST.get('return_query', '')
+    return redirect(f'{url}?{return_query}' if return_query else url)
 
 @login_required 
 def withdraw_application(request, application_id):
@@ -91,6 +217,27 @@ def withdraw_application(request, application_id):
         messages.error(request, "You can only withdraw pending applications.")
         return redirect('my_applications')
     
-    application.delete()
-    messages.success(request, "Application withdrawn successfully.")
-    return redirect('my_applications')
\ No newline at end of file
+    with transaction.atomic():
+        # Only the request that actually removed the row adjusts the counters
+        _, deleted = Application.objects.filter(pk=application.pk, status='pending').delete()
+        withdrawn = deleted.get(Application._meta.label, 0)
+        if withdrawn:
+            counters.application_removed(application.job_id, 'pending')
+    if withdrawn:
+        messages.success(request, "Application withdrawn successfully.")
+    else:
+        # Withdrawn or reviewed by a concurrent request
+        messages.error(request, "You can only withdraw pending applications.")
+    return redirect('my_applications')
+
+@login_required
+def download_resume(request, application_id):
+    # Only the company that posted the job can download its applicants' resumes
+    application = get_object_or_404(
+        Application.objects.select_related('applicant'), id=application_id, job__company=request.user
+    )
+    if not application.resume:
+        raise Http404("This application has no resume.")
+
+    filename = f"{application.applicant.username}-resume{os.path.splitext(application.resume.name)[1]}"
+    return serve_protected_file(request, application.resume.storage, application.resume.name, filename)
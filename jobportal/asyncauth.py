@@ -0,0 +1,18 @@
+"""
+request.user for async views.
+
+Reading request.user loads the session and the user synchronously, which
+Django refuses to do on the event loop; request.auser() does it in a worker
+thread, but caches the result apart from request.user.
+"""
+
+
+async def resolve_user(request):
+    """
+    Load the user through request.auser() and keep it as request.user too,
+    so templates and other sync code reading request.user later do not load
+    it a second time.
+    """
+    user = await request.auser()
+    request.user = user
+    return user
@@ -0,0 +1,11 @@
+"""
+Gunicorn settings for serving the site through ASGI:
+
+    gunicorn -c jobportal/gunicorn_asgi.py
+
+Every worker runs a uvicorn event loop over jobportal.asgi, which routes the
+async read views (jobs/async_views.py). Gunicorn takes the worker count from
+WEB_CONCURRENCY and the port from PORT, as for the WSGI entry point.
+"""
+wsgi_app = 'jobportal.asgi:application'
+worker_class = 'uvicorn_worker.UvicornWorker'
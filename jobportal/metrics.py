@@ -0,0 +1,83 @@
+"""
+In-process request histograms, exposed in the Prometheus text format.
+
+jobportal.timing records every sampled request here, labelled with its URL
+name. Each server process keeps its own counts, as with any Prometheus
+client library without a shared store; scrape every process, or sum them.
+"""
+import bisect
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+# Seconds, the usual latency buckets of the Prometheus client libraries
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, labels):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.labels = labels
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self.lock:
+            counts, total = self.series.get(label_values, ([0] * (len(self.buckets) + 1), 0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.series[label_values] = (counts, total + value)
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self.lock:
+            series = sorted(self.series.items())
+        for label_values, (counts, total) in series:
+            labels = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.labels, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{labels}}} {total:.6f}')
+            lines.append(f'{self.name}_count{{{labels}}} {cumulative}')
+        return '\n'.join(lines)
+
+    def reset(self):
+        with self.lock:
+            self.series.clear()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+request_duration = Histogram(
+    'jobspot_request_duration_seconds',
+    'Time spent per request, split into total, sql, template and python (the rest).',
+    DURATION_BUCKETS, ('view', 'phase'),
+)
+request_queries = Histogram(
+    'jobspot_request_queries',
+    'SQL queries run per request.',
+    QUERY_BUCKETS, ('view',),
+)
+
+REGISTRY = [request_duration, request_queries]
+
+
+def _allowed(request):
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token:
+        return request.headers.get('Authorization') == f'Bearer {token}'
+    return settings.DEBUG or request.user.is_staff
+
+
+# GET /metrics - Prometheus scrape endpoint
+def metrics(request):
+    if not _allowed(request):
+        return HttpResponseForbidden()
+    body = '\n'.join(histogram.expose() for histogram in REGISTRY) + '\n'
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
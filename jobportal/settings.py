@@ -18,6 +18,7 @@ from django.conf import settings
 from django.conf.urls.static import static
 from pathlib import Path
 import os
+import tempfile
 import dj_database_url
 
 
@@ -27,6 +28,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # Security
 SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret')
 DEBUG = os.environ.get('DEBUG', 'True') == 'True'
+# Serving through jobportal.asgi: route the async read views (see jobs/async_views.py)
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'False') == 'True'
 # ALLOWED_HOSTS = os.environ.get('ALLOWED_HOSTS', '*').split(',')
 # ALLOWED_HOSTS = ['jobspot-ecor.onrender.com']
 ALLOWED_HOSTS = ['jobspot-ecor.onrender.com', 'localhost', '127.0.0.1']
@@ -43,12 +46,15 @@ INSTALLED_APPS = [
     "jobs",
     "users",
     "applications",
+    "analytics",
 ]
 
 # Middleware
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",  # must be right after SecurityMiddleware
+    "jobportal.timing.ServerTimingMiddleware",  # after WhiteNoise, static files are not timed
+    "jobportal.sqlsampler.SQLSamplerMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -62,7 +68,7 @@ ROOT_URLCONF = "jobportal.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "jobportal.timing.TimedDjangoTemplates",  # DjangoTemplates plus render timings
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -82,9 +88,63 @@ WSGI_APPLICATION = "jobportal.wsgi.application"
 DATABASES = {
     "default": dj_database_url.config(
         default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}",
-        conn_max_age=600
+        # Async views query from short-lived threads, which never reuse a connection
+        conn_max_age=0 if ASYNC_VIEWS else 600
     )
 }
+if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+    # Writers take the lock when their transaction starts, so two of them wait
+    # their turn instead of one failing with "database is locked" on upgrade
+    DATABASES["default"].setdefault("OPTIONS", {})["transaction_mode"] = "IMMEDIATE"
+    # The in-memory test database fails concurrent writers outright instead of
+    # letting them wait; a file behaves like the real one (see ConcurrentApplyTests).
+    # The process id keeps simultaneous runs (other checkouts, CI shards) apart,
+    # and --parallel clones get their own suffixed copies of it
+    DATABASES["default"]["TEST"] = {
+        "NAME": os.path.join(tempfile.gettempdir(), f"jobspot-test-{os.getpid()}.sqlite3")
+    }
+
+# Cache — per-process memory by default; site statistics and anonymous pages live here.
+# With several server processes use Redis (REDIS_URL) or a shared directory (CACHE_DIR)
+# so invalidations reach all of them.
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+elif os.environ.get("CACHE_DIR"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ["CACHE_DIR"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "jobspot",
+        }
+    }
+SITE_STATS_CACHE_TIMEOUT = 60 * 60
+PAGE_CACHE_TIMEOUT = 5 * 60
+# Search result id lists are kept per process; the locmem cache is per process
+# too, so there the job data version expires and restarts to catch up with
+# changes made by other processes
+RESULT_CACHE_TIMEOUT = 60
+LOCAL_VERSION_TIMEOUT = 60
+
+# Share of requests timed for the Server-Timing header and /metrics (0 turns it off)
+REQUEST_TIMING_SAMPLE_RATE = float(os.environ.get("REQUEST_TIMING_SAMPLE_RATE", "1.0"))
+# Bearer token Prometheus scrapes /metrics with; without one only staff (or DEBUG) can
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN") or None
+
+# Query samples for `manage.py sql_report`, off while SQL_SAMPLE_FILE is unset
+SQL_SAMPLE_FILE = os.environ.get("SQL_SAMPLE_FILE") or None
+SQL_SAMPLE_RATE = float(os.environ.get("SQL_SAMPLE_RATE", "0.01"))
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "100"))  # always sampled, with their stack
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = []  # dev-friendly
@@ -110,6 +170,20 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Resumes are capped while uploading (applications/uploadhandlers.py)
+RESUME_MAX_UPLOAD_SIZE = 5 * 1024 * 1024
+FILE_UPLOAD_HANDLERS = [
+    "applications.uploadhandlers.ResumeUploadHandler",
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+
+# Resume downloads: "x-accel-redirect" hands the file to nginx, e.g.
+#   location /protected-media/ { internal; alias /path/to/media/; }
+# "x-sendfile" to Apache/lighttpd; unset serves it from Django.
+RESUME_SENDFILE = os.environ.get('RESUME_SENDFILE') or None
+RESUME_ACCEL_REDIRECT_PREFIX = "/protected-media/"
+
 STORAGES = {
     "staticfiles": {
         "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"
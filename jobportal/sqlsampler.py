@@ -0,0 +1,167 @@
+"""
+Fleet-wide sampling of SQL queries, grouped by query shape.
+
+Every database connection gets an execute wrapper (installed from
+jobs/apps.py on connection_created) that times each query. A share of them
+(SQL_SAMPLE_RATE), and every query slower than SLOW_QUERY_MS, is appended
+to SQL_SAMPLE_FILE as a JSON line holding
+
+- the query's fingerprint: its SQL with literals, placeholders and the
+  length of IN lists and VALUES rows stripped, so one shape is one key,
+- its duration and weight (1 / the chance it had of being sampled),
+- the URL name of the request that ran it (SQLSamplerMiddleware), and
+- for slow queries, the project frames of the stack that ran it.
+
+Nothing is recorded while SQL_SAMPLE_FILE is unset. Each process buffers
+its lines and appends them in batches; ``manage.py sql_report`` reads the
+files of any number of processes or hosts and prints the worst shapes.
+"""
+import atexit
+import json
+import os
+import random
+import re
+import threading
+import time
+import traceback
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+FLUSH_EVERY = 200
+FLUSH_INTERVAL = 5  # seconds
+STACK_DEPTH = 8
+
+_request = ContextVar('sql_sampler_request', default=None)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w"])-?\d+(?:\.\d+)?(?![\w"])')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_IN_LIST = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_VALUES_ROWS = re.compile(r'(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))+')
+_SAVEPOINT = re.compile(r'\b(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT)\s+"?\w+"?', re.IGNORECASE)
+_SPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """The shape of a query: its SQL with every value replaced by ``?``."""
+    sql = _SAVEPOINT.sub(r'\1 ?', sql)
+    sql = _STRING.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _VALUES_ROWS.sub(r'\1, ...', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def _view_name():
+    request = _request.get()
+    if request is None:
+        return None
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match and match.view_name else 'unmatched'
+
+
+# Instrumentation frames say nothing about where a query came from
+_SKIP_FILES = (__file__, os.path.join(os.path.dirname(__file__), 'timing.py'))
+
+
+def _project_stack():
+    root = str(settings.BASE_DIR)
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(root) and 'site-packages' not in frame.filename
+        and frame.filename not in _SKIP_FILES
+    ]
+    return [
+        f'{os.path.relpath(frame.filename, root)}:{frame.lineno} in {frame.name}'
+        for frame in frames[-STACK_DEPTH:]
+    ]
+
+
+class Sampler:
+    def __init__(self):
+        self.buffer = []
+        self.flushed_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        path = getattr(settings, 'SQL_SAMPLE_FILE', None)
+        if not path:
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record(path, sql, (time.perf_counter() - started) * 1000)
+
+    def record(self, path, sql, ms):
+        slow = ms >= settings.SLOW_QUERY_MS
+        rate = settings.SQL_SAMPLE_RATE
+        # Slow queries are always kept, the rest with probability rate
+        if not slow and (rate <= 0 or random.random() >= rate):
+            return
+        sample = {
+            'fingerprint': fingerprint(sql),
+            'ms': round(ms, 3),
+            'weight': 1 if slow else 1 / rate,
+            'view': _view_name(),
+        }
+        if slow:
+            sample['stack'] = _project_stack()
+        with self.lock:
+            self.buffer.append(json.dumps(sample))
+            due = len(self.buffer) >= FLUSH_EVERY or time.monotonic() - self.flushed_at >= FLUSH_INTERVAL
+        if due:
+            self.flush(path)
+
+    def flush(self, path=None):
+        path = path or getattr(settings, 'SQL_SAMPLE_FILE', None)
+        with self.lock:
+            lines, self.buffer = self.buffer, []
+            self.flushed_at = time.monotonic()
+        if not lines or not path:
+            return
+        # One append per batch, so processes sharing the file do not interleave lines
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+
+sampler = Sampler()
+atexit.register(sampler.flush)
+
+
+def install(sender, connection, **kwargs):
+    """connection_created receiver."""
+    # Connections are often opened inside a scoped execute_wrapper() block, which
+    # pops the last wrapper on exit; going first keeps that one in place
+    if sampler not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, sampler)
+
+
+class SQLSamplerMiddleware:
+    """Lets the sampler tell which view ran a query."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _request.reset(token)
+
+    async def __acall__(self, request):
+        token = _request.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            _request.reset(token)
@@ -0,0 +1,153 @@
+"""
+Shared helpers for the app test suites.
+
+QueryBudgetTestCase seeds a view's data at a few sizes and checks that the
+number of SQL queries it runs does not grow with the number of rows, so an
+N+1 introduced in a template or view fails the build.
+
+QueryPlanTestCase runs a view, replays every SELECT it issued through
+SQLite's EXPLAIN QUERY PLAN and fails on full table scans and temporary
+B-tree sorts, so a missing index shows up before the table is large.
+"""
+import re
+from itertools import count
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from applications.models import Application
+from jobs.models import Job
+from users.models import CustomUser
+
+# The manifest storage needs collectstatic, which the test run never does
+PLAIN_STATIC_STORAGE = {
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+_sequence = count(1)
+
+
+def make_company(**kwargs):
+    username = kwargs.pop('username', f'company{next(_sequence)}')
+    return CustomUser.objects.create_user(username, is_company=True, **kwargs)
+
+
+def make_seeker(**kwargs):
+    username = kwargs.pop('username', f'seeker{next(_sequence)}')
+    return CustomUser.objects.create_user(username, is_seeker=True, **kwargs)
+
+
+def make_job(company=None, **kwargs):
+    fields = {
+        'title': f'Python Developer {next(_sequence)}',
+        'description': 'Build and run Django services.',
+        'location': 'Berlin',
+        'job_type': 'FULL_TIME',
+    }
+    fields.update(kwargs)
+    return Job.objects.create(company=company or make_company(), **fields)
+
+
+def make_application(job=None, applicant=None, **kwargs):
+    return Application.objects.create(
+        job=job or make_job(), applicant=applicant or make_seeker(), **kwargs
+    )
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGE)
+class QueryBudgetTestCase(TestCase):
+    # Row counts each view is measured at
+    budget_sizes = (1, 5, 15)
+
+    def assertConstantQueries(self, url, seed, user=None, data=None, max_queries=None):
+        """
+        Call ``seed(n)`` to add ``n`` more rows before each request to ``url``
+        and assert every request ran the same number of queries. Returns that
+        number.
+        """
+        if user is not None:
+            self.client.force_login(user)
+
+        counts = []
+        captured = []
+        seeded = 0
+        for size in self.budget_sizes:
+            seed(size - seeded)
+            seeded = size
+            # Start every request cold so cached aggregates don't skew the counts
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, data)
+            self.assertEqual(response.status_code, 200)
+            counts.append(len(queries))
+            captured.append(queries.captured_queries)
+
+        if len(set(counts)) != 1:
+            largest = '\n'.join(query['sql'] for query in captured[-1])
+            self.fail(
+                f'{url} ran {counts} queries for {list(self.budget_sizes)} rows:\n{largest}'
+            )
+        if max_queries is not None:
+            self.assertLessEqual(counts[0], max_queries, f'{url} exceeded its query budget')
+        return counts[0]
+
+
+# "SCAN jobs_job" alone is a full table scan; "SCAN x USING [COVERING] INDEX"
+# walks an index in order and "SCAN x VIRTUAL TABLE" is the FTS5 index
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def plan_problems(plan, allow_sort=False):
+    tables = set(connection.introspection.table_names())
+    problems = []
+    for detail in plan:
+        scan = FULL_SCAN.match(detail)
+        # Scanning a derived table ("SCAN subquery") is fine, its source was checked
+        if scan and scan.group(1) in tables:
+            problems.append(f'full scan: {detail}')
+        elif 'USE TEMP B-TREE' in detail and not allow_sort:
+            problems.append(f'temp b-tree: {detail}')
+    return problems
+
+
+@skipUnless(connection.vendor == 'sqlite', 'query plans are checked on SQLite')
+@override_settings(STORAGES=PLAIN_STATIC_STORAGE)
+class QueryPlanTestCase(TestCase):
+    def assertIndexedQueries(self, url, user=None, data=None, ignore=(), allow_sort=False):
+        """
+        Request ``url`` and assert that none of its SELECTs needs a full
+        scan or a temporary sort. Queries containing any of the ``ignore``
+        substrings are skipped; ``allow_sort`` permits sorts for views
+        ordered by a computed value such as search relevance. Returns the
+        number of SELECTs checked.
+        """
+        if user is not None:
+            self.client.force_login(user)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, data)
+        self.assertEqual(response.status_code, 200)
+
+        failures = []
+        checked = 0
+        for query in queries.captured_queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT') or any(part in sql for part in ignore):
+                continue
+            checked += 1
+            plan = explain(sql)
+            problems = plan_problems(plan, allow_sort)
+            if problems:
+                failures.append(f'{sql}\n  ' + '\n  '.join(problems + plan))
+        if failures:
+            self.fail(f'{url} has unindexed queries:\n' + '\n'.join(failures))
+        return checked
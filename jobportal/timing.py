@@ -0,0 +1,154 @@
+"""
+Per-request timings: SQL, template rendering and the Python in between.
+
+ServerTimingMiddleware wraps a sampled share of requests
+(REQUEST_TIMING_SAMPLE_RATE) and
+
+- counts and times their queries, with an execute wrapper that every
+  connection gets on connection_created (see jobs/apps.py), so the queries
+  async views run in worker threads are counted too,
+- times template rendering through TimedDjangoTemplates, the template
+  backend configured in settings,
+- reports both in a Server-Timing header, which browser dev tools show
+  next to the request, and
+- records them in the jobportal.metrics histograms behind /metrics.
+
+Requests that are not sampled skip all of it.
+"""
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+from . import metrics
+
+_current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.queries = 0
+        self.sql = 0.0
+        self.template = 0.0
+        self.rendering = False
+        self.started = time.perf_counter()
+
+
+def time_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.sql += time.perf_counter() - started
+        timings.queries += 1
+
+
+def install(sender, connection, **kwargs):
+    """connection_created receiver."""
+    # First in line, like the SQL sampler's, so scoped execute_wrapper() blocks pop their own
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, time_query)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timings = _current.get()
+        # Templates rendered from inside another render are already being timed
+        if timings is None or timings.rendering:
+            return super().render(context, request)
+        timings.rendering = True
+        started, sql_before = time.perf_counter(), timings.sql
+        try:
+            return super().render(context, request)
+        finally:
+            # Querysets evaluated by the template are already counted as SQL
+            sql_during = timings.sql - sql_before
+            timings.template += time.perf_counter() - started - sql_during
+            timings.rendering = False
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, with render times added to the request timings."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+def _sample_rate():
+    return getattr(settings, 'REQUEST_TIMING_SAMPLE_RATE', 1.0)
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    # Unmatched paths share one label, so scanners cannot blow up the series count
+    return match.view_name if match and match.view_name else 'unmatched'
+
+
+def _milliseconds(seconds):
+    return f'{seconds * 1000:.1f}'
+
+
+class ServerTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if random.random() >= _sample_rate():
+            return self.get_response(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.report(request, response, timings)
+
+    async def __acall__(self, request):
+        if random.random() >= _sample_rate():
+            return await self.get_response(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.report(request, response, timings)
+
+    def report(self, request, response, timings):
+        total = time.perf_counter() - timings.started
+        python = max(total - timings.sql - timings.template, 0.0)
+
+        response['Server-Timing'] = ', '.join([
+            f'sql;dur={_milliseconds(timings.sql)};desc="{timings.queries} queries"',
+            f'tpl;dur={_milliseconds(timings.template)};desc="templates"',
+            f'app;dur={_milliseconds(python)};desc="python"',
+            f'total;dur={_milliseconds(total)}',
+        ])
+
+        view = _view_name(request)
+        metrics.request_duration.observe(total, view, 'total')
+        metrics.request_duration.observe(timings.sql, view, 'sql')
+        metrics.request_duration.observe(timings.template, view, 'template')
+        metrics.request_duration.observe(python, view, 'python')
+        metrics.request_queries.observe(timings.queries, view)
+        return response
@@ -18,14 +18,17 @@ from django.contrib import admin
 from django.urls import path,include
 from django.conf import settings
 from django.conf.urls.static import static
-# from jobs.views import job_list
+from jobs import async_views, views as job_views
+from jobportal.metrics import metrics
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    #  path("", job_list, name='homepage'),   # Homepage at root
+    path("", (async_views if settings.ASYNC_VIEWS else job_views).homepage, name='homepage'),   # Homepage at root
     path("users/", include('users.urls')),  # Changed from root to /users/
     path("jobs/", include('jobs.urls')),
-    path("applications/", include('applications.urls'))
+    path("applications/", include('applications.urls')),
+    path("analytics/", include('analytics.urls')),
+    path("metrics", metrics, name='metrics'),
 ]
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
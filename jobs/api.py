@@ -0,0 +1,132 @@
+"""
+Read-only JSON API over job postings for partner aggregators.
+
+Both endpoints accept the job_list filters (search, location, job_type) and
+a ``fields`` parameter naming the columns to return; only those columns
+are selected from the database.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.views.decorators.http import require_GET
+
+from .models import Job
+from .pagination import CursorPaginator
+from .search import filter_jobs
+
+# Public field name -> column it is read from
+API_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'description': 'description',
+    'location': 'location',
+    'job_type': 'job_type',
+    'company': 'company__username',
+    'created_at': 'created_at',
+    'url': 'id',
+}
+DEFAULT_FIELDS = ['id', 'title', 'location', 'job_type', 'company', 'created_at', 'url']
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+EXPORT_CHUNK_SIZE = 2000
+
+
+class FieldError(ValueError):
+    pass
+
+
+def _requested_fields(request):
+    raw = request.GET.get('fields', '')
+    if not raw:
+        return DEFAULT_FIELDS
+    fields = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in API_FIELDS]
+    if unknown or not fields:
+        raise FieldError('Unknown fields: %s. Available: %s.' % (
+            ', '.join(unknown) or '(none)', ', '.join(API_FIELDS)))
+    return fields
+
+
+def _filtered_jobs(request):
+    return filter_jobs(
+        Job.objects.all(),
+        request.GET.get('search', ''),
+        request.GET.get('location', ''),
+        request.GET.get('job_type', ''),
+    )
+
+
+def _serializer(request, fields):
+    def serialize(row):
+        item = {}
+        for name in fields:
+            if name == 'url':
+                item[name] = request.build_absolute_uri(reverse('job_detail', args=[row['id']]))
+            else:
+                item[name] = row[API_FIELDS[name]]
+        return item
+    return serialize
+
+
+def _page_url(request, cursor):
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return request.build_absolute_uri('?' + params.urlencode())
+
+
+def _page_size(request):
+    try:
+        size = int(request.GET.get('page_size', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        size = DEFAULT_PAGE_SIZE
+    return min(max(size, 1), MAX_PAGE_SIZE)
+
+
+# GET /jobs/api/ - one cursor-paginated page of jobs
+@require_GET
+def job_list_api(request):
+    try:
+        fields = _requested_fields(request)
+    except FieldError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+
+    jobs, ordering = _filtered_jobs(request)
+    # The ordering columns are needed to build the cursors
+    columns = {API_FIELDS[name] for name in fields}
+    columns.update(name.lstrip('-') for name in ordering)
+    jobs = jobs.values(*columns)
+
+    paginator = CursorPaginator(jobs, _page_size(request), ordering)
+    page = paginator.get_page(cursor=request.GET.get('cursor'))
+    serialize = _serializer(request, fields)
+
+    return JsonResponse({
+        'count': paginator.count,
+        'next': _page_url(request, page.next_cursor),
+        'previous': _page_url(request, page.previous_cursor),
+        'results': [serialize(row) for row in page],
+    })
+
+
+# GET /jobs/api/export/ - every matching job as newline-delimited JSON
+@require_GET
+def job_export_api(request):
+    try:
+        fields = _requested_fields(request)
+    except FieldError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+
+    jobs, _ = _filtered_jobs(request)
+    columns = {API_FIELDS[name] for name in fields} | {'id'}
+    rows = jobs.order_by('id').values(*columns).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    serialize = _serializer(request, fields)
+
+    lines = (json.dumps(serialize(row), cls=DjangoJSONEncoder) + '\n' for row in rows)
+    response = StreamingHttpResponse(lines, content_type='application/x-ndjson')
+    response['Content-Disposition'] = 'attachment; filename="jobs.ndjson"'
+    return response
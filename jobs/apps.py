@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class JobsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "jobs"
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from jobportal import sqlsampler, timing
+        from . import signals  # noqa: F401
+
+        connection_created.connect(sqlsampler.install, dispatch_uid='jobportal.sqlsampler')
+        connection_created.connect(timing.install, dispatch_uid='jobportal.timing')
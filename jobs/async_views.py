@@ -0,0 +1,142 @@
+"""
+Async versions of the read-only job pages: homepage, job_list and job_detail.
+
+They are routed instead of the views in jobs/views.py when the site runs
+under ASGI (settings.ASYNC_VIEWS, set by jobportal/asgi.py), so a request
+waiting on a slow search holds a coroutine rather than a whole worker.
+Independent queries are started together with asyncio.gather(). The
+template is rendered in a worker thread, where it may still touch the
+database (context processors, lazy relations).
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404, render
+
+from jobportal.asyncauth import resolve_user
+from . import conditional
+from .models import Job, RelatedJob
+from .pagecache import cache_anonymous_page
+from .pagination import CursorPaginator, IdListPaginator
+from .resultcache import amatching_job_ids
+from .search import filter_jobs
+from .stats import aget_site_stats
+
+
+async def _alist(queryset):
+    return [obj async for obj in queryset.aiterator()]
+
+
+async def _featured_jobs(search_query, location_query, job_type_filter):
+    jobs = Job.objects.select_related('company')
+    ids = await amatching_job_ids(search_query, location_query, job_type_filter)
+    if ids is not None:
+        found = await jobs.ain_bulk(ids[:6])
+        return [found[job_id] for job_id in ids[:6] if job_id in found]
+    jobs, ordering = filter_jobs(jobs, search_query, location_query, job_type_filter)
+    return await _alist(jobs.order_by(*ordering)[:6])
+
+
+# Homepage with featured jobs and search
+@cache_anonymous_page(params=('search', 'location', 'job_type'), case_insensitive=('search', 'location'))
+async def homepage(request):
+    search_query = request.GET.get('search', '')
+    location_query = request.GET.get('location', '')
+    job_type_filter = request.GET.get('job_type', '')
+
+    featured_jobs, stats = await asyncio.gather(
+        _featured_jobs(search_query, location_query, job_type_filter),
+        aget_site_stats(),
+    )
+
+    context = {
+        'featured_jobs': featured_jobs,
+        'total_jobs': stats['total_jobs'],
+        'total_companies': stats['hiring_companies'],
+        'job_types': stats['job_types'],
+        'search_query': search_query,
+        'location_query': location_query,
+        'job_type_filter': job_type_filter,
+        'job_type_choices': Job._meta.get_field('job_type').choices,
+    }
+    return await sync_to_async(render)(request, 'jobs/homepage.html', context)
+
+
+# Job list with search and pagination; unchanged pages answer 304 (see jobs/conditional.py)
+@conditional.revalidate
+@conditional.async_condition(
+    etag_func=conditional.job_list_etag, last_modified_func=conditional.job_list_last_modified
+)
+@cache_anonymous_page(
+    params=('search', 'location', 'job_type', 'cursor', 'page'), case_insensitive=('search', 'location')
+)
+async def job_list(request):
+    search_query = request.GET.get('search', '')
+    location_query = request.GET.get('location', '')
+    job_type_filter = request.GET.get('job_type', '')
+
+    jobs = Job.objects.select_related('company')
+    ids = await amatching_job_ids(search_query, location_query, job_type_filter)
+    if ids is not None:
+        paginator = IdListPaginator(ids, jobs, 10)  # 10 jobs per page
+    else:
+        jobs, ordering = filter_jobs(jobs, search_query, location_query, job_type_filter)
+        paginator = CursorPaginator(jobs, 10, ordering)
+    # The count and the rows of the page are separate queries
+    total_jobs, page_obj = await asyncio.gather(
+        paginator.acount(),
+        paginator.aget_page(cursor=request.GET.get('cursor'), number=request.GET.get('page')),
+    )
+
+    context = {
+        'page_obj': page_obj,
+        'search_query': search_query,
+        'location_query': location_query,
+        'job_type_filter': job_type_filter,
+        'job_type_choices': Job._meta.get_field('job_type').choices,
+        'total_jobs': total_jobs,
+    }
+    return await sync_to_async(render)(request, 'jobs/job_list.html', context)
+
+
+async def _related_jobs(job):
+    # Most similar jobs by content, precomputed by jobs/similarity.py
+    related_jobs = [
+        link.related async for link in
+        RelatedJob.objects.filter(job=job).select_related('related__company').order_by('-score')[:3]
+    ]
+    if not related_jobs:
+        # Not scored yet, fall back to the newest jobs of the same type
+        related_jobs = await _alist(
+            Job.objects.select_related('company').filter(job_type=job.job_type)
+            .exclude(id=job.id).order_by('-created_at', '-id')[:3]
+        )
+    return related_jobs
+
+
+async def _has_applied(job, user):
+    if not user.is_authenticated:
+        return False
+    from applications.models import Application
+    return await Application.objects.filter(job=job, applicant=user).aexists()
+
+
+# Job details; unchanged pages answer 304 (see jobs/conditional.py)
+@conditional.revalidate
+@conditional.async_condition(
+    etag_func=conditional.job_detail_etag, last_modified_func=conditional.job_detail_last_modified
+)
+@cache_anonymous_page()
+async def job_detail(request, job_id):
+    job = await aget_object_or_404(Job.objects.select_related('company'), id=job_id)
+
+    related_jobs, has_applied = await asyncio.gather(
+        _related_jobs(job), _has_applied(job, await resolve_user(request)),
+    )
+
+    context = {
+        'job': job,
+        'related_jobs': related_jobs,
+        'has_applied': has_applied,
+    }
+    return await sync_to_async(render)(request, 'jobs/job_detail.html', context)
@@ -0,0 +1,139 @@
+"""
+Validators for conditional GETs on the job pages.
+
+job_detail and job_list send an ETag (and, to anonymous visitors, a
+Last-Modified date) computed from a couple of cheap lookups, so a browser
+or CDN revalidating an unchanged page gets a 304 before the view runs its
+queries or renders a template.
+
+The ETag covers what the page shows: the job's own updated_at, the job
+data version from jobs/version.py (related jobs, company names and listings
+change with other jobs), and the viewer (who they are, and for job_detail
+whether they applied). Pages with pending flash messages get no validators,
+so the messages are always delivered.
+
+Django's condition() calls its validators on the event loop for async
+views, where they cannot query the database; async_condition() runs them
+in a worker thread instead.
+"""
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.messages import get_messages
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from jobportal.asyncauth import resolve_user
+
+from .models import Job
+from .version import current_version, last_changed
+
+
+def _has_pending_messages(request):
+    return len(get_messages(request)) > 0
+
+
+def _etag(*parts):
+    return hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _job_state(request, job_id):
+    # etag_func and last_modified_func each ask, look the job up only once
+    cache = request.__dict__.setdefault('_job_state', {})
+    if job_id not in cache:
+        cache[job_id] = Job.objects.filter(id=job_id).values('updated_at').first()
+        if cache[job_id] is not None:
+            cache[job_id]['has_applied'] = False
+            if request.user.is_authenticated:
+                from applications.models import Application
+                cache[job_id]['has_applied'] = Application.objects.filter(
+                    job_id=job_id, applicant=request.user
+                ).exists()
+    return cache[job_id]
+
+
+def job_detail_etag(request, job_id):
+    if _has_pending_messages(request):
+        return None
+    state = _job_state(request, job_id)
+    if state is None:
+        return None
+    return _etag(
+        job_id, state['updated_at'].isoformat(), current_version(),
+        request.user.pk, state['has_applied'],
+    )
+
+
+def job_detail_last_modified(request, job_id):
+    # Dates cannot tell logged-in viewers apart, they revalidate by ETag only
+    if request.user.is_authenticated or _has_pending_messages(request):
+        return None
+    state = _job_state(request, job_id)
+    if state is None:
+        return None
+    return max(state['updated_at'], last_changed())
+
+
+def job_list_etag(request):
+    if _has_pending_messages(request):
+        return None
+    return _etag(request.get_full_path(), current_version(), request.user.pk)
+
+
+def job_list_last_modified(request):
+    if request.user.is_authenticated or _has_pending_messages(request):
+        return None
+    return last_changed()
+
+
+def _patch_revalidate(request, response):
+    if request.user.is_authenticated:
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def revalidate(view):
+    """Make caches check back on every use (the validators keep that cheap)."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapped(request, *args, **kwargs):
+            response = await view(request, *args, **kwargs)
+            await resolve_user(request)
+            return _patch_revalidate(request, response)
+        return async_wrapped
+
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        return _patch_revalidate(request, view(request, *args, **kwargs))
+    return wrapped
+
+
+def async_condition(etag_func, last_modified_func):
+    """condition() for async views, with the validators run in a worker thread."""
+    def validators(request, *args, **kwargs):
+        # Both validators here return aware datetimes
+        last_modified = last_modified_func(request, *args, **kwargs)
+        if last_modified is not None:
+            last_modified = int(last_modified.timestamp())
+        etag = etag_func(request, *args, **kwargs)
+        return (quote_etag(etag) if etag is not None else None), last_modified
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapped(request, *args, **kwargs):
+            await resolve_user(request)
+            etag, last_modified = await sync_to_async(validators)(request, *args, **kwargs)
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD'):
+                if last_modified and not response.has_header('Last-Modified'):
+                    response.headers['Last-Modified'] = http_date(last_modified)
+                if etag:
+                    response.headers.setdefault('ETag', etag)
+            return response
+        return wrapped
+    return decorator
@@ -0,0 +1,60 @@
+import math
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.similarity import TOP_K, SimilarityIndex
+
+
+class Command(BaseCommand):
+    help = (
+        "Time a full related-jobs rebuild on synthetic postings of growing size. "
+        "Nothing is read from or written to the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='1000,2000,4000,8000',
+            help='Comma-separated job counts to measure (default: 1000,2000,4000,8000).',
+        )
+        parser.add_argument('--words', type=int, default=120, help='Words per description (default: 120).')
+        parser.add_argument('--vocabulary', type=int, default=20000, help='Distinct words (default: 20000).')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted(int(size) for size in options['sizes'].split(','))
+        except ValueError:
+            raise CommandError('--sizes must be a comma-separated list of integers.')
+
+        rng = np.random.default_rng(options['seed'])
+        words = np.array([f'w{i}' for i in range(options['vocabulary'])])
+        # Word frequencies in real text roughly follow Zipf's law
+        weights = 1 / np.arange(1, len(words) + 1)
+        weights /= weights.sum()
+
+        self.stdout.write(f'{"jobs":>8} {"fit s":>8} {"top-k s":>8} {"total s":>8} {"jobs/s":>8}')
+        previous = None
+        for size in sizes:
+            jobs = [
+                (job_id, ' '.join(rng.choice(words, 6, p=weights)), ' '.join(rng.choice(words, options['words'], p=weights)))
+                for job_id in range(size)
+            ]
+
+            started = time.perf_counter()
+            index = SimilarityIndex.fit(jobs)
+            fitted = time.perf_counter()
+            for _ in index.top_neighbours(index.matrix, index.ids, TOP_K):
+                pass
+            finished = time.perf_counter()
+
+            total = finished - started
+            self.stdout.write(
+                f'{size:>8} {fitted - started:>8.2f} {finished - fitted:>8.2f} {total:>8.2f} {size / total:>8.0f}'
+            )
+            if previous:
+                # The slope of log(time) against log(size): 1 is linear, 2 quadratic
+                exponent = math.log(total / previous[1]) / math.log(size / previous[0])
+                self.stdout.write(f'{"":>8} scaling exponent since {previous[0]}: {exponent:.2f}')
+            previous = (size, total)
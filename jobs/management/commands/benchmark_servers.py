@@ -0,0 +1,191 @@
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.test import Client
+
+from applications.models import Application
+from jobs.models import Job
+from users.models import CustomUser
+from .benchmark_views import LOCATIONS, SEARCHES, percentile
+
+HOST = '127.0.0.1'
+# How each mode is started; both get the same --workers
+SERVERS = {
+    'wsgi': ['jobportal.wsgi:application', '--worker-class', 'sync'],
+    'asgi': ['--config', 'jobportal/gunicorn_asgi.py'],
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Start the site under gunicorn with sync WSGI workers and then with uvicorn ASGI "
+        "workers, load both with the same concurrent mix of homepage, job_list and "
+        "job_detail requests, and report requests per second and latency as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Server processes per mode (default: 2).')
+        parser.add_argument('--concurrency', type=int, default=32, help='Concurrent clients (default: 32).')
+        parser.add_argument('--duration', type=float, default=15, help='Seconds of load per mode (default: 15).')
+        parser.add_argument('--modes', default='wsgi,asgi', help='Comma-separated modes (default: wsgi,asgi).')
+        parser.add_argument('--anonymous', action='store_true', help='Send no session, so the page cache answers.')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1).')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+
+    def handle(self, *args, **options):
+        modes = options['modes'].split(',')
+        unknown = set(modes) - set(SERVERS)
+        if unknown:
+            raise CommandError(f'Unknown modes: {", ".join(sorted(unknown))}.')
+        bounds = Job.objects.aggregate(low=Min('id'), high=Max('id'))
+        if bounds['low'] is None:
+            raise CommandError('There are no jobs; run seed_scale first.')
+        self.job_ids = (bounds['low'], bounds['high'])
+        self.cookie = None if options['anonymous'] else self.session_cookie()
+
+        report = {
+            'database': settings.DATABASES['default']['ENGINE'],
+            'workers': options['workers'],
+            'concurrency': options['concurrency'],
+            'duration': options['duration'],
+            'logged_in': self.cookie is not None,
+            'modes': {},
+        }
+        for mode in modes:
+            port = free_port()
+            server = self.start(mode, port, options['workers'])
+            try:
+                report['modes'][mode] = self.load(port, options)
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+            self.stderr.write(
+                f'{mode}: {report["modes"][mode]["requests_per_second"]} req/s, '
+                f'p95 {report["modes"][mode]["p95_ms"]} ms'
+            )
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def session_cookie(self):
+        # A logged-in seeker skips the anonymous page cache, so every request reaches a view
+        applicant = Application.objects.order_by().values_list('applicant_id', flat=True).first()
+        user = CustomUser.objects.filter(pk=applicant).first() or CustomUser.objects.filter(is_seeker=True).first()
+        if user is None:
+            raise CommandError('There are no seekers to log in as; run seed_scale or pass --anonymous.')
+        client = Client()
+        client.force_login(user)
+        return f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+
+    def start(self, mode, port, workers):
+        command = [
+            sys.executable, '-m', 'gunicorn', *SERVERS[mode],
+            '--bind', f'{HOST}:{port}', '--workers', str(workers), '--log-level', 'warning',
+        ]
+        server = subprocess.Popen(command, cwd=settings.BASE_DIR, env=dict(os.environ, ASYNC_VIEWS=str(mode == 'asgi')))
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'The {mode} server exited with status {server.returncode}.')
+            try:
+                connection = http.client.HTTPConnection(HOST, port, timeout=5)
+                connection.request('GET', '/jobs/')
+                connection.getresponse().read()
+                return server
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError(f'The {mode} server did not start on port {port}.')
+
+    def paths(self, rng):
+        while True:
+            kind = rng.random()
+            if kind < 0.5:
+                query = {'search': rng.choice(SEARCHES), 'location': rng.choice(LOCATIONS)}
+                yield 'job_list', '/jobs/?' + urlencode({k: v for k, v in query.items() if v})
+            elif kind < 0.9:
+                yield 'job_detail', f'/jobs/{rng.randint(*self.job_ids)}/'
+            else:
+                yield 'homepage', '/?' + urlencode({'search': rng.choice(SEARCHES)})
+
+    def load(self, port, options):
+        results = []
+        lock = threading.Lock()
+        stop_at = time.monotonic() + options['duration']
+        headers = {'Cookie': self.cookie} if self.cookie else {}
+
+        def client(seed):
+            rng = random.Random(seed)
+            paths = self.paths(rng)
+            connection = http.client.HTTPConnection(HOST, port, timeout=60)
+            timings = []
+            while time.monotonic() < stop_at:
+                view, path = next(paths)
+                started = time.perf_counter()
+                try:
+                    connection.request('GET', path, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    status = response.status
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    status = 'error'
+                timings.append((view, (time.perf_counter() - started) * 1000, status))
+            connection.close()
+            with lock:
+                results.extend(timings)
+
+        threads = [
+            threading.Thread(target=client, args=(options['seed'] * 1000 + i,))
+            for i in range(options['concurrency'])
+        ]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        timings = sorted(ms for _, ms, _ in results)
+        statuses = {}
+        for _, _, status in results:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        views = {}
+        for name in ('homepage', 'job_list', 'job_detail'):
+            view_timings = sorted(ms for view, ms, _ in results if view == name)
+            if view_timings:
+                views[name] = {
+                    'requests': len(view_timings),
+                    'p50_ms': round(percentile(view_timings, 0.50), 2),
+                    'p95_ms': round(percentile(view_timings, 0.95), 2),
+                }
+        return {
+            'requests': len(timings),
+            'statuses': statuses,
+            'requests_per_second': round(len(timings) / elapsed, 1),
+            'p50_ms': round(percentile(timings, 0.50), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'p99_ms': round(percentile(timings, 0.99), 2),
+            'views': views,
+        }
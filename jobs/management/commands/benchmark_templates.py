@@ -0,0 +1,93 @@
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from jobportal.testing import PLAIN_STATIC_STORAGE
+from jobs.models import Job
+from jobs.pagination import CursorPaginator
+from users.models import CustomUser
+
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+# A private cache, so clearing it never touches a shared deployment cache
+BENCHMARK_CACHE = {'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark-templates',
+}}
+
+DESCRIPTION = (
+    'We are looking for an engineer to design, build and run the services behind our '
+    'products. You will work with a small team, own features end to end and help us '
+    'keep the platform fast and reliable. '
+) * 4
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare rendering the job_list and dashboard templates with and without "
+        "fragment caching. Seeds its own jobs inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=200, help='Jobs to seed (default: 200).')
+        parser.add_argument('--repeat', type=int, default=200, help='Renders per measurement (default: 200).')
+
+    def handle(self, *args, **options):
+        # Static files are not collected when benchmarking locally
+        with override_settings(STORAGES=PLAIN_STATIC_STORAGE), transaction.atomic():
+            pages = self.seed(options['jobs'])
+
+            self.stdout.write(f'{"template":<28} {"uncached ms":>12} {"cold ms":>9} {"warm ms":>9} {"speedup":>8}')
+            for template, context, request in pages:
+                with override_settings(CACHES=NO_CACHE):
+                    uncached = self.measure(template, context, request, options['repeat'])
+                with override_settings(CACHES=BENCHMARK_CACHE):
+                    cold = self.measure(template, context, request, 1, cold=True)
+                    warm = self.measure(template, context, request, options['repeat'])
+                self.stdout.write(
+                    f'{template:<28} {uncached:>12.3f} {cold:>9.3f} {warm:>9.3f} {uncached / warm:>7.1f}x'
+                )
+
+            transaction.set_rollback(True)
+
+    def seed(self, count):
+        companies = [
+            CustomUser.objects.create_user(f'benchmark-company-{i}', is_company=True) for i in range(20)
+        ]
+        seeker = CustomUser.objects.create_user('benchmark-seeker', is_seeker=True)
+        Job.objects.bulk_create(
+            Job(
+                title=f'Backend Engineer {i}', description=DESCRIPTION, location='Berlin',
+                job_type='FULL_TIME', company=companies[i % len(companies)],
+            )
+            for i in range(count)
+        )
+
+        request = RequestFactory().get('/')
+        request.user = seeker
+        jobs = Job.objects.select_related('company')
+        common = {
+            'total_jobs': count,
+            'total_companies': len(companies),
+            'job_type_choices': Job.JOB_TYPE_CHOICES,
+        }
+        job_list = dict(common, page_obj=CursorPaginator(jobs, 10).get_page())
+        dashboard = dict(common, role='seeker', featured_jobs=list(jobs.order_by('-created_at')[:6]))
+        # Rows are loaded once up front so only rendering is timed
+        list(job_list['page_obj'])
+        return [
+            ('jobs/job_list.html', job_list, request),
+            ('users/dashboard.html', dashboard, request),
+        ]
+
+    def measure(self, template, context, request, repeat, cold=False):
+        render_to_string(template, context, request)  # load and compile the template first
+        if cold:
+            cache.clear()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            render_to_string(template, context, request)
+        return (time.perf_counter() - started) / repeat * 1000
@@ -0,0 +1,207 @@
+import json
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.models import Max, Min
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from applications.models import Application
+from jobportal.testing import PLAIN_STATIC_STORAGE
+from jobs.models import Job
+from users.models import CustomUser
+
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+SEARCHES = ['', '', 'python', 'engineer', 'senior data', 'react developer']
+LOCATIONS = ['', '', 'berlin', 'london', 'remote']
+COMPANY_JOBS = 50  # jobs of a company the applicants_list requests pick from
+
+
+class QueryCounter:
+    # Lighter than CaptureQueriesContext, which formats every statement
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(values, fraction):
+    # values sorted; nearest rank
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class Scenarios:
+    """Builds the requests of each benchmarked view from the rows in the database."""
+
+    def __init__(self):
+        bounds = Job.objects.aggregate(low=Min('id'), high=Max('id'))
+        if bounds['low'] is None:
+            raise CommandError('There are no jobs; run seed_scale first.')
+        self.job_ids = (bounds['low'], bounds['high'])
+        self.companies = list(
+            Job.objects.order_by().values_list('company_id', flat=True).distinct()[:1000]
+        )
+        self.seekers = list(
+            Application.objects.order_by().values_list('applicant_id', flat=True).distinct()[:1000]
+        )
+
+    def random_job_id(self, rng):
+        # Ids may have gaps; job_detail answering 404 for some of them is part of the run
+        return rng.randint(*self.job_ids)
+
+    def login(self, client, rng, kind):
+        if kind == 'company':
+            user_id = rng.choice(self.companies)
+        elif kind == 'seeker':
+            if not self.seekers:
+                raise CommandError('There are no applications; run seed_scale first.')
+            user_id = rng.choice(self.seekers)
+        else:
+            return None
+        client.force_login(CustomUser.objects.get(pk=user_id))
+        return user_id
+
+    def requests(self, name, rng, user_id):
+        """An endless stream of (path, query) pairs for one view."""
+        if name in ('job_list', 'job_list_anonymous', 'homepage'):
+            url = reverse('homepage' if name == 'homepage' else 'job_list')
+            while True:
+                yield url, {'search': rng.choice(SEARCHES), 'location': rng.choice(LOCATIONS)}
+        elif name == 'job_detail':
+            while True:
+                yield reverse('job_detail', args=[self.random_job_id(rng)]), {}
+        elif name == 'applicants_list':
+            job_ids = list(Job.objects.filter(company_id=user_id).values_list('id', flat=True)[:COMPANY_JOBS])
+            while True:
+                yield reverse('applicants_list', args=[rng.choice(job_ids)]), {}
+        else:
+            while True:
+                yield reverse(name), {}
+
+
+# view: who requests it
+VIEWS = {
+    'homepage': None,
+    'job_list_anonymous': None,
+    'job_list': 'seeker',
+    'job_detail': 'seeker',
+    'dashboard': 'seeker',
+    'my_applications': 'seeker',
+    'my_jobs': 'company',
+    'applicants_list': 'company',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Request every main view through the test client at a given concurrency and "
+        "report latency percentiles and queries per request as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per view (default: 200).')
+        parser.add_argument('--concurrency', type=int, default=4, help='Parallel clients (default: 4).')
+        parser.add_argument('--views', help=f'Comma-separated subset of: {", ".join(VIEWS)}.')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1).')
+        parser.add_argument('--no-cache', action='store_true', help='Run with the dummy cache backend.')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+
+    def handle(self, *args, **options):
+        names = options['views'].split(',') if options['views'] else list(VIEWS)
+        unknown = set(names) - set(VIEWS)
+        if unknown:
+            raise CommandError(f'Unknown views: {", ".join(sorted(unknown))}.')
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--requests and --concurrency must be at least 1.')
+
+        overrides = {
+            # Static files are not collected when benchmarking locally
+            'STORAGES': PLAIN_STATIC_STORAGE,
+            'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver'],
+        }
+        if options['no_cache']:
+            overrides['CACHES'] = NO_CACHE
+
+        with override_settings(**overrides):
+            scenarios = Scenarios()
+            report = {
+                'database': connection.vendor,
+                'jobs': Job.objects.count(),
+                'applications': Application.objects.count(),
+                'requests_per_view': options['requests'],
+                'concurrency': options['concurrency'],
+                'cache': 'dummy' if options['no_cache'] else settings.CACHES['default']['BACKEND'],
+                'views': {},
+            }
+            for name in names:
+                report['views'][name] = self.run_view(scenarios, name, options)
+                self.stderr.write(f'{name}: p95 {report["views"][name]["p95_ms"]} ms')
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def run_view(self, scenarios, name, options):
+        concurrency = options['concurrency']
+        shares = [options['requests'] // concurrency + (i < options['requests'] % concurrency) for i in range(concurrency)]
+        seeds = [options['seed'] * 1000 + i for i in range(concurrency)]
+        started = time.perf_counter()
+        if concurrency == 1:
+            results = [self.run_client(scenarios, name, shares[0], seeds[0])]
+        else:
+            with ThreadPoolExecutor(concurrency) as pool:
+                results = list(pool.map(self.run_client, [scenarios] * concurrency, [name] * concurrency, shares, seeds))
+        elapsed = time.perf_counter() - started
+
+        timings = sorted(ms for result in results for ms, _, _ in result)
+        queries = sorted(count for result in results for _, count, _ in result)
+        statuses = {}
+        for result in results:
+            for _, _, status in result:
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+        return {
+            'requests': len(timings),
+            'statuses': statuses,
+            'throughput_rps': round(len(timings) / elapsed, 1),
+            'mean_ms': round(statistics.fmean(timings), 2),
+            'p50_ms': round(percentile(timings, 0.50), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'p99_ms': round(percentile(timings, 0.99), 2),
+            'max_ms': round(timings[-1], 2),
+            'queries_p50': percentile(queries, 0.50),
+            'queries_max': queries[-1],
+        }
+
+    def run_client(self, scenarios, name, count, seed):
+        # Each client is one user; their requests vary with the seed
+        rng = random.Random(seed)
+        client = Client()
+        try:
+            user_id = scenarios.login(client, rng, VIEWS[name])
+            requests = scenarios.requests(name, rng, user_id)
+            results = []
+            for _ in range(count):
+                path, query = next(requests)
+                queries = QueryCounter()
+                with connection.execute_wrapper(queries):
+                    started = time.perf_counter()
+                    response = client.get(path, query)
+                    ms = (time.perf_counter() - started) * 1000
+                results.append((ms, queries.count, response.status_code))
+            return results
+        finally:
+            # Worker threads open connections of their own
+            if threading.current_thread() is not threading.main_thread():
+                connections.close_all()
@@ -0,0 +1,197 @@
+import csv
+import json
+import os
+import sys
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from jobs import search, similarity
+from jobs.forms import JobForm
+from jobs.models import Job
+from jobs.pagecache import invalidate_pages
+from jobs.resultcache import invalidate_results
+from jobs.stats import invalidate_site_stats
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import jobs from a CSV or NDJSON file (or '-' for stdin). Each row "
+        "needs title, description, location, job_type and company (a company "
+        "username) and is validated with JobForm's fields."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help="Path of the file to import, or '-' for stdin.")
+        parser.add_argument(
+            '--format', choices=['csv', 'ndjson'],
+            help='Input format (default: guessed from the file extension, csv for stdin).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Rows inserted per bulk_create and transaction (default: 1000).',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='File recording how many rows were committed (default: <source>.checkpoint).',
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Skip the rows already committed according to the checkpoint file.',
+        )
+
+    def handle(self, *args, **options):
+        source = options['source']
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        checkpoint = options['checkpoint']
+        if checkpoint is None and source != '-':
+            checkpoint = source + '.checkpoint'
+        if options['resume'] and checkpoint is None:
+            raise CommandError('--resume needs --checkpoint when reading from stdin.')
+
+        skip = self.read_checkpoint(checkpoint) if options['resume'] else 0
+        fmt = options['format'] or ('ndjson' if source.endswith(('.ndjson', '.jsonl')) else 'csv')
+
+        # Resolve company usernames once instead of one query per row
+        companies = dict(CustomUser.objects.filter(is_company=True).values_list('username', 'id'))
+        # Building a form deep-copies its fields, which would dominate the import,
+        # so every row is cleaned by the fields of a single JobForm instead
+        self.fields = JobForm().fields
+
+        stream = self.open_source(source)
+        try:
+            self.import_rows(self.read_rows(stream, fmt), companies, batch_size, skip, checkpoint)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+    def open_source(self, source):
+        if source == '-':
+            return sys.stdin
+        try:
+            return open(source, newline='', encoding='utf-8')
+        except OSError as error:
+            raise CommandError(f'Cannot open {source}: {error}')
+
+    def read_rows(self, stream, fmt):
+        if fmt == 'csv':
+            yield from csv.DictReader(stream)
+            return
+        for line in stream:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as error:
+                    yield {'__error__': f'invalid JSON: {error}'}
+
+    def read_checkpoint(self, path):
+        if not os.path.exists(path):
+            return 0
+        with open(path) as f:
+            checkpoint = json.load(f)
+        # The run stopped while committing a batch: its last job shows whether the commit happened
+        pending = checkpoint.get('pending')
+        if pending and Job.objects.filter(pk=pending['last_id'], title=pending['last_title']).exists():
+            return pending['rows']
+        return checkpoint['rows']
+
+    def write_checkpoint(self, path, rows, pending=None):
+        if path is None:
+            return
+        checkpoint = {'rows': rows}
+        if pending:
+            checkpoint['pending'] = pending
+        # Write then rename, so a crash never leaves a half-written checkpoint
+        with open(path + '.tmp', 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(path + '.tmp', path)
+
+    def import_rows(self, rows, companies, batch_size, skip, checkpoint):
+        started = time.monotonic()
+        consumed = inserted = failed = 0
+        committed = skip
+        batch = []
+
+        for row in rows:
+            consumed += 1
+            if consumed <= skip:
+                continue
+
+            job = self.build_job(row, companies, consumed)
+            if job is None:
+                failed += 1
+            else:
+                batch.append(job)
+
+            if len(batch) >= batch_size:
+                inserted += self.insert(batch, checkpoint, committed, consumed)
+                committed = consumed
+                batch = []
+                self.report(consumed, inserted, failed, started)
+
+        if batch:
+            inserted += self.insert(batch, checkpoint, committed, consumed)
+        self.write_checkpoint(checkpoint, consumed)
+        if inserted:
+            # The cached pages, search results and stats predate the new jobs
+            invalidate_site_stats()
+            invalidate_pages()
+            invalidate_results()
+
+        elapsed = time.monotonic() - started
+        rate = inserted / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {inserted} jobs ({failed} rejected, {skip} skipped) '
+            f'in {elapsed:.1f}s, {rate:.0f} rows/s.'
+        ))
+
+    def build_job(self, row, companies, line):
+        if not isinstance(row, dict):
+            self.stderr.write(f'Row {line}: expected a JSON object, got {type(row).__name__}.')
+            return None
+        if '__error__' in row:
+            self.stderr.write(f'Row {line}: {row["__error__"]}')
+            return None
+
+        cleaned, errors = {}, []
+        for name, field in self.fields.items():
+            try:
+                cleaned[name] = field.clean(row.get(name))
+            except ValidationError as error:
+                errors.append(f'{name}: {" ".join(error.messages)}')
+        if errors:
+            self.stderr.write(f'Row {line}: {"; ".join(errors)}')
+            return None
+
+        company_id = companies.get((row.get('company') or '').strip())
+        if company_id is None:
+            self.stderr.write(f'Row {line}: company: unknown company {row.get("company")!r}.')
+            return None
+
+        return Job(company_id=company_id, **cleaned)
+
+    def insert(self, batch, checkpoint, committed, consumed):
+        with transaction.atomic():
+            jobs = Job.objects.bulk_create(batch)
+            # bulk_create skips post_save, so index the new rows and queue
+            # them for the related jobs worker here
+            search.index_jobs([job.pk for job in jobs])
+            similarity.mark_stale([job.pk for job in jobs])
+            # Recorded inside the transaction, so a crash around the commit
+            # neither imports the batch twice nor skips it on --resume
+            self.write_checkpoint(checkpoint, committed, pending={
+                'rows': consumed, 'last_id': jobs[-1].pk, 'last_title': jobs[-1].title,
+            })
+        self.write_checkpoint(checkpoint, consumed)
+        return len(jobs)
+
+    def report(self, consumed, inserted, failed, started):
+        elapsed = time.monotonic() - started
+        rate = inserted / elapsed if elapsed else 0
+        self.stdout.write(f'{consumed} rows read, {inserted} inserted, {failed} rejected ({rate:.0f} rows/s)')
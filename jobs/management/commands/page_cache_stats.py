@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from jobs.pagecache import page_cache_stats, reset_page_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Show the anonymous page cache hit and miss counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Zero the counters after printing them.')
+
+    def handle(self, *args, **options):
+        stats = page_cache_stats()
+        self.stdout.write(
+            f"hits: {stats['hits']}\n"
+            f"misses: {stats['misses']}\n"
+            f"hit ratio: {stats['hit_ratio']:.1%}\n"
+            f"version: {stats['version']}"
+        )
+        if options['reset']:
+            reset_page_cache_stats()
+            self.stdout.write('Counters reset.')
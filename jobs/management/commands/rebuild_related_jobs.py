@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs import similarity
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the related jobs shown on job_detail from scratch, or with "
+        "--changed only rescore the jobs saved since they were last scored."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-k', type=int, default=similarity.TOP_K,
+            help=f'Related jobs stored per job (default: {similarity.TOP_K}).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Rows inserted per bulk_create, or jobs rescored at a time with --changed (default: 2000).',
+        )
+        parser.add_argument(
+            '--changed', action='store_true',
+            help='Only rescore the jobs queued by saves since they were last scored.',
+        )
+        parser.add_argument(
+            '--watch', action='store_true',
+            help='With --changed, keep polling the queue; the fitted index stays in memory between polls.',
+        )
+        parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds to wait when idle.')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        if options['changed']:
+            self.update_changed(options)
+            return
+
+        total = 0
+        for total in similarity.rebuild_related_jobs(options['top_k'], options['batch_size']):
+            self.stdout.write(f'Scored {total} jobs...')
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Related jobs rebuilt: {total} jobs in {elapsed:.1f}s.'
+        ))
+
+    def update_changed(self, options):
+        while True:
+            started = time.monotonic()
+            total = similarity.update_stale_related_jobs(options['batch_size'], options['top_k'])
+            if total or not options['watch']:
+                elapsed = time.monotonic() - started
+                self.stdout.write(self.style.SUCCESS(f'Rescored {total} saved jobs in {elapsed:.1f}s.'))
+            if not options['watch']:
+                return
+            if not total:
+                time.sleep(options['poll_interval'])
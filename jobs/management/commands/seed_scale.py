@@ -0,0 +1,232 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from applications.models import Application
+from jobs import search
+from jobs.models import Job
+from jobs.pagecache import invalidate_pages
+from jobs.resultcache import invalidate_results
+from jobs.stats import invalidate_site_stats
+from users.models import CustomUser
+
+SENIORITY = ['', '', 'Junior ', 'Senior ', 'Senior ', 'Lead ', 'Staff ', 'Principal ']
+ROLES = [
+    'Backend Engineer', 'Frontend Developer', 'Full Stack Developer', 'Python Developer',
+    'Data Engineer', 'Data Scientist', 'DevOps Engineer', 'Site Reliability Engineer',
+    'Mobile Developer', 'QA Engineer', 'Product Manager', 'UX Designer', 'Security Engineer',
+    'Machine Learning Engineer', 'Database Administrator', 'Technical Writer',
+    'Support Engineer', 'Engineering Manager', 'Solutions Architect', 'Sales Engineer',
+]
+SKILLS = [
+    'Python', 'Django', 'PostgreSQL', 'React', 'TypeScript', 'Go', 'Rust', 'Kubernetes',
+    'AWS', 'Terraform', 'Kafka', 'Redis', 'Spark', 'Swift', 'Kotlin', 'GraphQL', 'Java',
+]
+# (location, weight): a few big cities hold most of the jobs
+LOCATIONS = [
+    ('Berlin', 12), ('London', 12), ('New York', 10), ('San Francisco', 8), ('Amsterdam', 6),
+    ('Paris', 6), ('Toronto', 5), ('Bangalore', 8), ('Singapore', 4), ('Sydney', 3),
+    ('Lisbon', 3), ('Warsaw', 3), ('Austin', 3), ('Dublin', 3), ('Remote', 14),
+]
+JOB_TYPES = [('FULL_TIME', 70), ('PART_TIME', 10), ('REMOTE', 20)]
+STATUSES = [('pending', 60), ('reviewed', 25), ('accepted', 5), ('rejected', 10)]
+SENTENCES = [
+    'You will design, build and run the services behind our products.',
+    'We are a small team that owns features end to end.',
+    'Experience with {skill} and {other} is a strong plus.',
+    'You care about reliability, observability and fast feedback loops.',
+    'Our stack is mostly {skill}, with some {other} where it fits.',
+    'We offer flexible hours, a learning budget and a hardware allowance.',
+    'You will pair with product and design to ship improvements every week.',
+    'Help us keep the platform fast as we grow tenfold this year.',
+    'You have shipped and operated production systems before.',
+    'We review every change and deploy many times a day.',
+]
+COVER_LETTERS = [
+    '', '', 'I would love to join your team.',
+    'I have several years of experience with {skill} and would be glad to talk.',
+    'Please find my details attached. I am available to start next month.',
+]
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    # auto_now/auto_now_add would overwrite the spread-out dates the seeder sets
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with realistic companies, seekers, jobs and applications "
+        "for load testing. Uses a seeded RNG, so the same options give the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=2000, help='Company accounts (default: 2000).')
+        parser.add_argument('--seekers', type=int, default=200_000, help='Seeker accounts (default: 200000).')
+        parser.add_argument('--jobs', type=int, default=1_000_000, help='Jobs (default: 1000000).')
+        parser.add_argument(
+            '--applications', type=int, default=10_000_000, help='Applications (default: 10000000).',
+        )
+        parser.add_argument('--days', type=int, default=365, help='Spread jobs over this many days (default: 365).')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1).')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk_create (default: 5000).')
+        parser.add_argument(
+            '--prefix', default='scale-',
+            help="Username prefix of the seeded accounts (default: 'scale-').",
+        )
+        parser.add_argument(
+            '--password', default='password',
+            help="Password of every seeded account (default: 'password').",
+        )
+
+    def handle(self, *args, **options):
+        if options['companies'] < 1 and options['jobs'] > 0:
+            raise CommandError('Jobs need at least one company.')
+        if options['applications'] > options['seekers'] * options['jobs']:
+            raise CommandError('More applications than seeker and job pairs.')
+        prefix = options['prefix']
+        if CustomUser.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(f"Accounts named {prefix}* already exist, pick another --prefix.")
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        started = time.monotonic()
+
+        companies = self.create_users(prefix + 'company-', options['companies'], options['password'], is_company=True)
+        seekers = self.create_users(prefix + 'seeker-', options['seekers'], options['password'], is_seeker=True)
+        jobs = self.create_jobs(companies, options['jobs'], options['days'])
+        applications = self.create_applications(seekers, jobs, options['applications'])
+        # bulk_create leaves the counters on Job at zero
+        if applications:
+            call_command('recount_applications', stdout=self.stdout)
+
+        invalidate_site_stats()
+        invalidate_pages()
+        invalidate_results()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(companies)} companies, {len(seekers)} seekers, {len(jobs)} jobs and '
+            f'{applications} applications in {elapsed:.1f}s.'
+        ))
+        self.stdout.write(
+            'Related jobs and seeker feeds are not built; run rebuild_related_jobs and '
+            'build_seeker_feeds if the benchmark should include them.'
+        )
+
+    def create_users(self, prefix, count, password, **flags):
+        # Hashing is deliberately slow, every account shares one hash
+        hashed = make_password(password)
+        ids = []
+        for start in range(0, count, self.batch_size):
+            users = [
+                CustomUser(
+                    username=f'{prefix}{i}', email=f'{prefix}{i}@example.com', password=hashed,
+                    date_joined=self.now - timedelta(days=self.rng.uniform(0, 3 * 365)), **flags,
+                )
+                for i in range(start, min(start + self.batch_size, count))
+            ]
+            with transaction.atomic():
+                ids.extend(user.pk for user in CustomUser.objects.bulk_create(users))
+        self.stdout.write(f'{len(ids)} {prefix}* accounts')
+        return ids
+
+    def job_description(self):
+        skill, other = self.rng.sample(SKILLS, 2)
+        return ' '.join(
+            sentence.format(skill=skill, other=other)
+            for sentence in self.rng.sample(SENTENCES, self.rng.randint(3, 6))
+        )
+
+    def create_jobs(self, companies, count, days):
+        # Returns (id, created_at) pairs, oldest first
+        jobs = []
+        # Some companies post far more than others
+        company_weights = list(accumulate(1 / (rank + 1) for rank in range(len(companies))))
+        ages = sorted((self.rng.uniform(0, days) for _ in range(count)), reverse=True)
+        fields = (Job._meta.get_field('created_at'), Job._meta.get_field('updated_at'))
+        with explicit_timestamps(*fields):
+            for start in range(0, count, self.batch_size):
+                batch = []
+                for age in ages[start:start + self.batch_size]:
+                    created_at = self.now - timedelta(days=age)
+                    batch.append(Job(
+                        title=self.rng.choice(SENIORITY) + self.rng.choice(ROLES),
+                        description=self.job_description(),
+                        location=weighted(self.rng, LOCATIONS),
+                        job_type=weighted(self.rng, JOB_TYPES),
+                        company_id=self.rng.choices(companies, cum_weights=company_weights)[0],
+                        created_at=created_at,
+                        updated_at=created_at,
+                    ))
+                with transaction.atomic():
+                    created = Job.objects.bulk_create(batch)
+                    # bulk_create skips post_save, so index the new rows here
+                    search.index_jobs([job.pk for job in created])
+                jobs.extend((job.pk, job.created_at) for job in created)
+                self.stdout.write(f'{len(jobs)} jobs')
+        return jobs
+
+    def pick_jobs(self, jobs, count):
+        if count > len(jobs) // 2:
+            return self.rng.sample(range(len(jobs)), count)
+        # Newer jobs draw more applicants: squaring a uniform draw favours the end of the list
+        picked = set()
+        while len(picked) < count:
+            picked.add(len(jobs) - 1 - int(len(jobs) * self.rng.random() ** 2))
+        return picked
+
+    def create_applications(self, seekers, jobs, count):
+        if not count:
+            return 0
+        per_seeker, extra = divmod(count, len(seekers))
+        fields = (Application._meta.get_field('applied_at'), Application._meta.get_field('updated_at'))
+        total = 0
+        batch = []
+        with explicit_timestamps(*fields):
+            for position, seeker in enumerate(seekers):
+                for index in self.pick_jobs(jobs, per_seeker + (position < extra)):
+                    job_id, posted_at = jobs[index]
+                    applied_at = posted_at + (self.now - posted_at) * self.rng.random() ** 3
+                    skill = self.rng.choice(SKILLS)
+                    batch.append(Application(
+                        job_id=job_id, applicant_id=seeker,
+                        cover_letter=self.rng.choice(COVER_LETTERS).format(skill=skill),
+                        status=weighted(self.rng, STATUSES),
+                        applied_at=applied_at, updated_at=applied_at,
+                    ))
+                if len(batch) >= self.batch_size:
+                    total += self.insert_applications(batch, total)
+                    batch = []
+            if batch:
+                total += self.insert_applications(batch, total)
+        return total
+
+    def insert_applications(self, batch, total):
+        # Signals are skipped on purpose: there are no resumes to extract and
+        # feeds are built separately
+        with transaction.atomic():
+            Application.objects.bulk_create(batch)
+        self.stdout.write(f'{total + len(batch)} applications')
+        return len(batch)
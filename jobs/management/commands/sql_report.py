@@ -0,0 +1,106 @@
+import json
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from jobportal.sqlsampler import sampler
+
+SORT_KEYS = {
+    'total': lambda shape: shape['total_ms'],
+    'calls': lambda shape: shape['calls'],
+    'p95': lambda shape: shape['p95'],
+}
+
+
+def weighted_percentile(samples, fraction):
+    # samples: (ms, weight) pairs sorted by ms
+    target = fraction * sum(weight for _, weight in samples)
+    seen = 0
+    for ms, weight in samples:
+        seen += weight
+        if seen >= target:
+            return ms
+    return samples[-1][0]
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the query shapes that cost the most, from the samples written by "
+        "jobportal.sqlsampler (SQL_SAMPLE_FILE)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'files', nargs='*',
+            help='Sample files to read, e.g. one per host (default: SQL_SAMPLE_FILE).',
+        )
+        parser.add_argument('--top', type=int, default=10, help='Shapes to show (default: 10).')
+        parser.add_argument('--sort', choices=sorted(SORT_KEYS), default='total', help='Ranking (default: total).')
+        parser.add_argument('--stacks', action='store_true', help='Show where the slow queries of each shape ran.')
+
+    def handle(self, *args, **options):
+        files = options['files']
+        if not files:
+            if not getattr(settings, 'SQL_SAMPLE_FILE', None):
+                raise CommandError('SQL_SAMPLE_FILE is not set, pass the sample files to read.')
+            # Samples still buffered by this process
+            sampler.flush()
+            files = [settings.SQL_SAMPLE_FILE]
+
+        shapes = self.read(files)
+        if not shapes:
+            self.stdout.write('No samples.')
+            return
+        ranked = sorted(shapes.values(), key=SORT_KEYS[options['sort']], reverse=True)[:options['top']]
+
+        self.stdout.write(
+            f'{"calls":>9} {"total ms":>11} {"p50":>8} {"p95":>8} {"p99":>8} {"max":>8} {"slow":>5}  query'
+        )
+        for shape in ranked:
+            self.stdout.write(
+                f'{shape["calls"]:>9.0f} {shape["total_ms"]:>11.1f} {shape["p50"]:>8.2f} '
+                f'{shape["p95"]:>8.2f} {shape["p99"]:>8.2f} {shape["max"]:>8.2f} {shape["slow"]:>5}  '
+                f'{shape["fingerprint"]}'
+            )
+            views = ', '.join(f'{view} ({count})' for view, count in shape['views'].most_common(3))
+            self.stdout.write(f'{"":>63}views: {views or "-"}')
+            if options['stacks']:
+                for stack, count in shape['stacks'].most_common(2):
+                    self.stdout.write(f'{"":>63}{count} slow from:')
+                    for frame in stack:
+                        self.stdout.write(f'{"":>65}{frame}')
+
+    def read(self, files):
+        samples = defaultdict(list)
+        views = defaultdict(Counter)
+        stacks = defaultdict(Counter)
+        for path in files:
+            try:
+                with open(path, encoding='utf-8') as f:
+                    for line in f:
+                        sample = json.loads(line)
+                        key = sample['fingerprint']
+                        samples[key].append((sample['ms'], sample['weight']))
+                        views[key][sample['view'] or 'no request'] += sample['weight']
+                        if 'stack' in sample:
+                            stacks[key][tuple(sample['stack'])] += 1
+            except FileNotFoundError:
+                raise CommandError(f'No sample file at {path}.')
+
+        shapes = {}
+        for key, timings in samples.items():
+            timings.sort()
+            shapes[key] = {
+                'fingerprint': key,
+                'calls': sum(weight for _, weight in timings),
+                'total_ms': sum(ms * weight for ms, weight in timings),
+                'p50': weighted_percentile(timings, 0.5),
+                'p95': weighted_percentile(timings, 0.95),
+                'p99': weighted_percentile(timings, 0.99),
+                'max': timings[-1][0],
+                'slow': sum(stacks[key].values()),
+                'views': Counter({view: round(count) for view, count in views[key].items()}),
+                'stacks': stacks[key],
+            }
+        return shapes
@@ -0,0 +1,65 @@
+# Full-text search index for Job postings.
+#
+# SQLite gets an FTS5 virtual table next to jobs_job, PostgreSQL gets a
+# tsvector column with a GIN index. Neither is a model field: both are
+# maintained by jobs/search.py from the signals in jobs/signals.py.
+
+from django.db import migrations
+
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_job_fts USING fts5(
+        title, description, company,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    """
+    INSERT INTO jobs_job_fts (rowid, title, description, company)
+    SELECT j.id, j.title, j.description, u.username
+    FROM jobs_job j JOIN users_customuser u ON u.id = j.company_id
+    """,
+]
+
+SQLITE_BACKWARD = [
+    "DROP TABLE IF EXISTS jobs_job_fts",
+]
+
+POSTGRES_FORWARD = [
+    "ALTER TABLE jobs_job ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    """
+    UPDATE jobs_job SET search_vector =
+        setweight(to_tsvector('english', coalesce(jobs_job.title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(u.username, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(jobs_job.description, '')), 'B')
+    FROM users_customuser u WHERE u.id = jobs_job.company_id
+    """,
+    "CREATE INDEX IF NOT EXISTS jobs_job_search_vector_gin ON jobs_job USING GIN (search_vector)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS jobs_job_search_vector_gin",
+    "ALTER TABLE jobs_job DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def run(statements_by_vendor):
+    def operation(apps, schema_editor):
+        for sql in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0002_alter_job_company_alter_job_job_type_and_more"),
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD}),
+            run({"sqlite": SQLITE_BACKWARD, "postgresql": POSTGRES_BACKWARD}),
+        ),
+    ]
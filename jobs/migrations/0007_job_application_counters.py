@@ -0,0 +1,67 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:54
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def count_applications(apps, schema_editor):
+    Job = apps.get_model("jobs", "Job")
+    Application = apps.get_model("applications", "Application")
+
+    def counted(status=None):
+        applications = Application.objects.filter(job=models.OuterRef("pk"))
+        if status:
+            applications = applications.filter(status=status)
+        return Coalesce(
+            models.Subquery(
+                applications.order_by()
+                .values("job")
+                .annotate(n=models.Count("*"))
+                .values("n")
+            ),
+            models.Value(0),
+        )
+
+    Job.objects.update(
+        applications_count=counted(),
+        pending_count=counted("pending"),
+        reviewed_count=counted("reviewed"),
+        accepted_count=counted("accepted"),
+        rejected_count=counted("rejected"),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0006_job_updated_at"),
+        ("applications", "0005_seeker_feed"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="accepted_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="applications_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="pending_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="rejected_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="reviewed_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_applications, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0007_job_application_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StaleRelatedJobs",
+            fields=[
+                (
+                    "job",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="+",
+                        serialize=False,
+                        to="jobs.job",
+                    ),
+                ),
+                ("marked_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -16,6 +16,46 @@ class Job(models.Model):
     job_type = models.CharField(max_length=20, choices=JOB_TYPE_CHOICES)
     company = models.ForeignKey(CustomUser, on_delete=models.CASCADE, limit_choices_to={'is_company': True})
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Kept in step by applications/counters.py, repaired by recount_applications
+    applications_count = models.PositiveIntegerField(default=0)
+    pending_count = models.PositiveIntegerField(default=0)
+    reviewed_count = models.PositiveIntegerField(default=0)
+    accepted_count = models.PositiveIntegerField(default=0)
+    rejected_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Listings are ordered newest first, keyset-paginated on (created_at, id)
+            models.Index(fields=['created_at', 'id'], name='job_created_idx'),
+            models.Index(fields=['job_type', 'created_at', 'id'], name='job_type_created_idx'),
+            models.Index(fields=['company', 'created_at'], name='job_company_created_idx'),
+        ]
     
     def __str__(self):
         return self.title
+
+
+# Precomputed by jobs/similarity.py, read by job_detail
+class RelatedJob(models.Model):
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='related_links', db_index=False)
+    related = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['job', '-score'], name='related_job_score_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.job_id} -> {self.related_id} ({self.score:.2f})'
+
+
+# Jobs saved since their related jobs were last scored; drained by
+# ``rebuild_related_jobs --changed``, see jobs/similarity.py
+class StaleRelatedJobs(models.Model):
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='+')
+    marked_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'Related jobs of {self.job_id} are stale'
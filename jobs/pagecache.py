@@ -0,0 +1,210 @@
+"""
+Whole-page cache for logged-out visitors.
+
+Anonymous job pages are the same for everyone, so cache_anonymous_page()
+stores the rendered HTML. The key holds only the parameters the view reads,
+sorted, with empty ones dropped and free-text ones lower-cased, so
+``?location=Berlin&search=`` and ``?location=berlin`` share an entry.
+
+Keys also carry a version number that jobs/signals.py bumps whenever a job
+changes; old entries are never read again and simply expire. Only the
+portable get/set/add/incr cache calls are used, so the locmem, file and
+Redis backends all work, though only the shared ones (file, Redis) make an
+invalidation visible to every server process at once.
+"""
+import hashlib
+import time
+from functools import wraps
+from urllib.parse import urlencode
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+
+from jobportal.asyncauth import resolve_user
+
+VERSION_KEY = 'pagecache:version'
+HITS_KEY = 'pagecache:hits'
+MISSES_KEY = 'pagecache:misses'
+
+
+def _cache():
+    return caches[getattr(settings, 'PAGE_CACHE_ALIAS', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'PAGE_CACHE_TIMEOUT', 5 * 60)
+
+
+def _increment(key):
+    cache = _cache()
+    # add() only creates the counter if it is missing, so concurrent first hits are not lost
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Evicted between add() and incr()
+            cache.set(key, 1, timeout=None)
+
+
+async def _aincrement(key):
+    cache = _cache()
+    if not await cache.aadd(key, 1, timeout=None):
+        try:
+            await cache.aincr(key)
+        except ValueError:
+            await cache.aset(key, 1, timeout=None)
+
+
+def current_version():
+    version = _cache().get(VERSION_KEY)
+    if version is None:
+        # Start from the clock, not 1, so a counter lost to eviction cannot
+        # come back to a number whose pages are still cached
+        _cache().add(VERSION_KEY, time.time_ns() // 1000, timeout=None)
+        version = _cache().get(VERSION_KEY)
+    return version
+
+
+async def acurrent_version():
+    version = await _cache().aget(VERSION_KEY)
+    if version is None:
+        await _cache().aadd(VERSION_KEY, time.time_ns() // 1000, timeout=None)
+        version = await _cache().aget(VERSION_KEY)
+    return version
+
+
+def invalidate_pages():
+    """Retire every cached page, once the current transaction has committed."""
+    transaction.on_commit(lambda: _increment(VERSION_KEY))
+
+
+def normalize_query(query_dict, params, case_insensitive=()):
+    items = []
+    for name in params:
+        value = query_dict.get(name, '')
+        value = ' '.join(value.split())
+        if name in case_insensitive:
+            value = value.lower()
+        if value:
+            items.append((name, value))
+    return urlencode(sorted(items))
+
+
+def _digest(request, params, case_insensitive):
+    query = normalize_query(request.GET, params, case_insensitive)
+    return hashlib.md5(f'{request.path}?{query}'.encode()).hexdigest()
+
+
+def page_key(request, params, case_insensitive=()):
+    return f'pagecache:{current_version()}:{_digest(request, params, case_insensitive)}'
+
+
+async def apage_key(request, params, case_insensitive=()):
+    return f'pagecache:{await acurrent_version()}:{_digest(request, params, case_insensitive)}'
+
+
+def _cacheable_request(request, user):
+    if request.method not in ('GET', 'HEAD') or user.is_authenticated:
+        return False
+    # Pending flash messages would be baked into the page
+    return not (
+        request.COOKIES.get('messages') or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    )
+
+
+def _hit(cached):
+    content, content_type = cached
+    response = HttpResponse(content, content_type=content_type)
+    response['X-Page-Cache'] = 'hit'
+    return response
+
+
+def _cached_response(key):
+    cached = _cache().get(key)
+    if cached is None:
+        _increment(MISSES_KEY)
+        return None
+    _increment(HITS_KEY)
+    return _hit(cached)
+
+
+async def _acached_response(key):
+    cached = await _cache().aget(key)
+    if cached is None:
+        await _aincrement(MISSES_KEY)
+        return None
+    await _aincrement(HITS_KEY)
+    return _hit(cached)
+
+
+def _storable(response):
+    # Responses setting cookies (CSRF, session) belong to one visitor
+    return response.status_code == 200 and not response.streaming and not response.cookies
+
+
+def _store_response(key, response):
+    if _storable(response):
+        _cache().set(key, (response.content, response['Content-Type']), _timeout())
+    response['X-Page-Cache'] = 'miss'
+    return response
+
+
+async def _astore_response(key, response):
+    if _storable(response):
+        await _cache().aset(key, (response.content, response['Content-Type']), _timeout())
+    response['X-Page-Cache'] = 'miss'
+    return response
+
+
+def cache_anonymous_page(params=(), case_insensitive=()):
+    """
+    Serve anonymous GETs of the decorated view from the page cache.
+
+    ``params`` lists the query parameters the view reads, the only ones
+    that go into the key; ``case_insensitive`` those whose case is ignored.
+    Async views are supported too.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapped(request, *args, **kwargs):
+                if not _cacheable_request(request, await resolve_user(request)):
+                    return await view(request, *args, **kwargs)
+                # The async cache API, so a network backend never blocks the event loop
+                key = await apage_key(request, params, case_insensitive)
+                response = await _acached_response(key)
+                if response is None:
+                    response = await _astore_response(key, await view(request, *args, **kwargs))
+                return response
+            return async_wrapped
+
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if not _cacheable_request(request, request.user):
+                return view(request, *args, **kwargs)
+            key = page_key(request, params, case_insensitive)
+            response = _cached_response(key)
+            if response is None:
+                response = _store_response(key, view(request, *args, **kwargs))
+            return response
+        return wrapped
+    return decorator
+
+
+def page_cache_stats():
+    hits = _cache().get(HITS_KEY, 0)
+    misses = _cache().get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+        'version': _cache().get(VERSION_KEY),
+    }
+
+
+def reset_page_cache_stats():
+    _cache().delete_many([HITS_KEY, MISSES_KEY])
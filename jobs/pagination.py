@@ -0,0 +1,325 @@
+"""
+Keyset (cursor) pagination for job listings.
+
+Pages are addressed by an opaque signed token holding the ordering values of
+the first or last row of the neighbouring page, so page 500 costs the same
+indexed range scan as page 1. Plain ``?page=N`` links still work: that page
+is read once with OFFSET and links onwards with cursors again.
+
+IdListPaginator pages through an already known, ordered list of ids (see
+jobs/resultcache.py) and understands the same cursors.
+
+Both have aget_page() and acount() for async views.
+"""
+import math
+from collections.abc import Sequence
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.core import signing
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+CURSOR_SALT = 'jobs.pagination.cursor'
+
+# Below this many rows the planner estimate is too rough to be worth showing
+ESTIMATE_THRESHOLD = 10000
+
+
+def estimated_count(queryset):
+    """
+    Count the rows of ``queryset`` with a single query. On PostgreSQL an
+    unfiltered count is taken from the planner statistics instead.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql' and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] >= ESTIMATE_THRESHOLD:
+            return row[0]
+    return queryset.count()
+
+
+def _encode_value(value):
+    # Full isoformat keeps the microseconds the keyset comparison depends on
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and 'dt' in value:
+        return parse_datetime(value['dt'])
+    return value
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPage(Sequence):
+    def __init__(self, object_list, number, paginator, has_previous, has_next):
+        self.object_list = object_list
+        self.number = number
+        self.paginator = paginator
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def __repr__(self):
+        return '<Page %s of %s>' % (self.number, self.paginator.num_pages)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return max(self.number - 1, 1)
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return self.paginator.make_cursor(self.object_list[-1], 'next', self.number + 1)
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return self.paginator.make_cursor(self.object_list[0], 'prev', self.previous_page_number())
+
+
+class CursorPaginator:
+    """
+    Paginate ``queryset`` by the given ``ordering``, which must end in a
+    unique field (normally ``id``) so every row has a distinct position.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-created_at', '-id')):
+        self.queryset = queryset.order_by(*ordering)
+        self.per_page = per_page
+        self.ordering = list(ordering)
+        self._count = None
+
+    @property
+    def count(self):
+        if self._count is None:
+            self._count = estimated_count(self.queryset)
+        return self._count
+
+    @property
+    def num_pages(self):
+        return max(1, math.ceil(self.count / self.per_page))
+
+    def _fields(self):
+        return [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+
+    def make_cursor(self, obj, direction, number):
+        # Rows are model instances, or dicts when the queryset uses values()
+        if isinstance(obj, dict):
+            values = [_encode_value(obj[name]) for name, _ in self._fields()]
+        else:
+            values = [_encode_value(getattr(obj, name)) for name, _ in self._fields()]
+        return signing.dumps({'v': values, 'd': direction, 'p': number}, salt=CURSOR_SALT, compress=True)
+
+    def _decode_cursor(self, cursor):
+        try:
+            data = signing.loads(cursor, salt=CURSOR_SALT)
+            values = [_decode_value(value) for value in data['v']]
+            direction = data['d']
+            number = int(data['p'])
+        except (signing.BadSignature, KeyError, TypeError, ValueError):
+            raise InvalidCursor(cursor)
+        if direction not in ('next', 'prev') or len(values) != len(self.ordering):
+            raise InvalidCursor(cursor)
+        return values, direction, max(number, 1)
+
+    def _seek(self, values, direction):
+        # (a, b, c) after (x, y, z)  ==  a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)
+        condition = Q()
+        equal = Q()
+        bound = None
+        for (name, descending), value in zip(self._fields(), values):
+            forwards = descending != (direction == 'prev')
+            lookup = '%s__%s' % (name, 'lt' if forwards else 'gt')
+            condition |= equal & Q(**{lookup: value})
+            equal &= Q(**{name: value})
+            if bound is None:
+                bound = Q(**{'%s__%s' % (name, 'lte' if forwards else 'gte'): value})
+        # The redundant a >= x lets the database turn the OR into an index range scan
+        return bound & condition
+
+    def _reversed_ordering(self):
+        return [name[1:] if name.startswith('-') else '-' + name for name in self.ordering]
+
+    async def acount(self):
+        if self._count is None:
+            self._count = await sync_to_async(estimated_count)(self.queryset)
+        return self._count
+
+    def _target(self, cursor, number):
+        # ('keyset', values, direction, number), or ('offset', number) still to be clamped
+        if cursor:
+            try:
+                values, direction, number = self._decode_cursor(cursor)
+            except InvalidCursor:
+                pass
+            else:
+                return 'keyset', values, direction, number
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            number = 1
+        return 'offset', number
+
+    def _page_query(self, target):
+        # The query for the rows of the page, and the function making the page of them
+        if target[0] == 'keyset':
+            return self._keyset_page(*target[1:])
+        if target[1] > 1:
+            return self._offset_page(min(target[1], self.num_pages))
+        return self._first_page()
+
+    def get_page(self, cursor=None, number=None):
+        """
+        Return the page addressed by ``cursor``, or by the legacy page
+        ``number``. Bad or missing input falls back to the first page.
+        """
+        rows, make_page = self._page_query(self._target(cursor, number))
+        return make_page(list(rows))
+
+    async def aget_page(self, cursor=None, number=None):
+        target = self._target(cursor, number)
+        if target[0] == 'offset' and target[1] > 1:
+            # Legacy page numbers are clamped to the page count
+            await self.acount()
+        rows, make_page = self._page_query(target)
+        return make_page([row async for row in rows])
+
+    def _first_page(self):
+        def make_page(rows):
+            return CursorPage(rows[:self.per_page], 1, self, False, len(rows) > self.per_page)
+        return self.queryset[:self.per_page + 1], make_page
+
+    def _offset_page(self, number):
+        def make_page(rows):
+            return CursorPage(rows[:self.per_page], number, self, number > 1, len(rows) > self.per_page)
+        offset = (number - 1) * self.per_page
+        return self.queryset[offset:offset + self.per_page + 1], make_page
+
+    def _keyset_page(self, values, direction, number):
+        if direction == 'next':
+            def make_page(rows):
+                return CursorPage(rows[:self.per_page], number, self, True, len(rows) > self.per_page)
+            return self.queryset.filter(self._seek(values, 'next'))[:self.per_page + 1], make_page
+
+        def make_previous_page(rows):
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            return CursorPage(rows, number if has_previous else 1, self, has_previous, True)
+        query = (
+            self.queryset.filter(self._seek(values, 'prev'))
+            .order_by(*self._reversed_ordering())[:self.per_page + 1]
+        )
+        return query, make_previous_page
+
+
+class IdListPaginator:
+    """
+    Paginate the objects whose ids are listed, in that order. Each page
+    costs one ``id IN (...)`` query on ``queryset``.
+    """
+
+    def __init__(self, ids, queryset, per_page):
+        self.ids = ids
+        self.queryset = queryset
+        self.per_page = per_page
+        self._positions = None
+
+    @property
+    def count(self):
+        return len(self.ids)
+
+    @property
+    def num_pages(self):
+        return max(1, math.ceil(self.count / self.per_page))
+
+    def make_cursor(self, obj, direction, number):
+        return signing.dumps({'a': obj.pk, 'd': direction, 'p': number}, salt=CURSOR_SALT, compress=True)
+
+    def _position(self, job_id):
+        if self._positions is None:
+            self._positions = {value: position for position, value in enumerate(self.ids)}
+        return self._positions.get(job_id)
+
+    def _decode_cursor(self, cursor):
+        try:
+            data = signing.loads(cursor, salt=CURSOR_SALT)
+            # Keyset cursors from CursorPaginator end with the id of their row
+            anchor = data['a'] if 'a' in data else data['v'][-1]
+            direction = data['d']
+            number = int(data['p'])
+        except (signing.BadSignature, KeyError, IndexError, TypeError, ValueError):
+            raise InvalidCursor(cursor)
+        if direction not in ('next', 'prev'):
+            raise InvalidCursor(cursor)
+        return anchor, direction, max(number, 1)
+
+    async def acount(self):
+        return self.count
+
+    def _slice(self, cursor, number):
+        # The ids of the page, its number and where it starts in the list
+        start = None
+        if cursor:
+            try:
+                anchor, direction, number = self._decode_cursor(cursor)
+            except InvalidCursor:
+                number = 1
+            else:
+                position = self._position(anchor)
+                if position is not None:
+                    start = position + 1 if direction == 'next' else max(position - self.per_page, 0)
+                    # Landing on the first row means the first page, whatever the cursor said
+                    if start == 0:
+                        number = 1
+
+        if start is None:
+            # The anchor row left the results: fall back to the page number
+            try:
+                number = min(max(int(number), 1), self.num_pages)
+            except (TypeError, ValueError):
+                number = 1
+            start = (number - 1) * self.per_page
+
+        return self.ids[start:start + self.per_page], number, start
+
+    def _make_page(self, page_ids, objects, number, start):
+        rows = [objects[job_id] for job_id in page_ids if job_id in objects]
+        return CursorPage(rows, number, self, start > 0, start + self.per_page < self.count)
+
+    def get_page(self, cursor=None, number=None):
+        page_ids, number, start = self._slice(cursor, number)
+        return self._make_page(page_ids, self.queryset.in_bulk(page_ids), number, start)
+
+    async def aget_page(self, cursor=None, number=None):
+        page_ids, number, start = self._slice(cursor, number)
+        return self._make_page(page_ids, await self.queryset.ain_bulk(page_ids), number, start)
@@ -0,0 +1,134 @@
+"""
+Shared cache of search results as ordered lists of job ids.
+
+Logged-in users miss the page cache, but they repeat the same
+(search, location, job_type) combinations as everyone else. matching_job_ids()
+keeps the ordered ids of each combination in a per-process LRU bounded by the
+total number of ids held, so a repeated search costs one ``id IN (...)``
+lookup for the rows of the page being shown.
+
+Entries are stamped with the job data version (jobs/version.py), which
+jobs/signals.py bumps when a job or a company name changes; with a shared
+cache backend that retires the entries of every process at once. Entries
+also expire after RESULT_CACHE_TIMEOUT seconds, which bounds staleness
+where the version itself is per process.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Job
+from .search import filter_jobs, tokenize
+from .version import acurrent_version, bump_version, current_version
+
+# Result sets larger than this are paginated in the database instead
+MAX_RESULT_IDS = 1000
+
+# Stands in for a result set too large to keep
+TOO_MANY = 'too-many'
+
+
+class ResultCache:
+    """
+    A thread-safe LRU mapping keys to id lists, bounded by the number of ids
+    held, whose entries expire ``timeout`` seconds after they were stored.
+    """
+
+    def __init__(self, max_ids, timeout):
+        self.max_ids = max_ids
+        self.timeout = timeout
+        self.entries = OrderedDict()  # key -> (expires, value)
+        self.size = 0
+        self.hits = self.misses = self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self.size -= self._cost(self.entries.pop(key)[1])
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        cost = self._cost(value)
+        with self.lock:
+            if key in self.entries:
+                self.size -= self._cost(self.entries.pop(key)[1])
+            self.entries[key] = (time.monotonic() + self.timeout, value)
+            self.size += cost
+            while self.size > self.max_ids and len(self.entries) > 1:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.size -= self._cost(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def _cost(self, value):
+        return len(value) if isinstance(value, list) else 1
+
+
+result_cache = ResultCache(
+    getattr(settings, 'RESULT_CACHE_MAX_IDS', 200_000), getattr(settings, 'RESULT_CACHE_TIMEOUT', 60),
+)
+
+
+def _bump_version():
+    bump_version()
+    # Entries of the old version can never be read again, free them now
+    result_cache.clear()
+
+
+def invalidate_results():
+    transaction.on_commit(_bump_version)
+
+
+def normalize_filters(search='', location='', job_type=''):
+    # The search only ever sees the words of the query, lower-cased
+    return ' '.join(tokenize(search)), location.strip().lower(), job_type.strip()
+
+
+def _ids_query(filters):
+    jobs, ordering = filter_jobs(Job.objects.all(), *filters)
+    return jobs.order_by(*ordering).values_list('id', flat=True)[:MAX_RESULT_IDS + 1]
+
+
+def _store(key, ids):
+    if len(ids) > MAX_RESULT_IDS:
+        ids = TOO_MANY
+    result_cache.put(key, ids)
+    return ids
+
+
+def matching_job_ids(search='', location='', job_type=''):
+    """
+    The ids of the jobs matching the filters, in listing order, or None when
+    there are more than MAX_RESULT_IDS of them.
+    """
+    filters = normalize_filters(search, location, job_type)
+    key = (current_version(), filters)
+    ids = result_cache.get(key)
+    if ids is None:
+        ids = _store(key, list(_ids_query(filters)))
+    return None if ids == TOO_MANY else ids
+
+
+async def amatching_job_ids(search='', location='', job_type=''):
+    """matching_job_ids() for async views."""
+    filters = normalize_filters(search, location, job_type)
+    key = (await acurrent_version(), filters)
+    ids = result_cache.get(key)
+    if ids is None:
+        ids = _store(key, [job_id async for job_id in _ids_query(filters)])
+    return None if ids == TOO_MANY else ids
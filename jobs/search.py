@@ -0,0 +1,196 @@
+"""
+Full-text search over Job postings.
+
+SQLite keeps an FTS5 table (jobs_job_fts, rowid = job id) and PostgreSQL a
+tsvector column (jobs_job.search_vector) with a GIN index; both are created
+by migration 0003. Other backends fall back to the old icontains filters.
+
+filter_jobs() applies the listing filters shared by the HTML and JSON views.
+"""
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'jobs_job_fts'
+
+# SQLite refuses statements with more than 999 bound parameters on old builds
+ID_CHUNK_SIZE = 500
+
+# bm25 column weights for (title, description, company)
+SQLITE_RANK = f"-bm25({FTS_TABLE}, 10.0, 1.0, 5.0)"
+
+POSTGRES_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(jobs_job.title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(u.username, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(jobs_job.description, '')), 'B')"
+)
+
+
+def backend():
+    if connection.vendor in ('sqlite', 'postgresql'):
+        return connection.vendor
+    return None
+
+
+def tokenize(query):
+    return re.findall(r'\w+', query.lower())
+
+
+def match_expression(tokens):
+    # Every term must match, each one as a prefix so "dev" still finds "developer"
+    if backend() == 'sqlite':
+        return ' AND '.join(f'"{token}"*' for token in tokens)
+    return ' & '.join(f'{token}:*' for token in tokens)
+
+
+def search_jobs(queryset, query):
+    """
+    Filter a Job queryset down to postings matching ``query`` and annotate
+    them with ``search_rank`` (higher is more relevant).
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    if backend() == 'sqlite':
+        match = match_expression(tokens)
+        return queryset.filter(
+            RawSQL(
+                f"jobs_job.id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)",
+                (match,),
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            # Correlated on rowid, FTS5 would rerun the whole MATCH for every
+            # row. LIMIT -1 keeps SQLite from flattening the ranked subquery,
+            # so it is computed once and looked up through an automatic index.
+            search_rank=RawSQL(
+                f"SELECT ranked.rank FROM (SELECT rowid AS id, {SQLITE_RANK} AS rank "
+                f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s LIMIT -1) AS ranked "
+                f"WHERE ranked.id = jobs_job.id",
+                (match,),
+                output_field=FloatField(),
+            )
+        )
+
+    if backend() == 'postgresql':
+        match = match_expression(tokens)
+        return queryset.filter(
+            RawSQL(
+                "jobs_job.search_vector @@ to_tsquery('english', %s)",
+                (match,),
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                "ts_rank_cd(jobs_job.search_vector, to_tsquery('english', %s))",
+                (match,),
+                output_field=FloatField(),
+            )
+        )
+
+    return queryset.filter(
+        Q(title__icontains=query) |
+        Q(description__icontains=query) |
+        Q(company__username__icontains=query)
+    ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+def filter_jobs(queryset, search='', location='', job_type=''):
+    """
+    Apply the job listing filters and return ``(queryset, ordering)``:
+    relevance first when searching, otherwise newest first.
+    """
+    if location:
+        queryset = queryset.filter(location__icontains=location)
+
+    if job_type:
+        queryset = queryset.filter(job_type=job_type)
+
+    # A search without a single word in it (say "!!!") is no search, as in the
+    # result cache keys (resultcache.normalize_filters)
+    if tokenize(search):
+        return search_jobs(queryset, search), ('-search_rank', '-created_at', '-id')
+    return queryset, ('-created_at', '-id')
+
+
+def _chunks(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        yield ids[start:start + ID_CHUNK_SIZE]
+
+
+def index_jobs(job_ids):
+    """(Re)build the search entries for the given job ids."""
+    vendor = backend()
+    if vendor is None:
+        return
+
+    with connection.cursor() as cursor:
+        for chunk in _chunks(job_ids):
+            placeholders = ', '.join(['%s'] * len(chunk))
+            if vendor == 'sqlite':
+                cursor.execute(
+                    f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", chunk
+                )
+                cursor.execute(
+                    f"INSERT INTO {FTS_TABLE} (rowid, title, description, company) "
+                    f"SELECT j.id, j.title, j.description, u.username "
+                    f"FROM jobs_job j JOIN users_customuser u ON u.id = j.company_id "
+                    f"WHERE j.id IN ({placeholders})",
+                    chunk,
+                )
+            else:
+                cursor.execute(
+                    f"UPDATE jobs_job SET search_vector = {POSTGRES_VECTOR} "
+                    f"FROM users_customuser u "
+                    f"WHERE u.id = jobs_job.company_id AND jobs_job.id IN ({placeholders})",
+                    chunk,
+                )
+
+
+def unindex_jobs(job_ids):
+    """Drop the search entries for deleted jobs."""
+    # The PostgreSQL vector lives on the job row itself and goes away with it
+    if backend() != 'sqlite':
+        return
+
+    with connection.cursor() as cursor:
+        for chunk in _chunks(job_ids):
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", chunk
+            )
+
+
+def rebuild_index(batch_size=5000):
+    """
+    Rebuild the whole index in id-ordered batches. Yields the number of jobs
+    indexed so far after every batch.
+    """
+    from .models import Job
+
+    if backend() == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+
+    done = 0
+    last_id = 0
+    while True:
+        ids = list(
+            Job.objects.filter(id__gt=last_id)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        index_jobs(ids)
+        done += len(ids)
+        last_id = ids[-1]
+        yield done
+
+    if backend() == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
@@ -0,0 +1,68 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from users.models import CustomUser
+from .models import Job
+from . import search, similarity
+from .pagecache import invalidate_pages
+from .resultcache import invalidate_results
+from .stats import invalidate_site_stats
+
+
+# Keep the full-text index in step with the jobs table
+@receiver(post_save, sender=Job)
+def index_saved_job(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.index_jobs([instance.pk])
+
+
+@receiver(post_delete, sender=Job)
+def unindex_deleted_job(sender, instance, **kwargs):
+    search.unindex_jobs([instance.pk])
+
+
+# Queue new and edited jobs for the related jobs worker (rebuild_related_jobs
+# --changed); a deleted job's links go with it by cascade
+@receiver(post_save, sender=Job)
+def queue_related_jobs(sender, instance, raw=False, **kwargs):
+    if not raw:
+        similarity.mark_stale([instance.pk])
+
+
+# Company names are searchable too, so a rename has to reindex its jobs
+@receiver(post_save, sender=CustomUser)
+def reindex_company_jobs(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    if raw or created or not instance.is_company:
+        return
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    search.index_jobs(Job.objects.filter(company=instance).values_list('id', flat=True))
+    invalidate_pages()
+    invalidate_results()
+
+
+# Site statistics only change when jobs or company accounts do
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def refresh_stats_for_job(sender, raw=False, **kwargs):
+    if not raw:
+        invalidate_site_stats()
+
+
+# Every anonymous page lists or shows jobs, see jobs/pagecache.py; any
+# change can also move a job in or out of cached search results
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def expire_cached_pages(sender, raw=False, **kwargs):
+    if not raw:
+        invalidate_pages()
+        invalidate_results()
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def refresh_stats_for_company(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Logins only touch last_login and happen all the time
+    if raw or (update_fields is not None and 'is_company' not in update_fields):
+        return
+    invalidate_site_stats()
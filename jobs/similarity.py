@@ -0,0 +1,296 @@
+"""
+Related jobs by content similarity.
+
+Every job's title and description become a TF-IDF vector (title words count
+twice) and the TOP_K most similar jobs by cosine similarity are stored in
+the RelatedJob table, so job_detail reads them with one indexed lookup.
+
+rebuild_related_jobs() recomputes the whole table (see the command of the
+same name). Between rebuilds, jobs.signals queues saved jobs in
+StaleRelatedJobs, and ``rebuild_related_jobs --changed`` hands them to
+update_related_jobs(): they are scored against the fitted index the worker
+keeps in memory, and slot into their neighbours' lists where they rank high
+enough. Web processes never fit the index. Deleting a job drops its links
+by cascade. The vocabulary and IDF weights only move on a full rebuild.
+"""
+import re
+import uuid
+from collections import Counter
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+from scipy import sparse
+
+from .models import Job, RelatedJob, StaleRelatedJobs
+
+TOP_K = 5
+TITLE_WEIGHT = 2
+
+# Similarity is computed in blocks of rows of about this many cells (8M floats = 32 MB)
+BLOCK_CELLS = 8_000_000
+
+# How many of the most similar jobs may take a newly saved job into their lists
+REVERSE_CANDIDATES = 200
+
+INDEX_VERSION_CACHE_KEY = 'jobs:similarity_version'
+
+STOP_WORDS = frozenset('''
+    a an and are as at be by for from has have in is it its of on or our that the their
+    this to we will with you your
+'''.split())
+
+
+def _words(text):
+    return [word for word in re.findall(r'\w+', text.lower()) if len(word) > 1 and word not in STOP_WORDS]
+
+
+def terms(title, description):
+    return _words(title) * TITLE_WEIGHT + _words(description)
+
+
+def _normalize(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ matrix, dtype=np.float32)
+
+
+class SimilarityIndex:
+    """L2-normalised TF-IDF vectors of a set of jobs, one row per job id."""
+
+    def __init__(self, ids, vocabulary, idf, matrix):
+        self.ids = list(ids)
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.matrix = matrix
+        self.rows = {job_id: row for row, job_id in enumerate(self.ids)}
+
+    @classmethod
+    def fit(cls, jobs):
+        """Build the index from ``(id, title, description)`` tuples."""
+        ids, vocabulary = [], {}
+        indptr, indices, data = [0], [], []
+        for job_id, title, description in jobs:
+            counts = Counter(vocabulary.setdefault(term, len(vocabulary)) for term in terms(title, description))
+            indices.extend(counts)
+            data.extend(counts.values())
+            indptr.append(len(indices))
+            ids.append(job_id)
+
+        indices = np.asarray(indices, dtype=np.int32)
+        counts = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float32), indices, np.asarray(indptr)),
+            shape=(len(ids), len(vocabulary)),
+        )
+        # Sublinear tf and smoothed idf, as most TF-IDF implementations do
+        counts.data = 1 + np.log(counts.data)
+        document_frequency = np.bincount(indices, minlength=len(vocabulary))
+        idf = (np.log((1 + len(ids)) / (1 + document_frequency)) + 1).astype(np.float32)
+        return cls(ids, vocabulary, idf, _normalize(counts @ sparse.diags(idf)))
+
+    def vectorize(self, title, description):
+        # Terms the index has never seen carry no weight until the next rebuild
+        counts = Counter(
+            self.vocabulary[term] for term in terms(title, description) if term in self.vocabulary
+        )
+        row = sparse.csr_matrix(
+            (
+                (1 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts))))
+                * self.idf[list(counts)],
+                list(counts),
+                [0, len(counts)],
+            ),
+            shape=(1, len(self.vocabulary)),
+        )
+        return _normalize(row)
+
+    def _keep(self, job_ids):
+        keep = np.ones(len(self.ids), dtype=bool)
+        keep[[self.rows[job_id] for job_id in job_ids if job_id in self.rows]] = False
+        return keep
+
+    def upsert(self, job_ids, vectors):
+        """Replace or append the rows of ``job_ids``, one per row of ``vectors``."""
+        # One copy of the matrix per batch of jobs, not per job
+        keep = self._keep(job_ids)
+        self.matrix = sparse.vstack([self.matrix[keep], vectors], format='csr')
+        self.ids = [job_id for job_id, kept in zip(self.ids, keep) if kept] + list(job_ids)
+        self.rows = {job_id: row for row, job_id in enumerate(self.ids)}
+
+    def remove(self, job_ids):
+        keep = self._keep(job_ids)
+        if keep.all():
+            return
+        self.matrix = self.matrix[keep]
+        self.ids = [job_id for job_id, kept in zip(self.ids, keep) if kept]
+        self.rows = {job_id: row for row, job_id in enumerate(self.ids)}
+
+    def scores(self, vectors):
+        """Dense (len(vectors) x jobs) cosine similarities."""
+        # sparse @ dense is much cheaper than sparse @ sparse once the result is mostly non-zero
+        return np.asarray(self.matrix @ vectors.T.toarray()).T
+
+    def top_neighbours(self, vectors, own_ids, k):
+        """
+        Yield ``(own_id, [(related_id, score), ...])`` with the ``k`` best
+        matches of each vector, best first, never matching itself.
+        """
+        ids = np.asarray(self.ids)
+        block = max(1, BLOCK_CELLS // max(len(self.ids), len(self.vocabulary), 1))
+        count = min(k, len(self.ids))
+        for start in range(0, vectors.shape[0], block):
+            block_ids = own_ids[start:start + block]
+            scores = self.scores(vectors[start:start + block])
+            for offset, own_id in enumerate(block_ids):
+                if own_id in self.rows:
+                    scores[offset, self.rows[own_id]] = 0
+            if not count:
+                for own_id in block_ids:
+                    yield own_id, []
+                continue
+
+            best = np.argpartition(-scores, count - 1, axis=1)[:, :count]
+            best_scores = np.take_along_axis(scores, best, axis=1)
+            order = np.argsort(-best_scores, axis=1)
+            best = np.take_along_axis(best, order, axis=1)
+            best_scores = np.take_along_axis(best_scores, order, axis=1)
+            for offset, own_id in enumerate(block_ids):
+                yield own_id, [
+                    (int(ids[column]), float(score))
+                    for column, score in zip(best[offset], best_scores[offset]) if score > 0
+                ]
+
+
+def _job_rows(queryset):
+    return queryset.values_list('id', 'title', 'description').iterator(chunk_size=2000)
+
+
+_index = None
+_index_version = None
+
+
+def get_index():
+    """The fitted index, rebuilt when another process ran a full rebuild."""
+    global _index, _index_version
+    version = cache.get(INDEX_VERSION_CACHE_KEY)
+    if _index is None or version != _index_version:
+        _index = SimilarityIndex.fit(_job_rows(Job.objects.order_by('id')))
+        _index_version = version
+    return _index
+
+
+def _set_index(index):
+    global _index, _index_version
+    _index_version = uuid.uuid4().hex
+    _index = index
+    cache.set(INDEX_VERSION_CACHE_KEY, _index_version, None)
+
+
+def rebuild_related_jobs(top_k=TOP_K, batch_size=2000):
+    """Recompute the related jobs of every job. Yields the number of jobs done so far."""
+    index = SimilarityIndex.fit(_job_rows(Job.objects.order_by('id')))
+    done = 0
+    with transaction.atomic():
+        RelatedJob.objects.all().delete()
+        links = []
+        for job_id, neighbours in index.top_neighbours(index.matrix, index.ids, top_k):
+            links.extend(RelatedJob(job_id=job_id, related_id=related, score=score) for related, score in neighbours)
+            done += 1
+            if len(links) >= batch_size:
+                RelatedJob.objects.bulk_create(links)
+                links = []
+                yield done
+        RelatedJob.objects.bulk_create(links)
+    _set_index(index)
+    yield done
+
+
+def update_related_jobs(job_ids, top_k=TOP_K):
+    """Rescore the given jobs after they were created, edited or deleted."""
+    index = get_index()
+    job_ids = set(job_ids)
+    saved = {job_id: (title, description) for job_id, title, description in _job_rows(Job.objects.filter(id__in=job_ids))}
+    index.remove(job_ids - set(saved))
+    if not saved:
+        return
+
+    own_ids = list(saved)
+    vectors = sparse.vstack([index.vectorize(*saved[job_id]) for job_id in own_ids], format='csr')
+    index.upsert(own_ids, vectors)
+
+    # One pass finds both the saved jobs' own neighbours (the first top_k)
+    # and the jobs that may want to list them in return
+    neighbours = dict(index.top_neighbours(vectors, own_ids, max(top_k, REVERSE_CANDIDATES)))
+
+    # Jobs deleted by other processes are still in this process's index
+    mentioned = {related for links in neighbours.values() for related, _ in links}
+    existing = set(Job.objects.filter(id__in=mentioned).values_list('id', flat=True))
+    index.remove(mentioned - existing)
+    neighbours = {
+        job_id: [(related, score) for related, score in links if related in existing]
+        for job_id, links in neighbours.items()
+    }
+
+    with transaction.atomic():
+        # Scores involving an edited job are stale on both sides
+        RelatedJob.objects.filter(job__in=own_ids).delete()
+        RelatedJob.objects.filter(related__in=own_ids).delete()
+        RelatedJob.objects.bulk_create(
+            RelatedJob(job_id=job_id, related_id=related, score=score)
+            for job_id, links in neighbours.items()
+            for related, score in links[:top_k]
+        )
+        _offer_to_neighbours(neighbours, top_k)
+
+
+def mark_stale(job_ids):
+    """Queue jobs for update_stale_related_jobs(); cheap enough for a request."""
+    StaleRelatedJobs.objects.bulk_create(
+        [StaleRelatedJobs(job_id=job_id) for job_id in job_ids], ignore_conflicts=True,
+    )
+
+
+def update_stale_related_jobs(batch_size=500, top_k=TOP_K):
+    """Rescore the jobs queued by mark_stale(). Returns how many were rescored."""
+    done = 0
+    while True:
+        with transaction.atomic():
+            job_ids = list(StaleRelatedJobs.objects.order_by('job_id').values_list('job_id', flat=True)[:batch_size])
+            # Unqueued before scoring, so a save made meanwhile queues the job again
+            StaleRelatedJobs.objects.filter(job_id__in=job_ids).delete()
+        if not job_ids:
+            return done
+        try:
+            update_related_jobs(job_ids, top_k)
+        except Exception:
+            mark_stale(Job.objects.filter(id__in=job_ids).values_list('id', flat=True))
+            raise
+        done += len(job_ids)
+
+
+def _offer_to_neighbours(neighbours, top_k):
+    # The jobs most similar to a saved job may now rank it among their own top_k
+    offers = {}
+    for own_id, links in neighbours.items():
+        for other, score in links:
+            if other not in neighbours:
+                offers.setdefault(other, []).append((score, own_id))
+    if not offers:
+        return
+
+    current = {}
+    for link in RelatedJob.objects.filter(job__in=offers).only('id', 'job_id', 'score'):
+        current.setdefault(link.job_id, []).append((link.score, link.id))
+
+    created, dropped = [], []
+    for job_id, candidates in offers.items():
+        links = [(score, 'kept', link_id) for score, link_id in current.get(job_id, [])]
+        links += [(score, 'new', own_id) for score, own_id in candidates]
+        links.sort(key=lambda link: -link[0])
+        created += [
+            RelatedJob(job_id=job_id, related_id=own_id, score=score)
+            for score, kind, own_id in links[:top_k] if kind == 'new'
+        ]
+        dropped += [link_id for _, kind, link_id in links[top_k:] if kind == 'kept']
+    RelatedJob.objects.filter(id__in=dropped).delete()
+    RelatedJob.objects.bulk_create(created)
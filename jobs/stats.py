@@ -0,0 +1,71 @@
+"""
+Site-wide job statistics shown on the homepage and the dashboard.
+
+The aggregates are cheap to read but not to compute, so they are kept in
+the cache and dropped by the signals in jobs/signals.py whenever a Job or
+a company account changes. A cache miss simply recomputes them;
+aget_site_stats(), for async views, runs the aggregates concurrently.
+"""
+import asyncio
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from users.models import CustomUser
+from .models import Job
+
+SITE_STATS_CACHE_KEY = 'jobs:site_stats'
+SITE_STATS_CACHE_TIMEOUT = getattr(settings, 'SITE_STATS_CACHE_TIMEOUT', 60 * 60)
+
+
+def compute_site_stats():
+    return {
+        'total_jobs': Job.objects.count(),
+        'hiring_companies': Job.objects.values('company').distinct().count(),
+        'total_companies': CustomUser.objects.filter(is_company=True).count(),
+        'job_types': list(
+            Job.objects.order_by().values('job_type').annotate(count=Count('job_type'))
+        ),
+    }
+
+
+async def acompute_site_stats():
+    total_jobs, hiring_companies, total_companies, job_types = await asyncio.gather(
+        Job.objects.acount(),
+        Job.objects.values('company').distinct().acount(),
+        CustomUser.objects.filter(is_company=True).acount(),
+        _alist(Job.objects.order_by().values('job_type').annotate(count=Count('job_type'))),
+    )
+    return {
+        'total_jobs': total_jobs,
+        'hiring_companies': hiring_companies,
+        'total_companies': total_companies,
+        'job_types': job_types,
+    }
+
+
+async def _alist(queryset):
+    return [row async for row in queryset.aiterator()]
+
+
+def get_site_stats():
+    stats = cache.get(SITE_STATS_CACHE_KEY)
+    if stats is None:
+        stats = compute_site_stats()
+        cache.set(SITE_STATS_CACHE_KEY, stats, SITE_STATS_CACHE_TIMEOUT)
+    return stats
+
+
+async def aget_site_stats():
+    stats = await cache.aget(SITE_STATS_CACHE_KEY)
+    if stats is None:
+        stats = await acompute_site_stats()
+        await cache.aset(SITE_STATS_CACHE_KEY, stats, SITE_STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def invalidate_site_stats():
+    # Wait for the commit, otherwise a concurrent request could cache the old numbers again
+    transaction.on_commit(lambda: cache.delete(SITE_STATS_CACHE_KEY))
@@ -1,3 +1,858 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import tempfile
+import time
+from io import StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, reverse
+
+from jobportal import metrics
+from jobportal.sqlsampler import fingerprint, install, sampler
+from jobportal.testing import (
+    PLAIN_STATIC_STORAGE, QueryBudgetTestCase, QueryPlanTestCase,
+    make_application, make_company, make_job, make_seeker,
+)
+from applications.models import Application
+from users.models import CustomUser
+from . import async_views
+from .management.commands.import_jobs import Command as ImportCommand
+from .models import Job, RelatedJob, StaleRelatedJobs
+from .pagecache import page_cache_stats
+from .pagination import CursorPaginator, IdListPaginator
+from .resultcache import ResultCache, matching_job_ids, result_cache
+from .search import search_jobs
+from .similarity import rebuild_related_jobs
+from .stats import get_site_stats
+from .version import current_version
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGE)
+class JobSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.acme = CustomUser.objects.create_user('acme', password='pass', is_company=True)
+        cls.python_job = Job.objects.create(
+            title='Python Developer', description='Build Django services.',
+            location='Berlin', job_type='FULL_TIME', company=cls.acme,
+        )
+        cls.designer_job = Job.objects.create(
+            title='Product Designer', description='Work with our python developers.',
+            location='Remote', job_type='REMOTE', company=cls.acme,
+        )
+
+    def search(self, query):
+        return list(search_jobs(Job.objects.all(), query).order_by('-search_rank', '-created_at'))
+
+    def test_title_match_ranks_above_description_match(self):
+        self.assertEqual(self.search('python'), [self.python_job, self.designer_job])
+
+    def test_prefix_and_all_terms_required(self):
+        self.assertEqual(self.search('dev djan'), [self.python_job])
+        self.assertEqual(self.search('python nonexistentword'), [])
+
+    def test_punctuation_only_query_matches_nothing(self):
+        self.assertEqual(self.search('"*()'), [])
+
+    def test_company_username_is_searchable(self):
+        self.assertEqual(len(self.search('acme')), 2)
+
+    def test_index_follows_saves_and_deletes(self):
+        self.python_job.title = 'Rust Engineer'
+        self.python_job.save()
+        self.assertEqual(self.search('rust'), [self.python_job])
+
+        self.python_job.delete()
+        self.assertEqual(self.search('rust'), [])
+
+    def test_company_rename_reindexes_jobs(self):
+        self.acme.username = 'globex'
+        self.acme.save()
+        self.assertEqual(len(self.search('globex')), 2)
+        self.assertEqual(self.search('acme'), [])
+
+    def test_rebuild_command(self):
+        Job.objects.filter(pk=self.python_job.pk).update(title='Go Engineer')
+        self.assertEqual(self.search('go'), [])
+        call_command('rebuild_search_index', batch_size=1, stdout=StringIO())
+        self.assertEqual(self.search('go'), [self.python_job])
+
+    def test_job_list_uses_search(self):
+        response = self.client.get(reverse('job_list'), {'search': 'designer'})
+        self.assertEqual(list(response.context['page_obj']), [self.designer_job])
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGE)
+class RelatedJobsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        company = make_company()
+        cls.backend = make_job(company, title='Python Backend Developer', description='Django REST APIs and PostgreSQL.')
+        cls.api = make_job(company, title='Django API Engineer', description='Python services, REST APIs, Celery.')
+        cls.frontend = make_job(company, title='React Frontend Developer', description='TypeScript, React and CSS.')
+        cls.designer = make_job(company, title='Product Designer', description='Figma prototypes and user research.')
+        cls.seeker = make_seeker()
+
+    def related(self, job):
+        # Logged in, so the anonymous page cache stays out of the way
+        self.client.force_login(self.seeker)
+        response = self.client.get(reverse('job_detail', args=[job.id]))
+        return list(response.context['related_jobs'])
+
+    def test_related_jobs_are_ranked_by_content(self):
+        list(rebuild_related_jobs())
+        self.assertEqual(self.related(self.backend)[0], self.api)
+        self.assertEqual(self.related(self.api)[0], self.backend)
+        # Nothing in common, nothing listed
+        self.assertNotIn(self.designer, self.related(self.backend))
+
+    def test_saved_jobs_are_scored_incrementally(self):
+        list(rebuild_related_jobs())
+        # Saving only queues the job; the worker scores it
+        newcomer = make_job(title='Senior Django Developer', description='Python, REST APIs and PostgreSQL.')
+        self.assertFalse(RelatedJob.objects.filter(job=newcomer).exists())
+        call_command('rebuild_related_jobs', '--changed', stdout=StringIO())
+        self.assertFalse(StaleRelatedJobs.objects.exists())
+        self.assertEqual(self.related(newcomer)[0], self.backend)
+        self.assertEqual(self.related(self.backend)[0], newcomer)
+
+        newcomer.delete()
+        self.assertNotIn(newcomer.pk, RelatedJob.objects.values_list('related_id', flat=True))
+        self.assertEqual(self.related(self.backend)[0], self.api)
+
+    def test_rebuild_command(self):
+        call_command('rebuild_related_jobs', stdout=StringIO())
+        self.assertEqual(RelatedJob.objects.filter(job=self.backend).order_by('-score')[0].related, self.api)
+
+    def test_unscored_job_falls_back_to_same_type(self):
+        self.assertEqual(self.related(self.backend), [self.designer, self.frontend, self.api])
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGE)
+class AnonymousPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.job = make_job(title='Python Developer', location='Berlin')
+
+    def test_normalized_queries_share_an_entry(self):
+        url = reverse('job_list')
+        first = self.client.get(url, {'location': 'Berlin', 'search': '', 'utm_source': 'x'})
+        self.assertEqual(first['X-Page-Cache'], 'miss')
+        with self.assertNumQueries(0):
+            second = self.client.get(url + '?location=%20berlin%20&job_type=')
+        self.assertEqual(second['X-Page-Cache'], 'hit')
+        self.assertEqual(second.content, first.content)
+        # Choice values are case-sensitive, so they stay apart
+        self.assertEqual(self.client.get(url, {'job_type': 'remote'})['X-Page-Cache'], 'miss')
+        self.assertEqual(self.client.get(url, {'job_type': 'REMOTE'})['X-Page-Cache'], 'miss')
+
+    def test_job_changes_expire_pages(self):
+        url = reverse('job_detail', args=[self.job.id])
+        self.client.get(url)
+        self.assertEqual(self.client.get(url)['X-Page-Cache'], 'hit')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.title = 'Rust Developer'
+            self.job.save()
+        response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertContains(response, 'Rust Developer')
+
+    def test_logged_in_users_bypass_the_cache(self):
+        self.client.get(reverse('homepage'))
+        self.client.force_login(make_seeker())
+        response = self.client.get(reverse('homepage'))
+        self.assertNotIn('X-Page-Cache', response)
+        self.assertIsNotNone(response.context)
+
+    def test_stats_command(self):
+        for _ in range(3):
+            self.client.get(reverse('homepage'))
+        out = StringIO()
+        call_command('page_cache_stats', '--reset', stdout=out)
+        self.assertIn('hits: 2\nmisses: 1\nhit ratio: 66.7%', out.getvalue())
+        self.assertEqual(page_cache_stats()['hits'], 0)
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': tempfile.gettempdir() + '/jobspot-page-cache-test',
+    }})
+    def test_file_backend(self):
+        cache.clear()
+        url = reverse('job_detail', args=[self.job.id])
+        self.client.get(url)
+        self.assertEqual(self.client.get(url)['X-Page-Cache'], 'hit')
+        cache.clear()
+
+
+class BenchmarkTemplatesCommandTests(TestCase):
+    def test_seeded_rows_are_rolled_back(self):
+        out = StringIO()
+        call_command('benchmark_templates', jobs=12, repeat=2, stdout=out)
+        self.assertIn('users/dashboard.html', out.getvalue())
+        self.assertEqual(Job.objects.count(), 0)
+
+
+
+class SeedScaleCommandTests(TestCase):
+    def seed(self, prefix):
+        call_command(
+            'seed_scale', companies=3, seekers=5, jobs=40, applications=60,
+            batch_size=16, prefix=prefix, stdout=StringIO(),
+        )
+        return list(
+            Job.objects.filter(company__username__startswith=prefix)
+            .order_by('id').values_list('title', 'location', 'job_type')
+        )
+
+    def test_seeds_the_requested_rows_reproducibly(self):
+        first = self.seed('a-')
+        self.assertEqual(len(first), 40)
+        self.assertEqual(Application.objects.count(), 60)
+        self.assertEqual(sum(Job.objects.values_list('applications_count', flat=True)), 60)
+        self.assertEqual(CustomUser.objects.filter(is_seeker=True).count(), 5)
+        # Dates are spread out, not all "now"
+        self.assertGreater(Job.objects.dates('created_at', 'day').count(), 1)
+        self.assertEqual(self.seed('b-'), first)
+
+    def test_refuses_to_seed_twice_with_one_prefix(self):
+        self.seed('a-')
+        with self.assertRaises(CommandError):
+            self.seed('a-')
+
+
+class BenchmarkViewsCommandTests(TestCase):
+    def test_reports_every_view(self):
+        call_command(
+            'seed_scale', companies=2, seekers=3, jobs=10, applications=12, stdout=StringIO(),
+        )
+        out = StringIO()
+        call_command('benchmark_views', requests=2, concurrency=1, stdout=out, stderr=StringIO())
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['jobs'], 10)
+        for name, result in report['views'].items():
+            self.assertEqual(result['requests'], 2, name)
+            self.assertNotIn('500', result['statuses'], name)
+            self.assertGreaterEqual(result['p95_ms'], result['p50_ms'])
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGE)
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.company = make_company()
+        self.job = make_job(self.company)
+        self.url = reverse('job_detail', args=[self.job.id])
+
+    def test_saving_a_job_touches_updated_at(self):
+        before = self.job.updated_at
+        self.job.title = 'Rust Developer'
+        self.job.save()
+        self.assertGreater(self.job.updated_at, before)
+
+    def test_unchanged_job_detail_is_a_304_without_rendering(self):
+        response = self.client.get(self.url)
+        self.assertIn('no-cache', response['Cache-Control'])
+        with self.assertNumQueries(1), self.assertTemplateNotUsed('jobs/job_detail.html'):
+            not_modified = self.client.get(self.url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(not_modified.status_code, 304)
+        since = self.client.get(self.url, headers={'If-Modified-Since': response['Last-Modified']})
+        self.assertEqual(since.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.title = 'Rust Developer'
+            self.job.save()
+        changed = self.client.get(self.url, headers={'If-None-Match': response['ETag']})
+        self.assertContains(changed, 'Rust Developer')
+
+    def test_etag_follows_the_viewer(self):
+        seeker = make_seeker()
+        anonymous = self.client.get(self.url)['ETag']
+        self.client.force_login(seeker)
+        before = self.client.get(self.url)
+        self.assertNotEqual(before['ETag'], anonymous)
+        self.assertNotIn('Last-Modified', before)
+        make_application(self.job, seeker)
+        self.assertEqual(self.client.get(self.url, headers={'If-None-Match': before['ETag']}).status_code, 200)
+
+    def test_pending_messages_are_never_a_304(self):
+        self.client.force_login(make_seeker())
+        etag = self.client.get(self.url)['ETag']
+        # A company-only page redirects with an error message
+        self.client.get(reverse('create_job'))
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+
+    def test_job_list(self):
+        url = reverse('job_list')
+        etag = self.client.get(url, {'search': 'python'})['ETag']
+        self.assertEqual(self.client.get(url, {'search': 'python'}, headers={'If-None-Match': etag}).status_code, 304)
+        self.assertEqual(self.client.get(url, {'search': 'rust'}, headers={'If-None-Match': etag}).status_code, 200)
+
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGE)
+class RequestTimingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for histogram in metrics.REGISTRY:
+            histogram.reset()
+        make_job(make_company())
+        self.client.force_login(make_seeker())
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('job_list'))
+        timings = dict(entry.split(';', 1) for entry in response['Server-Timing'].split(', '))
+        self.assertEqual(set(timings), {'sql', 'tpl', 'app', 'total'})
+        queries = int(timings['sql'].split('desc="')[1].split()[0])
+        self.assertGreater(queries, 0)
+        self.assertNotEqual(timings['tpl'], 'dur=0.0;desc="templates"')
+        durations = {name: float(value.split(';')[0].removeprefix('dur=')) for name, value in timings.items()}
+        # Queries run while rendering count as SQL only
+        self.assertLessEqual(durations['sql'] + durations['tpl'], durations['total'] + 0.2)
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_not_timed(self):
+        response = self.client.get(reverse('job_list'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(metrics.request_queries.series, {})
+
+    def test_metrics_endpoint(self):
+        self.client.get(reverse('job_list'))
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+        staff = CustomUser.objects.create_user('ops', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(reverse('metrics'))
+        self.assertContains(response, 'jobspot_request_duration_seconds_count{view="job_list",phase="sql"} 1')
+        self.assertContains(response, 'jobspot_request_queries_bucket{view="job_list",le="+Inf"} 1')
+
+    @override_settings(METRICS_TOKEN='scrape-me')
+    def test_metrics_token(self):
+        self.client.logout()
+        url = reverse('metrics')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        response = self.client.get(url, headers={'Authorization': 'Bearer scrape-me'})
+        self.assertEqual(response.status_code, 200)
+
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGE)
+class SQLSamplerTests(TestCase):
+    def test_fingerprint(self):
+        self.assertEqual(
+            fingerprint('SELECT "jobs_job"."id" FROM "jobs_job" WHERE "jobs_job"."id" IN (%s, %s, %s)  LIMIT 21'),
+            'SELECT "jobs_job"."id" FROM "jobs_job" WHERE "jobs_job"."id" IN (...) LIMIT ?',
+        )
+        self.assertEqual(
+            fingerprint("INSERT INTO t (a, b) VALUES ('x', 1), ('it''s', 2)"),
+            'INSERT INTO t (a, b) VALUES (?, ?), ...',
+        )
+        self.assertEqual(fingerprint('SAVEPOINT "s1402_x3"'), 'SAVEPOINT ?')
+
+    def test_report_shows_the_queries_of_a_view(self):
+        make_job(make_company(), location='Berlin')
+        self.client.force_login(make_seeker())
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'samples.jsonl')
+            with override_settings(SQL_SAMPLE_FILE=path, SQL_SAMPLE_RATE=1, SLOW_QUERY_MS=0):
+                self.client.get(reverse('job_list'), {'location': 'berlin'})
+                sampler.flush()
+                out = StringIO()
+                call_command('sql_report', '--stacks', stdout=out)
+        report = out.getvalue()
+        self.assertIn('LIKE ? ESCAPE ?', report)
+        self.assertIn('job_list', report)
+        self.assertIn('jobs/views.py', report)
+
+    def test_scoped_wrappers_survive_a_new_connection(self):
+        def scoped(execute, *args):
+            return execute(*args)
+
+        wrappers = connection.execute_wrappers
+        saved = list(wrappers)
+        try:
+            wrappers[:] = [scoped]
+            install(sender=None, connection=connection)
+            wrappers.pop()  # what leaving the execute_wrapper() block does
+            self.assertEqual(wrappers, [sampler])
+        finally:
+            wrappers[:] = saved
+
+    def test_nothing_is_recorded_without_a_file(self):
+        with override_settings(SQL_SAMPLE_RATE=1, SLOW_QUERY_MS=0):
+            Job.objects.count()
+        self.assertEqual(sampler.buffer, [])
+
+
+
+# The async read views in front of the site's URLconf, for AsyncReadViewTests
+urlpatterns = [
+    path('', async_views.homepage, name='homepage'),
+    path('jobs/', async_views.job_list, name='job_list'),
+    path('jobs/<int:job_id>/', async_views.job_detail, name='job_detail'),
+    path('', include('jobportal.urls')),
+]
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGE, ROOT_URLCONF=__name__)
+class AsyncReadViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.company = make_company()
+        self.job = make_job(self.company, title='Python Developer', job_type='REMOTE')
+        self.other = make_job(self.company, title='Rust Developer', job_type='REMOTE')
+        self.seeker = make_seeker()
+        make_application(self.job, self.seeker)
+
+    async def test_job_list(self):
+        response = await self.async_client.get(reverse('job_list'), {'search': 'python'})
+        self.assertContains(response, 'Python Developer')
+        self.assertNotContains(response, 'Rust Developer')
+        self.assertEqual(response.context['total_jobs'], 1)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        # Queries made from the ORM's worker threads are still timed
+        self.assertNotIn('"0 queries"', response['Server-Timing'])
+
+        cached = await self.async_client.get(reverse('job_list'), {'search': 'Python'})
+        self.assertEqual(cached['X-Page-Cache'], 'hit')
+        not_modified = await self.async_client.get(
+            reverse('job_list'), {'search': 'python'}, headers={'If-None-Match': response['ETag']}
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+    async def test_job_detail_for_an_applicant(self):
+        await self.async_client.aforce_login(self.seeker)
+        response = await self.async_client.get(reverse('job_detail', args=[self.job.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['has_applied'])
+        self.assertEqual(response.context['related_jobs'], [self.other])
+        self.assertIn('private', response['Cache-Control'])
+        self.assertNotIn('X-Page-Cache', response)
+
+    async def test_missing_job(self):
+        response = await self.async_client.get(reverse('job_detail', args=[self.other.id + 1]))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_homepage(self):
+        await self.async_client.aforce_login(self.seeker)
+        response = await self.async_client.get(reverse('homepage'))
+        self.assertEqual([job.title for job in response.context['featured_jobs']], ['Rust Developer', 'Python Developer'])
+        self.assertEqual(response.context['total_jobs'], 2)
+
+    async def test_cache_is_not_called_on_the_event_loop(self):
+        def off_the_loop(method):
+            def guarded(*args, **kwargs):
+                try:
+                    asyncio.get_running_loop()
+                except RuntimeError:
+                    return method(*args, **kwargs)
+                raise AssertionError(f'cache.{method.__name__}() blocked the event loop')
+            return guarded
+
+        methods = {name: off_the_loop(getattr(LocMemCache, name)) for name in ('get', 'set', 'add', 'incr')}
+        with patch.multiple(LocMemCache, **methods):
+            for _ in range(2):  # a page cache miss, then a hit
+                response = await self.async_client.get(reverse('job_list'), {'search': 'python'})
+                self.assertEqual(response.status_code, 200)
+                response = await self.async_client.get(reverse('homepage'))
+                self.assertEqual(response.status_code, 200)
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGE)
+class SiteStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.acme = CustomUser.objects.create_user('acme', password='pass', is_company=True)
+        CustomUser.objects.create_user('idle', password='pass', is_company=True)
+        Job.objects.create(
+            title='Python Developer', description='Django', location='Berlin',
+            job_type='FULL_TIME', company=cls.acme,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_stats_are_cached(self):
+        with self.assertNumQueries(4):
+            stats = get_site_stats()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_site_stats(), stats)
+        self.assertEqual(stats['total_jobs'], 1)
+        self.assertEqual(stats['hiring_companies'], 1)
+        self.assertEqual(stats['total_companies'], 2)
+        self.assertEqual(stats['job_types'], [{'job_type': 'FULL_TIME', 'count': 1}])
+
+    def test_job_changes_invalidate_stats(self):
+        get_site_stats()
+        with self.captureOnCommitCallbacks(execute=True):
+            Job.objects.create(
+                title='Designer', description='Figma', location='Remote',
+                job_type='REMOTE', company=self.acme,
+            )
+        self.assertEqual(get_site_stats()['total_jobs'], 2)
+
+    def test_login_does_not_invalidate_stats(self):
+        get_site_stats()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.force_login(self.acme)
+        with self.assertNumQueries(0):
+            get_site_stats()
+
+    def test_homepage_is_routed(self):
+        response = self.client.get(reverse('homepage'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_jobs'], 1)
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGE)
+class CursorPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        acme = CustomUser.objects.create_user('acme', password='pass', is_company=True)
+        cls.jobs = [
+            Job.objects.create(
+                title=f'Job {i}', description='Role', location='Berlin',
+                job_type='FULL_TIME', company=acme,
+            )
+            for i in range(25)
+        ]
+        # Ties on created_at must still page deterministically by id
+        Job.objects.filter(pk__in=[job.pk for job in cls.jobs[5:15]]).update(
+            created_at=cls.jobs[5].created_at
+        )
+        cls.expected = list(Job.objects.order_by('-created_at', '-id'))
+
+    def walk(self, paginator):
+        pages = [paginator.get_page()]
+        while pages[-1].has_next():
+            pages.append(paginator.get_page(cursor=pages[-1].next_cursor))
+        return pages
+
+    def test_forward_and_backward_walks_cover_every_row_once(self):
+        paginator = CursorPaginator(Job.objects.all(), 10)
+        pages = self.walk(paginator)
+        self.assertEqual([page.number for page in pages], [1, 2, 3])
+        self.assertEqual([job for page in pages for job in page], self.expected)
+
+        back = paginator.get_page(cursor=pages[-1].previous_cursor)
+        self.assertEqual(list(back), self.expected[10:20])
+        self.assertEqual(back.number, 2)
+        first = paginator.get_page(cursor=back.previous_cursor)
+        self.assertEqual(list(first), self.expected[:10])
+        self.assertFalse(first.has_previous())
+
+    def test_deep_page_is_a_single_query(self):
+        paginator = CursorPaginator(Job.objects.all(), 10)
+        cursor = paginator.get_page().next_cursor
+        with self.assertNumQueries(1):
+            list(paginator.get_page(cursor=cursor))
+
+    def test_legacy_page_number_and_bad_cursor(self):
+        paginator = CursorPaginator(Job.objects.all(), 10)
+        page = paginator.get_page(number='2')
+        self.assertEqual(list(page), self.expected[10:20])
+        self.assertEqual(list(paginator.get_page(cursor=page.next_cursor)), self.expected[20:])
+        self.assertEqual(list(paginator.get_page(cursor='garbage')), self.expected[:10])
+        self.assertEqual(paginator.get_page(number='99').number, 3)
+
+    def test_job_list_counts_once(self):
+        # Too many results for the id cache, so they are counted in the database
+        with patch('jobs.resultcache.MAX_RESULT_IDS', 10):
+            cache.clear()
+            response = self.client.get(reverse('job_list'), {'page': 2})
+            self.assertEqual(response.context['total_jobs'], 25)
+            self.assertEqual(list(response.context['page_obj']), self.expected[10:20])
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse('job_list'))
+            self.assertEqual(sum('COUNT(' in query['sql'] for query in queries), 1)
+
+    def test_id_list_pages_like_the_keyset_paginator(self):
+        paginator = IdListPaginator([job.id for job in self.expected], Job.objects.all(), 10)
+        pages = self.walk(paginator)
+        self.assertEqual([page.number for page in pages], [1, 2, 3])
+        self.assertEqual([job for page in pages for job in page], self.expected)
+        back = paginator.get_page(cursor=pages[-1].previous_cursor)
+        self.assertEqual((list(back), back.number), (self.expected[10:20], 2))
+
+        # Cursors handed out by the keyset paginator keep working
+        keyset_cursor = CursorPaginator(Job.objects.all(), 10).get_page().next_cursor
+        self.assertEqual(list(paginator.get_page(cursor=keyset_cursor)), self.expected[10:20])
+        self.assertEqual(list(paginator.get_page(number='3')), self.expected[20:])
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGE)
+class ResultCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        result_cache.clear()
+        self.company = make_company()
+        self.jobs = [make_job(self.company, title=f'Python Developer {i}') for i in range(3)]
+        self.client.force_login(make_seeker())
+
+    def test_repeated_search_reads_the_page_by_id(self):
+        self.client.get(reverse('job_list'), {'search': 'Python  developer'})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('job_list'), {'search': 'python developer'})
+        self.assertEqual(list(response.context['page_obj']), self.jobs[::-1])
+        self.assertEqual(response.context['total_jobs'], 3)
+        job_queries = [query['sql'] for query in queries if 'jobs_job' in query['sql']]
+        self.assertEqual(len(job_queries), 1)
+        self.assertIn('IN (', job_queries[0])
+        self.assertNotIn('jobs_job_fts', job_queries[0])
+
+    def test_punctuation_only_search_lists_every_job(self):
+        # The same answer whether the ids come from the cache or, above the cap, from the database
+        self.assertEqual(len(matching_job_ids('!!!')), 3)
+        result_cache.clear()
+        with patch('jobs.resultcache.MAX_RESULT_IDS', 1):
+            self.assertIsNone(matching_job_ids('?!'))
+            response = self.client.get(reverse('job_list'), {'search': '?!'})
+        self.assertEqual(response.context['total_jobs'], 3)
+
+    def test_job_changes_invalidate_results(self):
+        self.assertEqual(len(matching_job_ids('python')), 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            make_job(self.company, title='Python Engineer')
+        self.assertEqual(len(matching_job_ids('python')), 4)
+
+    def test_memory_is_bounded(self):
+        lru = ResultCache(max_ids=5, timeout=60)
+        lru.put('a', [1, 2, 3])
+        lru.put('b', [4, 5])
+        lru.get('a')
+        lru.put('c', [6])
+        # 'b' was the least recently used
+        self.assertEqual(list(lru.entries), ['a', 'c'])
+        self.assertEqual((lru.size, lru.evictions), (4, 1))
+
+    def test_entries_expire(self):
+        lru = ResultCache(max_ids=5, timeout=60)
+        lru.put('a', [1, 2])
+        with patch('jobs.resultcache.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertIsNone(lru.get('a'))
+        self.assertEqual(lru.size, 0)
+
+    def test_per_process_version_expires(self):
+        # Another process's bump never reaches a locmem cache, so the stamp has to move on by itself
+        version = current_version()
+        with patch('time.time', return_value=time.time() + 61):
+            self.assertGreater(current_version(), version)
+
+
+class JobViewQueryBudgetTests(QueryBudgetTestCase):
+    def setUp(self):
+        self.company = CustomUser.objects.create_user('acme', password='pass', is_company=True)
+
+    def seed_jobs(self, n):
+        # A new company per job, so every card needs a different company row
+        for _ in range(n):
+            make_job()
+
+    def test_job_list(self):
+        self.assertConstantQueries(reverse('job_list'), self.seed_jobs)
+
+    def test_job_list_search(self):
+        self.assertConstantQueries(reverse('job_list'), self.seed_jobs, data={'search': 'python'})
+
+    def test_homepage(self):
+        self.assertConstantQueries(reverse('homepage'), self.seed_jobs)
+
+    def test_job_detail(self):
+        job = make_job(self.company)
+        seeker = CustomUser.objects.create_user('seeker', password='pass', is_seeker=True)
+        self.assertConstantQueries(
+            reverse('job_detail', args=[job.id]),
+            lambda n: [make_application(job) for _ in range(n)] + [make_job() for _ in range(n)],
+            user=seeker,
+        )
+
+    def test_my_jobs(self):
+        def seed(n):
+            for _ in range(n):
+                make_application(make_job(self.company))
+        self.assertConstantQueries(reverse('my_jobs'), seed, user=self.company)
+
+
+class JobQueryPlanTests(QueryPlanTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = make_company()
+        cls.seeker = make_seeker()
+        cls.jobs = [make_job(cls.company) for _ in range(12)]
+        make_application(cls.jobs[0], cls.seeker)
+        list(rebuild_related_jobs())
+
+    def test_job_list(self):
+        self.assertIndexedQueries(reverse('job_list'))
+        self.assertIndexedQueries(reverse('job_list'), data={'job_type': 'REMOTE'})
+        # Relevance order can only come from a sort, but the matches come from the FTS index
+        self.assertIndexedQueries(reverse('job_list'), data={'search': 'python'}, allow_sort=True)
+
+    def test_job_list_deep_pages(self):
+        page = self.client.get(reverse('job_list')).context['page_obj']
+        self.assertIndexedQueries(reverse('job_list'), data={'cursor': page.next_cursor})
+        self.assertIndexedQueries(reverse('job_list'), data={'page': 2})
+
+    def test_homepage(self):
+        self.assertIndexedQueries(reverse('homepage'))
+
+    def test_job_detail(self):
+        self.assertIndexedQueries(reverse('job_detail', args=[self.jobs[0].id]), user=self.seeker)
+        # Without precomputed related jobs the fallback query has to be indexed too
+        RelatedJob.objects.all().delete()
+        self.assertIndexedQueries(reverse('job_detail', args=[self.jobs[0].id]), user=self.seeker)
+
+    def test_my_jobs(self):
+        self.assertIndexedQueries(reverse('my_jobs'), user=self.company)
+
+
+class JobApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = make_company(username='acme')
+        cls.jobs = [make_job(cls.company, job_type='REMOTE' if i % 2 else 'FULL_TIME') for i in range(5)]
+
+    def test_list_pages_with_cursors(self):
+        response = self.client.get(reverse('job_list_api'), {'page_size': 2})
+        data = response.json()
+        self.assertEqual(data['count'], 5)
+        self.assertIsNone(data['previous'])
+        ids = [item['id'] for item in data['results']]
+        while data['next']:
+            data = self.client.get(data['next']).json()
+            ids += [item['id'] for item in data['results']]
+        self.assertEqual(ids, [job.id for job in reversed(self.jobs)])
+
+    def test_sparse_fieldsets_select_only_those_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('job_list_api'), {'fields': 'title', 'job_type': 'REMOTE'})
+        self.assertEqual(response.json()['results'], [{'title': self.jobs[3].title}, {'title': self.jobs[1].title}])
+        page_query = queries.captured_queries[-1]['sql']
+        self.assertNotIn('description', page_query)
+        self.assertNotIn('users_customuser', page_query)
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(reverse('job_list_api'), {'fields': 'title,salary'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_streams_ndjson(self):
+        response = self.client.get(reverse('job_export_api'), {'fields': 'id,company,url'})
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row['id'] for row in rows], [job.id for job in self.jobs])
+        self.assertEqual(rows[0]['company'], 'acme')
+        self.assertTrue(rows[0]['url'].endswith(reverse('job_detail', args=[self.jobs[0].id])))
+
+
+class ImportJobsCommandTests(TestCase):
+    def setUp(self):
+        self.company = make_company(username='acme')
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def run_import(self, *args):
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_jobs', *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_csv_import_validates_rows(self):
+        path = self.write('jobs.csv', (
+            'title,description,location,job_type,company\n'
+            'Python Developer,Django,Berlin,FULL_TIME,acme\n'
+            'Designer,Figma,Remote,FREELANCE,acme\n'
+            'Tester,QA,Paris,REMOTE,nobody\n'
+            'Data Engineer,Pipelines,Remote,REMOTE,acme\n'
+        ))
+        _, errors = self.run_import(path, '--batch-size', '1')
+        self.assertIn('Row 2: job_type', errors)
+        self.assertIn("Row 3: company: unknown company 'nobody'", errors)
+        self.assertQuerySetEqual(
+            Job.objects.order_by('id').values_list('title', flat=True),
+            ['Python Developer', 'Data Engineer'],
+        )
+        self.assertEqual(list(search_jobs(Job.objects.all(), 'pipelines')), [Job.objects.get(title='Data Engineer')])
+
+    def test_ndjson_resume_skips_committed_rows(self):
+        rows = [
+            {'title': f'Job {i}', 'description': 'Role', 'location': 'Berlin',
+             'job_type': 'FULL_TIME', 'company': 'acme'}
+            for i in range(5)
+        ]
+        path = self.write('jobs.ndjson', '\n'.join(json.dumps(row) for row in rows[:3]))
+        self.run_import(path, '--batch-size', '2')
+        self.assertEqual(Job.objects.count(), 3)
+
+        # The file grows (or the previous run died): only the new rows go in
+        self.write('jobs.ndjson', '\n'.join(json.dumps(row) for row in rows))
+        output, _ = self.run_import(path, '--batch-size', '2', '--resume')
+        self.assertIn('3 skipped', output)
+        self.assertEqual(Job.objects.count(), 5)
+
+    def test_resume_after_a_crash_around_the_commit(self):
+        rows = [
+            {'title': f'Job {i}', 'description': 'Role', 'location': 'Berlin',
+             'job_type': 'FULL_TIME', 'company': 'acme'}
+            for i in range(3)
+        ]
+        path = self.write('jobs.ndjson', '\n'.join(json.dumps(row) for row in rows))
+        write_checkpoint = ImportCommand.write_checkpoint
+
+        def crash_before_commit(command, checkpoint, rows, pending=None):
+            write_checkpoint(command, checkpoint, rows, pending)
+            if pending:
+                raise RuntimeError
+
+        def crash_after_commit(command, checkpoint, rows, pending=None):
+            if not pending:
+                raise RuntimeError
+            write_checkpoint(command, checkpoint, rows, pending)
+
+        # The batch rolled back, so --resume imports it again
+        with patch.object(ImportCommand, 'write_checkpoint', crash_before_commit), \
+                self.assertRaises(RuntimeError):
+            self.run_import(path, '--batch-size', '2')
+        self.assertEqual(Job.objects.count(), 0)
+        self.run_import(path, '--batch-size', '2', '--resume')
+        self.assertEqual(Job.objects.count(), 3)
+
+        # The batch committed, so --resume skips it
+        Job.objects.all().delete()
+        with patch.object(ImportCommand, 'write_checkpoint', crash_after_commit), \
+                self.assertRaises(RuntimeError):
+            self.run_import(path, '--batch-size', '2')
+        self.assertEqual(Job.objects.count(), 2)
+        output, _ = self.run_import(path, '--batch-size', '2', '--resume')
+        self.assertIn('2 skipped', output)
+        self.assertQuerySetEqual(Job.objects.order_by('id').values_list('title', flat=True), ['Job 0', 'Job 1', 'Job 2'])
+
+    def test_ndjson_rows_must_be_objects(self):
+        row = {'title': 'Job', 'description': 'Role', 'location': 'Berlin', 'job_type': 'FULL_TIME', 'company': 'acme'}
+        path = self.write('jobs.ndjson', '\n'.join(['5', '[]', '"text"', json.dumps(row)]))
+        output, errors = self.run_import(path)
+        self.assertIn('Row 1: expected a JSON object, got int.', errors)
+        self.assertIn('Row 2: expected a JSON object, got list.', errors)
+        self.assertIn('Imported 1 jobs (3 rejected', output)
+        self.assertTrue(StaleRelatedJobs.objects.filter(job__title='Job').exists())
+
+    def test_import_expires_cached_results(self):
+        path = self.write('jobs.csv', 'title,description,location,job_type,company\nPython Developer,Django,Berlin,FULL_TIME,acme\n')
+        with patch('jobs.management.commands.import_jobs.invalidate_pages') as pages, \
+                patch('jobs.management.commands.import_jobs.invalidate_results') as results:
+            self.run_import(path)
+        pages.assert_called_once_with()
+        results.assert_called_once_with()
@@ -1,13 +1,19 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, api, async_views
+
+# Under ASGI the read-only pages are served by their async versions
+read_views = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
-    path('', views.job_list, name='job_list'),  # /jobs/ - All jobs listing
-    path('<int:job_id>/', views.job_detail, name='job_detail'),  # /jobs/1/ - Job detail
+    path('', read_views.job_list, name='job_list'),  # /jobs/ - All jobs listing
+    path('<int:job_id>/', read_views.job_detail, name='job_detail'),  # /jobs/1/ - Job detail
     path('create/', views.create_job, name='create_job'),  # /jobs/create/ - Post new job
     path('my/', views.my_jobs, name='my_jobs'),  # /jobs/my/ - Company's jobs
     path('<int:pk>/edit/', views.edit_job, name='edit_job'),  # /jobs/1/edit/ - Edit job
     path('<int:pk>/delete/', views.delete_job, name='delete_job'),  # /jobs/1/delete/ - Delete job
+    path('api/', api.job_list_api, name='job_list_api'),  # /jobs/api/ - JSON listing
+    path('api/export/', api.job_export_api, name='job_export_api'),  # /jobs/api/export/ - NDJSON export
 ]
 
 # from django.urls import path
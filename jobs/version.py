@@ -0,0 +1,62 @@
+"""
+A site-wide stamp of when job data last changed.
+
+The stamp lives in the Django cache as microseconds since the epoch and only
+ever grows: every change moves it to "now", or one past its old value if the
+clock is behind. It versions the search result cache (jobs/resultcache.py)
+and dates the conditional responses in jobs/conditional.py.
+
+With a per-process cache (locmem, the default without REDIS_URL or
+CACHE_DIR) no process sees another's bumps, so there the stamp expires
+after LOCAL_VERSION_TIMEOUT seconds and restarts from the clock. That
+bounds how long a process can serve stale results and 304s.
+"""
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+VERSION_KEY = 'jobs:data_version'
+
+
+def _now():
+    return time.time_ns() // 1000
+
+
+def _timeout():
+    if isinstance(caches['default'], LocMemCache):
+        return getattr(settings, 'LOCAL_VERSION_TIMEOUT', 60)
+    return None
+
+
+def current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # A stamp lost to eviction restarts from the clock, never from an old number
+        cache.add(VERSION_KEY, _now(), timeout=_timeout())
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+async def acurrent_version():
+    """current_version() for async views, off the event loop."""
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        await cache.aadd(VERSION_KEY, _now(), timeout=_timeout())
+        version = await cache.aget(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    version = current_version()
+    try:
+        # incr() is atomic on shared backends; a race only pushes the stamp further ahead
+        return cache.incr(VERSION_KEY, max(_now() - version, 1))
+    except ValueError:
+        return current_version()
+
+
+def last_changed():
+    return datetime.fromtimestamp(current_version() / 1_000_000, tz=timezone.utc)
@@ -1,47 +1,45 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q, Count
-from .models import Job
+from .models import Job, RelatedJob
 from .forms import JobForm
+from .search import filter_jobs
+from .stats import get_site_stats
 from django.contrib import messages
-from django.core.paginator import Paginator
+from .pagination import CursorPaginator, IdListPaginator
+from .resultcache import matching_job_ids
+from .pagecache import cache_anonymous_page
+from . import conditional
+from django.views.decorators.http import condition
 
 # Homepage with featured jobs and search
+@cache_anonymous_page(params=('search', 'location', 'job_type'), case_insensitive=('search', 'location'))
 def homepage(request):
     # Get search query
     search_query = request.GET.get('search', '')
     location_query = request.GET.get('location', '')
     job_type_filter = request.GET.get('job_type', '')
     
-    # Start with all jobs
-    jobs = Job.objects.all()
+    # Start with all jobs (company is shown on every card)
+    jobs = Job.objects.select_related('company')
     
-    # Apply filters
-    if search_query:
-        jobs = jobs.filter(
-            Q(title__icontains=search_query) | 
-            Q(description__icontains=search_query)
-        )
-    
-    if location_query:
-        jobs = jobs.filter(location__icontains=location_query)
-        
-    if job_type_filter:
-        jobs = jobs.filter(job_type=job_type_filter)
-    
-    # Get featured jobs (latest 6)
-    featured_jobs = jobs.order_by('-created_at')[:6]
+    # Get featured jobs (best matches first when searching, else latest 6);
+    # repeated searches come from the result cache (see jobs/resultcache.py)
+    ids = matching_job_ids(search_query, location_query, job_type_filter)
+    if ids is not None:
+        found = jobs.in_bulk(ids[:6])
+        featured_jobs = [found[job_id] for job_id in ids[:6] if job_id in found]
+    else:
+        jobs, ordering = filter_jobs(jobs, search_query, location_query, job_type_filter)
+        featured_jobs = jobs.order_by(*ordering)[:6]
     
-    # Get statistics for homepage
-    total_jobs = Job.objects.count()
-    total_companies = Job.objects.values('company').distinct().count()
-    job_types = Job.objects.values('job_type').annotate(count=Count('job_type'))
+    # Get statistics for homepage (cached, see jobs/stats.py)
+    stats = get_site_stats()
     
     context = {
         'featured_jobs': featured_jobs,
-        'total_jobs': total_jobs,
-        'total_companies': total_companies,
-        'job_types': job_types,
+        'total_jobs': stats['total_jobs'],
+        'total_companies': stats['hiring_companies'],
+        'job_types': stats['job_types'],
         'search_query': search_query,
         'location_query': location_query,
         'job_type_filter': job_type_filter,
@@ -50,37 +48,34 @@ def homepage(request):
     
     return render(request, 'jobs/homepage.html', context)
 
-# Enhanced job list with search and pagination
+# Enhanced job list with search and pagination; unchanged pages answer 304 (see jobs/conditional.py)
+@conditional.revalidate
+@condition(etag_func=conditional.job_list_etag, last_modified_func=conditional.job_list_last_modified)
+@cache_anonymous_page(
+    params=('search', 'location', 'job_type', 'cursor', 'page'), case_insensitive=('search', 'location')
+)
 def job_list(request):
     # Get search parameters
     search_query = request.GET.get('search', '')
     location_query = request.GET.get('location', '')
     job_type_filter = request.GET.get('job_type', '')
     
-    # Start with all jobs
-    jobs = Job.objects.all()
-    
-    # Apply filters
-    if search_query:
-        jobs = jobs.filter(
-            Q(title__icontains=search_query) | 
-            Q(description__icontains=search_query) |
-            Q(company__username__icontains=search_query)
-        )
+    # Start with all jobs (company is shown on every card)
+    jobs = Job.objects.select_related('company')
     
-    if location_query:
-        jobs = jobs.filter(location__icontains=location_query)
-        
-    if job_type_filter:
-        jobs = jobs.filter(job_type=job_type_filter)
-    
-    # Order by latest
-    jobs = jobs.order_by('-created_at')
-    
-    # Pagination
-    paginator = Paginator(jobs, 10)  # 10 jobs per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Ordered by relevance when searching, otherwise by latest. Result sets
+    # small enough are paged from the cached id list (see jobs/resultcache.py),
+    # larger ones with keyset pagination; old ?page=N links still resolve
+    ids = matching_job_ids(search_query, location_query, job_type_filter)
+    if ids is not None:
+        paginator = IdListPaginator(ids, jobs, 10)  # 10 jobs per page
+    else:
+        jobs, ordering = filter_jobs(jobs, search_query, location_query, job_type_filter)
+        paginator = CursorPaginator(jobs, 10, ordering)
+    page_obj = paginator.get_page(
+        cursor=request.GET.get('cursor'),
+        number=request.GET.get('page'),
+    )
     
     context = {
         'page_obj': page_obj,
@@ -88,19 +83,28 @@ def job_list(request):
         'location_query': location_query,
         'job_type_filter': job_type_filter,
         'job_type_choices': Job._meta.get_field('job_type').choices,
-        'total_jobs': jobs.count(),
+        'total_jobs': paginator.count,
     }
     
     return render(request, 'jobs/job_list.html', context)
 
-# Enhanced job details
+# Enhanced job details; unchanged pages answer 304 (see jobs/conditional.py)
+@conditional.revalidate
+@condition(etag_func=conditional.job_detail_etag, last_modified_func=conditional.job_detail_last_modified)
+@cache_anonymous_page()
 def job_detail(request, job_id):
-    job = get_object_or_404(Job, id=job_id)
+    job = get_object_or_404(Job.objects.select_related('company'), id=job_id)
     
-    # Get related jobs (same company or similar job type)
-    related_jobs = Job.objects.filter(
-        Q(company=job.company) | Q(job_type=job.job_type)
-    ).exclude(id=job.id)[:3]
+    # Most similar jobs by content, precomputed by jobs/similarity.py
+    related_jobs = [
+        link.related for link in
+        RelatedJob.objects.filter(job=job).select_related('related__company').order_by('-score')[:3]
+    ]
+    if not related_jobs:
+        # Not scored yet, fall back to the newest jobs of the same type
+        related_jobs = Job.objects.select_related('company').filter(
+            job_type=job.job_type
+        ).exclude(id=job.id).order_by('-created_at', '-id')[:3]
     
     # Check if user has already applied (if authenticated)
     has_applied = False
@@ -145,16 +149,12 @@ def my_jobs(request):
         messages.error(request, 'Access denied.')
         return redirect('dashboard')
         
-    jobs = Job.objects.filter(company=request.user).order_by('-created_at')
+    jobs = list(Job.objects.filter(company=request.user).order_by('-created_at'))
     
-    # Get statistics
-    from applications.models import Application
-    total_jobs = jobs.count()
-    total_applications = Application.objects.filter(job__company=request.user).count()
-    pending_applications = Application.objects.filter(
-        job__company=request.user, 
-        status='pending'
-    ).count()
+    # Statistics come from the counters stored on each job (see applications/counters.py)
+    total_jobs = len(jobs)
+    total_applications = sum(job.applications_count for job in jobs)
+    pending_applications = sum(job.pending_count for job in jobs)
     
     context = {
         'jobs': jobs,
@@ -173,7 +173,10 @@ def edit_job(request, pk):
     if request.method == 'POST':
         form = JobForm(request.POST, instance=job)
         if form.is_valid():
-            form.save()
+            job = form.save(commit=False)
+            # Only the edited columns: a full-row save would write back the application
+            # counters as they were read, undoing concurrent F() updates
+            job.save(update_fields=[*form.fields, 'updated_at'])
             messages.success(request, 'Job updated successfully!')
             return redirect('my_jobs')
     else:
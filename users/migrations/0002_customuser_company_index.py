@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="customuser",
+            index=models.Index(condition=models.Q(("is_company", True)), fields=["id"], name="user_company_idx"),
+        ),
+    ]
@@ -7,5 +7,11 @@ class CustomUser(AbstractUser):
     is_company=models.BooleanField(default=False)
     is_seeker=models.BooleanField(default=False)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Only company accounts are ever counted or listed on their own
+            models.Index(fields=['id'], condition=models.Q(is_company=True), name='user_company_idx'),
+        ]
+
     def __str__(self):
         return self.username
\ No newline at end of file
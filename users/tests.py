@@ -1,3 +1,48 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
 
-# Create your tests here.
+from jobportal.testing import (
+    PLAIN_STATIC_STORAGE, QueryBudgetTestCase, QueryPlanTestCase, make_company, make_job, make_seeker,
+)
+from jobs.models import Job
+
+
+class DashboardQueryBudgetTests(QueryBudgetTestCase):
+    def test_dashboard(self):
+        self.assertConstantQueries(
+            reverse('dashboard'),
+            lambda n: [make_job() for _ in range(n)],
+            user=make_seeker(),
+        )
+
+
+class DashboardQueryPlanTests(QueryPlanTestCase):
+    def test_dashboard(self):
+        company = make_company()
+        for _ in range(5):
+            make_job(company)
+        self.assertIndexedQueries(reverse('dashboard'), user=make_seeker())
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGE)
+class DashboardFragmentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        company = make_company()
+        self.edited = make_job(company, title='Python Developer')
+        self.untouched = make_job(company, title='Go Developer')
+        self.client.force_login(make_seeker())
+
+    def test_editing_a_job_refreshes_only_its_card(self):
+        self.client.get(reverse('dashboard'))
+
+        self.edited.title = 'Rust Developer'
+        self.edited.save()
+        # update() leaves updated_at alone, so this card stays cached
+        Job.objects.filter(pk=self.untouched.pk).update(title='Elixir Developer')
+
+        response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'Rust Developer')
+        self.assertContains(response, 'Go Developer')
+        self.assertNotContains(response, 'Elixir Developer')
@@ -2,7 +2,6 @@ from django.shortcuts import render,redirect
 from django.contrib.auth import authenticate,login,logout
 from .forms import CustomUserCreationForm,LoginForm
 from django.contrib.auth.decorators import login_required
-from .models import CustomUser
 
 def register_user(request):
     if request.user.is_authenticated:   # <--- Add this at the top
@@ -40,13 +39,19 @@ def logout_user(request):
 @login_required
 def dashboard(request):
     from jobs.models import Job  # import here if not already globally imported
+    from jobs.stats import get_site_stats
 
-    # Count job stats
-    total_jobs = Job.objects.count()
-    total_companies = CustomUser.objects.filter(is_company=True).count()
+    # Count job stats (cached, see jobs/stats.py)
+    stats = get_site_stats()
 
-    # Filter featured jobs (customize as needed)
-    featured_jobs = Job.objects.order_by('-created_at')[:6]
+    # Seekers get their precomputed feed (see applications/feed.py), everyone else the latest jobs
+    featured_jobs = []
+    if request.user.is_seeker:
+        from applications.feed import feed_jobs
+        featured_jobs = feed_jobs(request.user, limit=6)
+    personalised = bool(featured_jobs)
+    if not personalised:
+        featured_jobs = Job.objects.select_related('company').order_by('-created_at')[:6]
 
     # Optional: filters from GET query
     search_query = request.GET.get('search', '')
@@ -58,9 +63,10 @@ def dashboard(request):
 
     context = {
         'role': 'company' if request.user.is_company else 'seeker',
-        'total_jobs': total_jobs,
-        'total_companies': total_companies,
+        'total_jobs': stats['total_jobs'],
+        'total_companies': stats['total_companies'],
         'featured_jobs': featured_jobs,
+        'personalised': personalised,
         'search_query': search_query,
         'location_query': location_query,
         'job_type_filter': job_type_filter,